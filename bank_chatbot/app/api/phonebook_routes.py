@@ -11,13 +11,7 @@ from sqlalchemy import func
 
 # Import phonebook service
 try:
-    import sys
-    import os
-    services_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    services_dir = os.path.join(services_dir, 'services')
-    if services_dir not in sys.path:
-        sys.path.insert(0, services_dir)
-    from phonebook_postgres import get_phonebook_db
+    from app.services.phonebook_postgres import get_phonebook_db
     PHONEBOOK_AVAILABLE = True
 except ImportError as e:
     PHONEBOOK_AVAILABLE = False
@@ -64,6 +64,12 @@ async def health_check():
     }
 
 
+def _ping_postgres(engine, statement) -> None:
+    """Blocking DB round trip for the health check (run in a worker thread)"""
+    with engine.connect() as conn:
+        conn.execute(statement)
+
+
 @health_router.get("/health/detailed")
 async def detailed_health_check():
     """Detailed health check with component status"""
@@ -118,8 +124,7 @@ async def detailed_health_check():
         from app.database.postgres import engine
         from sqlalchemy import text
         if engine:
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            await asyncio.to_thread(_ping_postgres, engine, text("SELECT 1"))
             status["components"]["postgresql"] = {
                 "status": "healthy"
             }
@@ -356,14 +361,12 @@ async def chat_stream(request: ChatRequest, http_request: FastAPIRequest):
 
 
 @chat_router.get("/chat/history/{session_id}")
-async def get_chat_history(session_id: str, limit: Optional[int] = 50):
+def get_chat_history(session_id: str, limit: Optional[int] = 50):
     """Get conversation history for a session"""
     try:
-        from app.database.postgres import PostgresChatMemory, get_db
+        from app.database.postgres import memory_session
         
-        db = get_db()
-        memory = PostgresChatMemory(db=db)
-        try:
+        with memory_session() as memory:
             history = memory.get_conversation_history(
                 session_id=session_id,
                 limit=limit
@@ -380,9 +383,6 @@ async def get_chat_history(session_id: str, limit: Optional[int] = 50):
                     for msg in history
                 ]
             }
-        finally:
-            memory.close()
-            db.close()
     except Exception as e:
         logger.error(f"Get history error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -392,19 +392,12 @@ async def get_chat_history(session_id: str, limit: Optional[int] = 50):
 async def clear_chat_history(session_id: str):
     """Clear conversation history for a session"""
     try:
-        from app.database.postgres import PostgresChatMemory, get_db
-        
-        db = get_db()
-        memory = PostgresChatMemory(db=db)
-        try:
-            success = memory.clear_session(session_id)
-            return {
-                "session_id": session_id,
-                "cleared": success
-            }
-        finally:
-            memory.close()
-            db.close()
+        # Waits for the session's queued turns, then deletes in a worker thread and drops the cached window
+        success = await orchestrator.clear_session_history(session_id)
+        return {
+            "session_id": session_id,
+            "cleared": success
+        }
     except Exception as e:
         logger.error(f"Clear history error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -412,7 +405,7 @@ async def clear_chat_history(session_id: str):
 
 # Analytics Routes
 @analytics_router.get("/analytics/performance")
-async def get_performance(days: int = Query(30, ge=1, le=365)):
+def get_performance(days: int = Query(30, ge=1, le=365)):
     """Get performance metrics for the last N days"""
     try:
         from app.services.analytics import get_performance_metrics
@@ -423,7 +416,7 @@ async def get_performance(days: int = Query(30, ge=1, le=365)):
 
 
 @analytics_router.get("/analytics/most-asked")
-async def get_most_asked(limit: int = Query(20, ge=1, le=100)):
+def get_most_asked(limit: int = Query(20, ge=1, le=100)):
     """Get most frequently asked questions"""
     try:
         from app.services.analytics import get_most_asked_questions
@@ -434,7 +427,7 @@ async def get_most_asked(limit: int = Query(20, ge=1, le=100)):
 
 
 @analytics_router.get("/analytics/unanswered")
-async def get_unanswered(limit: int = Query(50, ge=1, le=200)):
+def get_unanswered(limit: int = Query(50, ge=1, le=200)):
     """Get questions that were not answered"""
     try:
         from app.services.analytics import get_unanswered_questions
@@ -445,7 +438,7 @@ async def get_unanswered(limit: int = Query(50, ge=1, le=200)):
 
 
 @analytics_router.get("/analytics/history")
-async def get_history(
+def get_history(
     session_id: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=1000)
 ):
@@ -460,7 +453,7 @@ async def get_history(
 
 # Debug Routes
 @debug_router.post("/debug/test-conversation-log")
-async def test_conversation_log():
+def test_conversation_log():
     """Test endpoint to create a ConversationLog record"""
     try:
         from app.services.analytics import log_conversation
@@ -484,18 +477,17 @@ async def test_conversation_log():
 
 
 @debug_router.get("/debug/check-conversation-log")
-async def check_conversation_log():
+def check_conversation_log():
     """Debug endpoint to directly query ConversationLog table"""
     try:
-        from app.database.postgres import get_db
+        from app.database.postgres import db_session
         from app.services.analytics import ConversationLog
         from sqlalchemy import inspect
         
-        db = get_db()
-        if not db:
-            return {"status": "error", "message": "Database not available"}
-        
-        try:
+        with db_session() as db:
+            if not db:
+                return {"status": "error", "message": "Database not available"}
+            
             # Check if table exists
             inspector = inspect(db.bind)
             tables = inspector.get_table_names()
@@ -524,8 +516,6 @@ async def check_conversation_log():
                 "recent_records": recent,
                 "available_tables": tables
             }
-        finally:
-            db.close()
     except Exception as e:
         logger.error(f"Error checking ConversationLog: {e}", exc_info=True)
         return {"status": "error", "message": str(e)}
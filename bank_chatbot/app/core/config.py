@@ -43,6 +43,14 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     OPENAI_TEMPERATURE: float = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
     OPENAI_MAX_TOKENS: int = int(os.getenv("OPENAI_MAX_TOKENS", "2000"))
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "60"))  # Seconds per request (connect timeout is 5s)
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))  # SDK retries on connection errors/429/5xx
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "200"))  # httpx pool size
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "100"))  # Idle keep-alive connections
+    OPENAI_HTTP2: bool = os.getenv("OPENAI_HTTP2", "True").lower() == "true"  # Multiplex OpenAI calls over HTTP/2 (when h2 is installed)
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "100"))  # In-flight completion limit
+    OPENAI_RATE_LIMIT_PAUSE: float = float(os.getenv("OPENAI_RATE_LIMIT_PAUSE", "2"))  # Seconds all new calls wait after a 429 outlasts the SDK retries
+    OPENAI_PROMPT_BUDGET_TOKENS: int = int(os.getenv("OPENAI_PROMPT_BUDGET_TOKENS", "12000"))  # Estimated prompt size before old history is dropped
     
     # PostgreSQL
     POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "localhost")
@@ -50,6 +58,11 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "bank_chatbot")
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "")
+    POSTGRES_POOL_SIZE: int = int(os.getenv("POSTGRES_POOL_SIZE", "10"))  # Persistent pooled connections
+    POSTGRES_POOL_MIN_SIZE: int = int(os.getenv("POSTGRES_POOL_MIN_SIZE", "5"))  # Connections opened at startup (capped at pool size)
+    POSTGRES_MAX_OVERFLOW: int = int(os.getenv("POSTGRES_MAX_OVERFLOW", "20"))  # Burst connections above pool size
+    POSTGRES_POOL_RECYCLE: int = int(os.getenv("POSTGRES_POOL_RECYCLE", "1800"))  # Seconds before a pooled connection is recycled
+    POSTGRES_POOL_TIMEOUT: int = int(os.getenv("POSTGRES_POOL_TIMEOUT", "10"))  # Seconds to wait for a free pooled connection
     
     @property
     def DATABASE_URL(self) -> str:
@@ -62,12 +75,23 @@ class Settings(BaseSettings):
     REDIS_DB: int = int(os.getenv("REDIS_DB", "0"))
     REDIS_PASSWORD: str = os.getenv("REDIS_PASSWORD", "")
     REDIS_CACHE_TTL: int = int(os.getenv("REDIS_CACHE_TTL", "3600"))  # 1 hour default
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))  # Shared async connection pool size
+    ENABLE_RESPONSE_CACHE: bool = os.getenv("ENABLE_RESPONSE_CACHE", "True").lower() == "true"  # Exact-match answer cache
+    RESPONSE_CACHE_TTL: int = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))  # 1 hour default
+    ENABLE_SEMANTIC_CACHE: bool = os.getenv("ENABLE_SEMANTIC_CACHE", "True").lower() == "true"  # Reuse answers across filler-word paraphrases
+    ENABLE_LLM_RESPONSE_CACHE: bool = os.getenv("ENABLE_LLM_RESPONSE_CACHE", "True").lower() == "true"  # Reuse completions for identical OpenAI requests
+    LLM_RESPONSE_CACHE_TTL: int = int(os.getenv("LLM_RESPONSE_CACHE_TTL", "3600"))  # 1 hour default
     
     # LightRAG
     LIGHTRAG_URL: str = os.getenv("LIGHTRAG_URL", "http://localhost:9262/query")
     LIGHTRAG_API_KEY: str = os.getenv("LIGHTRAG_API_KEY", "MyCustomLightRagKey456")
     LIGHTRAG_KNOWLEDGE_BASE: str = os.getenv("LIGHTRAG_KNOWLEDGE_BASE", "default")
     LIGHTRAG_TIMEOUT: int = int(os.getenv("LIGHTRAG_TIMEOUT", "30"))
+    LIGHTRAG_MAX_CONCURRENCY: int = int(os.getenv("LIGHTRAG_MAX_CONCURRENCY", "16"))  # In-flight retrieval limit
+    LIGHTRAG_MAX_RETRIES: int = int(os.getenv("LIGHTRAG_MAX_RETRIES", "1"))  # Retries on connection errors/429/5xx gateway errors
+    LIGHTRAG_CACHE_VERSION: str = os.getenv("LIGHTRAG_CACHE_VERSION", "1")  # Bump after re-indexing to invalidate cached retrievals and answers
+    LIGHTRAG_CONTEXT_CACHE_SIZE: int = int(os.getenv("LIGHTRAG_CONTEXT_CACHE_SIZE", "2000"))  # In-process retrieval cache entries (0 disables)
+    LIGHTRAG_CONTEXT_CACHE_TTL: int = int(os.getenv("LIGHTRAG_CONTEXT_CACHE_TTL", "900"))  # 15 minutes default
     
     # Card rates microservice
     CARD_RATES_URL: str = os.getenv("CARD_RATES_URL", "http://localhost:8002")  # Legacy service
@@ -77,8 +101,17 @@ class Settings(BaseSettings):
     LOCATION_SERVICE_URL: str = os.getenv("LOCATION_SERVICE_URL", "http://localhost:8004")  # Location/address service
     
     # Chat settings
-    MAX_CONVERSATION_HISTORY: int = int(os.getenv("MAX_CONVERSATION_HISTORY", "10"))
+    MAX_CONVERSATION_HISTORY: int = int(os.getenv("MAX_CONVERSATION_HISTORY", "10"))  # History block size: the window sent to the LLM advances a block at a time, so it holds N to 2N-1 messages
+    HISTORY_CACHE_SIZE: int = int(os.getenv("HISTORY_CACHE_SIZE", "0"))  # Sessions whose history window is kept in-process (opt-in: per worker, so enable only with one worker or sticky sessions)
+    HISTORY_CACHE_TTL: int = int(os.getenv("HISTORY_CACHE_TTL", "1800"))  # Idle seconds before a session's cached history is reloaded from Postgres
+    LEAD_FLOW_CACHE_SIZE: int = int(os.getenv("LEAD_FLOW_CACHE_SIZE", "10000"))  # Sessions whose lead collection state is kept in-process (least recently used evicted)
+    LEAD_FLOW_TTL: int = int(os.getenv("LEAD_FLOW_TTL", "1800"))  # Idle seconds before an unfinished lead collection flow is discarded
+    ROUTING_CACHE_SIZE: int = int(os.getenv("ROUTING_CACHE_SIZE", "8192"))  # Memoized KB routing decisions
+    PERSIST_QUEUE_SIZE: int = int(os.getenv("PERSIST_QUEUE_SIZE", "10000"))  # Write-behind chat turns before dropping
+    PERSIST_BATCH_SIZE: int = int(os.getenv("PERSIST_BATCH_SIZE", "100"))  # Turns committed per transaction
+    PERSIST_FLUSH_INTERVAL: float = float(os.getenv("PERSIST_FLUSH_INTERVAL", "0.2"))  # Seconds to gather a batch before flushing
     ENABLE_STREAMING: bool = os.getenv("ENABLE_STREAMING", "True").lower() == "true"
+    ENABLE_CANNED_SMALL_TALK: bool = os.getenv("ENABLE_CANNED_SMALL_TALK", "True").lower() == "true"  # Answer bare greetings/thanks without OpenAI
     
     # Lead generation (disabled by default - set ENABLE_LEAD_GENERATION=True to enable)
     ENABLE_LEAD_GENERATION: bool = os.getenv("ENABLE_LEAD_GENERATION", "False").lower() == "true"
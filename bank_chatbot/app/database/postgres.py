@@ -2,12 +2,13 @@
 PostgreSQL database connection and models for conversation memory.
 """
 
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, Index, text
+from sqlalchemy import create_engine, insert, Column, String, Text, DateTime, Integer, Index, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.sql import func
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Iterator, Tuple
 import logging
 
 from app.core.config import settings
@@ -58,15 +59,19 @@ async def init_db():
         engine = create_engine(
             settings.DATABASE_URL,
             pool_pre_ping=True,
-            pool_size=10,
-            max_overflow=20,
+            pool_size=settings.POSTGRES_POOL_SIZE,
+            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+            pool_recycle=settings.POSTGRES_POOL_RECYCLE,
+            pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+            # LIFO keeps traffic on the most recently used connections so surplus ones sit idle
+            # until recycled / closed server-side instead of all staying warm
+            pool_use_lifo=True,
             connect_args={"connect_timeout": 5}
         )
         SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
         
-        # Test connection
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        # Test connection and open the warm minimum up front
+        _warm_pool(engine, min(settings.POSTGRES_POOL_MIN_SIZE, settings.POSTGRES_POOL_SIZE))
         
         # Create tables
         Base.metadata.create_all(bind=engine)
@@ -79,6 +84,21 @@ async def init_db():
         SessionLocal = None
 
 
+def _warm_pool(engine, size: int) -> None:
+    """
+    Check out `size` connections at once (the first one runs SELECT 1), then return them to the pool.
+    QueuePool otherwise connects lazily, so the first burst of concurrent turns would each pay a connect.
+    """
+    connections = [engine.connect()]
+    try:
+        connections[0].execute(text("SELECT 1"))
+        for _ in range(size - 1):
+            connections.append(engine.connect())
+    finally:
+        for conn in connections:
+            conn.close()
+
+
 async def close_db():
     """Close database connections"""
     global engine
@@ -100,6 +120,36 @@ def get_db() -> Optional[Session]:
         return None
 
 
+@contextmanager
+def db_session() -> Iterator[Optional[Session]]:
+    """
+    Yield a pooled database session (None in degraded mode) and return it to the pool on exit.
+    Replaces the get_db() / try / finally: db.close() pattern at call sites.
+    """
+    db = get_db()
+    try:
+        yield db
+    finally:
+        if db is not None:
+            try:
+                db.close()
+            except Exception as e:
+                logger.warning(f"Error returning database session to pool: {e}")
+
+
+@contextmanager
+def memory_session() -> Iterator["PostgresChatMemory"]:
+    """
+    Yield a PostgresChatMemory bound to a single pooled session.
+    
+    The session checks one connection out of the engine's pool for the whole
+    block and returns it on exit, so several reads/writes in one request share
+    a single checkout instead of paying a connect/close cycle each.
+    """
+    with db_session() as db:
+        yield PostgresChatMemory(db=db)
+
+
 class PostgresChatMemory:
     """PostgreSQL-based chat memory manager"""
     
@@ -129,6 +179,55 @@ class PostgresChatMemory:
             logger.warning(f"Error adding message (continuing without persistence): {e}")
             return None
     
+    def add_messages(
+        self,
+        session_id: str,
+        messages: List[Tuple[str, str]],
+        commit: bool = True
+    ) -> bool:
+        """
+        Add several (role, message) rows for one session in one batched INSERT.
+        With commit=False the rows are written inside the open transaction and become visible on the next commit().
+        """
+        return self.add_message_rows(
+            [(session_id, role, message) for role, message in messages],
+            commit=commit
+        )
+    
+    def add_message_rows(
+        self,
+        rows: List[Tuple[str, str, str]],
+        commit: bool = True
+    ) -> bool:
+        """
+        Add (session_id, role, message) rows, possibly spanning sessions, as a single executemany.
+        Goes through a Core insert without RETURNING, so no ORM objects are built and
+        psycopg2 sends the batch as multi-row INSERT ... VALUES statements.
+        Each row is stamped with clock_timestamp() rather than the column default now(), which is the
+        transaction start and would give every row of a batch (possibly many turns) the same created_at.
+        """
+        if not self._available:
+            logger.debug("Database not available, skipping message storage")
+            return False
+        if not rows:
+            return True
+        try:
+            self.db.execute(
+                insert(ChatMessage).values(created_at=func.clock_timestamp()),
+                [
+                    {"session_id": session_id, "role": role, "message": message}
+                    for session_id, role, message in rows
+                ]
+            )
+            if commit:
+                self.db.commit()
+            return True
+        except Exception as e:
+            if self.db:
+                self.db.rollback()
+            logger.warning(f"Error adding messages (continuing without persistence): {e}")
+            return False
+    
     def get_conversation_history(
         self, 
         session_id: str, 
@@ -141,7 +240,7 @@ class PostgresChatMemory:
         try:
             query = self.db.query(ChatMessage).filter(
                 ChatMessage.session_id == session_id
-            ).order_by(ChatMessage.created_at.asc())
+            ).order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc())  # id breaks ties within one transaction
             
             if limit:
                 query = query.limit(limit)
@@ -151,6 +250,40 @@ class PostgresChatMemory:
             logger.warning(f"Error getting conversation history (continuing without history): {e}")
             return []
     
+    def get_history_window(self, session_id: str, block_size: int) -> List[ChatMessage]:
+        """
+        Get the most recent messages of a session, starting at a block-aligned offset.
+        
+        Returns between block_size and 2 * block_size - 1 messages (all of them for short
+        sessions). The window start only moves forward every block_size messages, so
+        consecutive turns send the LLM an identical history prefix (prompt-cache friendly)
+        instead of a sliding window that changes on every turn.
+        """
+        if not self._available:
+            logger.debug("Database not available, returning empty history")
+            return []
+        try:
+            # Number the session's messages and count them in one pass (window functions),
+            # then keep those from the block-aligned start: one query instead of COUNT + OFFSET
+            numbered = self.db.query(
+                ChatMessage.id.label("id"),
+                func.row_number().over(
+                    order_by=(ChatMessage.created_at.asc(), ChatMessage.id.asc())
+                ).label("position"),
+                func.count().over().label("total")
+            ).filter(ChatMessage.session_id == session_id).subquery()
+            start = (numbered.c.total - block_size) // block_size * block_size
+            return (
+                self.db.query(ChatMessage)
+                .join(numbered, ChatMessage.id == numbered.c.id)
+                .filter(numbered.c.position > start)
+                .order_by(numbered.c.position)
+                .all()
+            )
+        except Exception as e:
+            logger.warning(f"Error getting conversation history (continuing without history): {e}")
+            return []
+    
     def clear_session(self, session_id: str) -> bool:
         """Clear all messages for a session"""
         if not self._available:
@@ -168,6 +301,18 @@ class PostgresChatMemory:
             logger.warning(f"Error clearing session: {e}")
             return False
     
+    def commit(self) -> bool:
+        """Commit messages staged with commit=False in a single transaction"""
+        if not self._available:
+            return False
+        try:
+            self.db.commit()
+            return True
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Error committing messages (continuing without persistence): {e}")
+            return False
+    
     def close(self):
         """Close database session"""
         if self.db and self._own_db and self._available:
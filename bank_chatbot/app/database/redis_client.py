@@ -5,6 +5,7 @@ Redis client for caching LightRAG queries and responses.
 import redis.asyncio as aioredis
 import json
 import hashlib
+import re
 import logging
 from typing import Optional, Any, List, Dict
 
@@ -12,9 +13,31 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# orjson (optional - faster (de)serialization of cached values; falls back to the stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 redis_client: Optional[aioredis.Redis] = None
 
 
+def _dumps(value: Any) -> Any:
+    """Serialize a cached value (bytes with orjson, str with json; Redis stores either)"""
+    if ORJSON_AVAILABLE:
+        # Non-str dict keys are stringified, as json.dumps does
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value)
+
+
+def _loads(cached: Any) -> Any:
+    """Deserialize a cached value written by _dumps (either backend can read the other's output)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(cached)
+    return json.loads(cached)
+
+
 async def init_redis():
     """Initialize Redis connection"""
     global redis_client
@@ -26,7 +49,8 @@ async def init_redis():
             db=settings.REDIS_DB,
             password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
             decode_responses=True,
-            socket_connect_timeout=5
+            socket_connect_timeout=5,
+            max_connections=settings.REDIS_MAX_CONNECTIONS
         )
         
         # Test connection
@@ -46,13 +70,53 @@ async def close_redis():
         logger.info("Redis connection closed")
 
 
+_WHITESPACE_RE = re.compile(r'\s+')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _query_hash(query: str) -> str:
+    """Hash a query after normalizing case and whitespace"""
+    normalized_query = _WHITESPACE_RE.sub(' ', query.lower().strip())
+    return hashlib.md5(normalized_query.encode('utf-8')).hexdigest()
+
+
 def get_cache_key(query: str, knowledge_base: str = "default") -> str:
     """Generate cache key for a query"""
-    # Normalize query: lowercase, strip whitespace, normalize multiple spaces
-    import re
-    normalized_query = re.sub(r'\s+', ' ', query.lower().strip())
-    query_hash = hashlib.md5(normalized_query.encode('utf-8')).hexdigest()
-    return f"lightrag:{knowledge_base}:query:{query_hash}"
+    return f"lightrag:{knowledge_base}:query:{_query_hash(query)}"
+
+
+def get_response_cache_key(query: str, knowledge_base: str = "default") -> str:
+    """
+    Generate cache key for a final chatbot response (kept under lightrag:* so clear_cache covers it).
+    Versioned like the retrieval keys, so bumping LIGHTRAG_CACHE_VERSION also retires cached answers.
+    """
+    return f"lightrag:{knowledge_base}:response:v{settings.LIGHTRAG_CACHE_VERSION}:{_query_hash(query)}"
+
+
+def get_completion_cache_key(request: Dict[str, Any]) -> str:
+    """Generate cache key for an OpenAI completion from its full request (model, sampling params, messages)"""
+    request_json = json.dumps(request, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return f"lightrag:llm:completion:{hashlib.sha1(request_json.encode('utf-8')).hexdigest()}"
+
+
+# Filler that doesn't change what is being asked ("please tell me the HR policy" == "HR policy").
+# Only articles and politeness: verbs, tense, modals, pronouns and negations all change the question.
+_CACHE_FILLER_WORDS = frozenset({"a", "an", "the", "please", "pls", "kindly"})
+_CACHE_FILLER_PHRASE_RE = re.compile(r'\b(?:tell|show|give)\s+me(?:\s+about)?\b')
+
+
+def get_similar_response_cache_key(query: str, knowledge_base: str = "default") -> Optional[str]:
+    """
+    Generate a cache key from the query's content words so paraphrases that only differ in
+    filler words share one cached response. Returns None when nothing meaningful is left.
+    """
+    query_lower = _CACHE_FILLER_PHRASE_RE.sub(' ', query.lower())
+    tokens = [t for t in _TOKEN_RE.findall(query_lower) if t not in _CACHE_FILLER_WORDS]
+    if not tokens:
+        return None
+    canonical = " ".join(tokens)
+    query_hash = hashlib.md5(canonical.encode('utf-8')).hexdigest()
+    return f"lightrag:{knowledge_base}:similar:v{settings.LIGHTRAG_CACHE_VERSION}:{query_hash}"
 
 
 class RedisCache:
@@ -72,13 +136,30 @@ class RedisCache:
             cached = await self.client.get(key)
             if cached:
                 logger.info(f"[CACHE] HIT for key: {key}")
-                return json.loads(cached)
+                return _loads(cached)
             logger.info(f"[CACHE] MISS for key: {key}")
             return None
         except Exception as e:
             logger.warning(f"Redis get error: {e}")
             return None
     
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several cached values in a single round trip (MGET); missing keys come back as None"""
+        if not self.client or not keys:
+            return [None] * len(keys)
+        
+        try:
+            values = [_loads(cached) if cached else None for cached in await self.client.mget(keys)]
+            hits = [key for key, value in zip(keys, values) if value is not None]
+            if hits:
+                logger.info(f"[CACHE] HIT for keys: {hits}")
+            else:
+                logger.info(f"[CACHE] MISS for keys: {keys}")
+            return values
+        except Exception as e:
+            logger.warning(f"Redis mget error: {e}")
+            return [None] * len(keys)
+    
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set cached value"""
         if not self.client:
@@ -90,7 +171,7 @@ class RedisCache:
             await self.client.setex(
                 key,
                 ttl,
-                json.dumps(value)
+                _dumps(value)
             )
             logger.info(f"[CACHE] SET for key: {key} with TTL: {ttl}s")
             return True
@@ -98,6 +179,23 @@ class RedisCache:
             logger.warning(f"Redis set error: {e}")
             return False
     
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Set several cached values in a single round trip (non-transactional pipeline)"""
+        if not self.client or not items:
+            return False
+        
+        try:
+            ttl = ttl or self.ttl
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, _dumps(value))
+                await pipe.execute()
+            logger.info(f"[CACHE] SET for keys: {list(items)} with TTL: {ttl}s")
+            return True
+        except Exception as e:
+            logger.warning(f"Redis pipeline set error: {e}")
+            return False
+    
     async def delete(self, key: str) -> bool:
         """Delete cached value"""
         if not self.client:
@@ -173,7 +271,7 @@ class RedisCache:
                 "extra": extra or {},
             }
             ttl = 300  # 5 minutes
-            await self.client.setex(key, ttl, json.dumps(state))
+            await self.client.setex(key, ttl, _dumps(state))
             logger.info(f"[DISAMBIGUATION] Stored state for session {session_id} with TTL {ttl}s (type={disambiguation_type})")
             return True
         except Exception as e:
@@ -198,7 +296,7 @@ class RedisCache:
             cached = await self.client.get(key)
             if cached:
                 logger.info(f"[DISAMBIGUATION] Found state for session {session_id}")
-                return json.loads(cached)
+                return _loads(cached)
             return None
         except Exception as e:
             logger.warning(f"Redis get disambiguation state error: {e}")
@@ -11,7 +11,7 @@ from typing import Optional, List, Dict
 import logging
 import re
 
-from app.database.postgres import Base, get_db
+from app.database.postgres import Base, db_session
 
 logger = logging.getLogger(__name__)
 
@@ -103,7 +103,8 @@ def _is_unanswered(response: str) -> bool:
     return any(indicator in response_lower for indicator in unanswered_indicators)
 
 
-def log_conversation(
+def record_conversation(
+    db: Session,
     session_id: str,
     user_message: str,
     assistant_response: str,
@@ -112,291 +113,301 @@ def log_conversation(
     client_ip: Optional[str] = None
 ):
     """
-    Log a conversation for analytics
+    Stage analytics rows for a conversation on an existing session.
+    The caller owns the transaction (commit/rollback) and the session lifetime.
     """
-    db = get_db()
-    if not db:
-        logger.warning("Database not available, skipping analytics logging")
-        return
+    is_answered = 0 if _is_unanswered(assistant_response) else 1
     
+    # Log conversation
     try:
-        is_answered = 0 if _is_unanswered(assistant_response) else 1
+        conversation = ConversationLog(
+            session_id=session_id,
+            user_message=user_message,
+            assistant_response=assistant_response,
+            is_answered=is_answered,
+            knowledge_base=knowledge_base,
+            response_time_ms=response_time_ms,
+            client_ip=client_ip
+        )
+        db.add(conversation)
+        logger.info(f"Added ConversationLog for session {session_id}")
+    except Exception as conv_error:
+        logger.error(f"Error creating ConversationLog: {conv_error}", exc_info=True)
+        # Continue with other logging even if ConversationLog fails
+    
+    # Update or insert question statistics
+    normalized = _normalize_question(user_message)
+    question = db.query(Question).filter(
+        Question.question_text == user_message
+    ).first()
+    
+    if question:
+        question.total_asked += 1
+        if is_answered:
+            question.answered_count += 1
+        else:
+            question.unanswered_count += 1
+        question.last_asked = datetime.utcnow()
+    else:
+        question = Question(
+            question_text=user_message,
+            normalized_question=normalized,
+            total_asked=1,
+            answered_count=1 if is_answered else 0,
+            unanswered_count=0 if is_answered else 1
+        )
+        db.add(question)
+    
+    # Update daily performance metrics
+    today = datetime.utcnow().date()
+    metric = db.query(PerformanceMetric).filter(
+        PerformanceMetric.date == today
+    ).first()
+    
+    if metric:
+        metric.total_conversations += 1
+        if is_answered:
+            metric.answered_count += 1
+        else:
+            metric.unanswered_count += 1
+        if response_time_ms:
+            # Update average response time
+            if metric.avg_response_time_ms:
+                # Weighted average
+                total = metric.total_conversations
+                metric.avg_response_time_ms = (
+                    (metric.avg_response_time_ms * (total - 1) + response_time_ms) / total
+                )
+            else:
+                metric.avg_response_time_ms = response_time_ms
+    else:
+        metric = PerformanceMetric(
+            date=today,
+            total_conversations=1,
+            answered_count=1 if is_answered else 0,
+            unanswered_count=0 if is_answered else 1,
+            avg_response_time_ms=response_time_ms
+        )
+        db.add(metric)
+
+
+def log_conversation(
+    session_id: str,
+    user_message: str,
+    assistant_response: str,
+    knowledge_base: Optional[str] = None,
+    response_time_ms: Optional[int] = None,
+    client_ip: Optional[str] = None
+):
+    """
+    Log a conversation for analytics
+    """
+    with db_session() as db:
+        if not db:
+            logger.warning("Database not available, skipping analytics logging")
+            return
         
-        # Log conversation
         try:
-            conversation = ConversationLog(
+            record_conversation(
+                db,
                 session_id=session_id,
                 user_message=user_message,
                 assistant_response=assistant_response,
-                is_answered=is_answered,
                 knowledge_base=knowledge_base,
                 response_time_ms=response_time_ms,
                 client_ip=client_ip
             )
-            db.add(conversation)
-            logger.info(f"Added ConversationLog for session {session_id}")
-        except Exception as conv_error:
-            logger.error(f"Error creating ConversationLog: {conv_error}", exc_info=True)
-            # Continue with other logging even if ConversationLog fails
-        
-        # Update or insert question statistics
-        normalized = _normalize_question(user_message)
-        question = db.query(Question).filter(
-            Question.question_text == user_message
-        ).first()
-        
-        if question:
-            question.total_asked += 1
-            if is_answered:
-                question.answered_count += 1
-            else:
-                question.unanswered_count += 1
-            question.last_asked = datetime.utcnow()
-        else:
-            question = Question(
-                question_text=user_message,
-                normalized_question=normalized,
-                total_asked=1,
-                answered_count=1 if is_answered else 0,
-                unanswered_count=0 if is_answered else 1
-            )
-            db.add(question)
-        
-        # Update daily performance metrics
-        today = datetime.utcnow().date()
-        metric = db.query(PerformanceMetric).filter(
-            PerformanceMetric.date == today
-        ).first()
-        
-        if metric:
-            metric.total_conversations += 1
-            if is_answered:
-                metric.answered_count += 1
-            else:
-                metric.unanswered_count += 1
-            if response_time_ms:
-                # Update average response time
-                if metric.avg_response_time_ms:
-                    # Weighted average
-                    total = metric.total_conversations
-                    metric.avg_response_time_ms = (
-                        (metric.avg_response_time_ms * (total - 1) + response_time_ms) / total
-                    )
-                else:
-                    metric.avg_response_time_ms = response_time_ms
-        else:
-            metric = PerformanceMetric(
-                date=today,
-                total_conversations=1,
-                answered_count=1 if is_answered else 0,
-                unanswered_count=0 if is_answered else 1,
-                avg_response_time_ms=response_time_ms
-            )
-            db.add(metric)
-        
-        db.commit()
-        logger.info(f"Successfully committed conversation log for session {session_id}")
-        
-    except Exception as e:
-        logger.error(f"Error logging conversation for analytics: {e}", exc_info=True)
-        if db:
-            db.rollback()
-    finally:
-        db.close()
+            db.commit()
+            logger.info(f"Successfully committed conversation log for session {session_id}")
+            
+        except Exception as e:
+            logger.error(f"Error logging conversation for analytics: {e}", exc_info=True)
+            if db:
+                db.rollback()
 
 
 def get_most_asked_questions(limit: int = 20) -> List[Dict]:
     """Get most frequently asked questions"""
-    db = get_db()
-    if not db:
-        return []
-    
-    try:
-        questions = db.query(Question).order_by(
-            Question.total_asked.desc()
-        ).limit(limit).all()
+    with db_session() as db:
+        if not db:
+            return []
         
-        results = []
-        for q in questions:
-            answer_rate = 0.0
-            if q.total_asked > 0:
-                answer_rate = round(100.0 * q.answered_count / q.total_asked, 2)
+        try:
+            questions = db.query(Question).order_by(
+                Question.total_asked.desc()
+            ).limit(limit).all()
             
-            results.append({
-                'question': q.question_text,
-                'normalized': q.normalized_question,
-                'total_asked': q.total_asked,
-                'answered_count': q.answered_count,
-                'unanswered_count': q.unanswered_count,
-                'answer_rate': answer_rate,
-                'last_asked': q.last_asked.isoformat() if q.last_asked else None
-            })
-        
-        return results
-    except Exception as e:
-        logger.error(f"Error getting most asked questions: {e}")
-        return []
-    finally:
-        db.close()
+            results = []
+            for q in questions:
+                answer_rate = 0.0
+                if q.total_asked > 0:
+                    answer_rate = round(100.0 * q.answered_count / q.total_asked, 2)
+                
+                results.append({
+                    'question': q.question_text,
+                    'normalized': q.normalized_question,
+                    'total_asked': q.total_asked,
+                    'answered_count': q.answered_count,
+                    'unanswered_count': q.unanswered_count,
+                    'answer_rate': answer_rate,
+                    'last_asked': q.last_asked.isoformat() if q.last_asked else None
+                })
+            
+            return results
+        except Exception as e:
+            logger.error(f"Error getting most asked questions: {e}")
+            return []
 
 
 def get_unanswered_questions(limit: int = 50) -> List[Dict]:
     """Get questions that were not answered"""
-    db = get_db()
-    if not db:
-        return []
-    
-    try:
-        questions = db.query(Question).filter(
-            Question.unanswered_count > 0
-        ).order_by(
-            Question.unanswered_count.desc(),
-            Question.last_asked.desc()
-        ).limit(limit).all()
-        
-        results = []
-        for q in questions:
-            results.append({
-                'question': q.question_text,
-                'normalized': q.normalized_question,
-                'unanswered_count': q.unanswered_count,
-                'total_asked': q.total_asked,
-                'last_asked': q.last_asked.isoformat() if q.last_asked else None
-            })
+    with db_session() as db:
+        if not db:
+            return []
         
-        return results
-    except Exception as e:
-        logger.error(f"Error getting unanswered questions: {e}")
-        return []
-    finally:
-        db.close()
+        try:
+            questions = db.query(Question).filter(
+                Question.unanswered_count > 0
+            ).order_by(
+                Question.unanswered_count.desc(),
+                Question.last_asked.desc()
+            ).limit(limit).all()
+            
+            results = []
+            for q in questions:
+                results.append({
+                    'question': q.question_text,
+                    'normalized': q.normalized_question,
+                    'unanswered_count': q.unanswered_count,
+                    'total_asked': q.total_asked,
+                    'last_asked': q.last_asked.isoformat() if q.last_asked else None
+                })
+            
+            return results
+        except Exception as e:
+            logger.error(f"Error getting unanswered questions: {e}")
+            return []
 
 
 def get_performance_metrics(days: int = 30) -> Dict:
     """Get performance metrics for the last N days"""
-    db = get_db()
-    if not db:
-        return {
-            'period_days': days,
-            'overall': {
-                'total_conversations': 0,
-                'total_answered': 0,
-                'total_unanswered': 0,
-                'overall_answer_rate': 0,
-                'avg_response_time_ms': 0
-            },
-            'daily_metrics': []
-        }
-    
-    try:
-        start_date = datetime.utcnow().date() - timedelta(days=days)
+    with db_session() as db:
+        if not db:
+            return {
+                'period_days': days,
+                'overall': {
+                    'total_conversations': 0,
+                    'total_answered': 0,
+                    'total_unanswered': 0,
+                    'overall_answer_rate': 0,
+                    'avg_response_time_ms': 0
+                },
+                'daily_metrics': []
+            }
         
-        # Daily metrics
-        daily_metrics_query = db.query(PerformanceMetric).filter(
-            PerformanceMetric.date >= start_date
-        ).order_by(PerformanceMetric.date.desc()).all()
-        
-        daily_metrics = []
-        for metric in daily_metrics_query:
-            answer_rate = 0.0
-            if metric.total_conversations > 0:
-                answer_rate = round(100.0 * metric.answered_count / metric.total_conversations, 2)
+        try:
+            start_date = datetime.utcnow().date() - timedelta(days=days)
             
-            daily_metrics.append({
-                'date': metric.date.isoformat(),
-                'total_conversations': metric.total_conversations,
-                'answered_count': metric.answered_count,
-                'unanswered_count': metric.unanswered_count,
-                'avg_response_time_ms': metric.avg_response_time_ms,
-                'answer_rate': answer_rate
-            })
-        
-        # Overall statistics
-        overall_query = db.query(
-            func.sum(PerformanceMetric.total_conversations).label('total_conversations'),
-            func.sum(PerformanceMetric.answered_count).label('total_answered'),
-            func.sum(PerformanceMetric.unanswered_count).label('total_unanswered'),
-            func.avg(PerformanceMetric.avg_response_time_ms).label('avg_response_time_ms')
-        ).filter(
-            PerformanceMetric.date >= start_date
-        ).first()
-        
-        total_conv = overall_query.total_conversations or 0
-        total_ans = overall_query.total_answered or 0
-        total_unans = overall_query.total_unanswered or 0
-        avg_rt = overall_query.avg_response_time_ms or 0
-        
-        overall_answer_rate = 0.0
-        if total_conv > 0:
-            overall_answer_rate = round(100.0 * total_ans / total_conv, 2)
-        
-        return {
-            'period_days': days,
-            'overall': {
-                'total_conversations': int(total_conv),
-                'total_answered': int(total_ans),
-                'total_unanswered': int(total_unans),
-                'overall_answer_rate': overall_answer_rate,
-                'avg_response_time_ms': round(avg_rt, 2) if avg_rt else 0
-            },
-            'daily_metrics': daily_metrics
-        }
-    except Exception as e:
-        logger.error(f"Error getting performance metrics: {e}")
-        return {
-            'period_days': days,
-            'overall': {
-                'total_conversations': 0,
-                'total_answered': 0,
-                'total_unanswered': 0,
-                'overall_answer_rate': 0,
-                'avg_response_time_ms': 0
-            },
-            'daily_metrics': []
-        }
-    finally:
-        db.close()
+            # Daily metrics
+            daily_metrics_query = db.query(PerformanceMetric).filter(
+                PerformanceMetric.date >= start_date
+            ).order_by(PerformanceMetric.date.desc()).all()
+            
+            daily_metrics = []
+            for metric in daily_metrics_query:
+                answer_rate = 0.0
+                if metric.total_conversations > 0:
+                    answer_rate = round(100.0 * metric.answered_count / metric.total_conversations, 2)
+                
+                daily_metrics.append({
+                    'date': metric.date.isoformat(),
+                    'total_conversations': metric.total_conversations,
+                    'answered_count': metric.answered_count,
+                    'unanswered_count': metric.unanswered_count,
+                    'avg_response_time_ms': metric.avg_response_time_ms,
+                    'answer_rate': answer_rate
+                })
+            
+            # Overall statistics
+            overall_query = db.query(
+                func.sum(PerformanceMetric.total_conversations).label('total_conversations'),
+                func.sum(PerformanceMetric.answered_count).label('total_answered'),
+                func.sum(PerformanceMetric.unanswered_count).label('total_unanswered'),
+                func.avg(PerformanceMetric.avg_response_time_ms).label('avg_response_time_ms')
+            ).filter(
+                PerformanceMetric.date >= start_date
+            ).first()
+            
+            total_conv = overall_query.total_conversations or 0
+            total_ans = overall_query.total_answered or 0
+            total_unans = overall_query.total_unanswered or 0
+            avg_rt = overall_query.avg_response_time_ms or 0
+            
+            overall_answer_rate = 0.0
+            if total_conv > 0:
+                overall_answer_rate = round(100.0 * total_ans / total_conv, 2)
+            
+            return {
+                'period_days': days,
+                'overall': {
+                    'total_conversations': int(total_conv),
+                    'total_answered': int(total_ans),
+                    'total_unanswered': int(total_unans),
+                    'overall_answer_rate': overall_answer_rate,
+                    'avg_response_time_ms': round(avg_rt, 2) if avg_rt else 0
+                },
+                'daily_metrics': daily_metrics
+            }
+        except Exception as e:
+            logger.error(f"Error getting performance metrics: {e}")
+            return {
+                'period_days': days,
+                'overall': {
+                    'total_conversations': 0,
+                    'total_answered': 0,
+                    'total_unanswered': 0,
+                    'overall_answer_rate': 0,
+                    'avg_response_time_ms': 0
+                },
+                'daily_metrics': []
+            }
 
 
 def get_conversation_history(session_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
     """Get conversation history"""
-    db = get_db()
-    if not db:
-        logger.warning("Database not available for conversation history")
-        return []
-    
-    try:
-        query = db.query(ConversationLog)
-        
-        if session_id:
-            query = query.filter(ConversationLog.session_id == session_id)
-        
-        conversations = query.order_by(
-            ConversationLog.created_at.desc()
-        ).limit(limit).all()
+    with db_session() as db:
+        if not db:
+            logger.warning("Database not available for conversation history")
+            return []
         
-        logger.info(f"Found {len(conversations)} conversations in database")
-        
-        results = []
-        for conv in conversations:
-            results.append({
-                'id': conv.id,
-                'session_id': conv.session_id,
-                'user_message': conv.user_message,
-                'assistant_response': conv.assistant_response,
-                'is_answered': bool(conv.is_answered),
-                'knowledge_base': conv.knowledge_base,
-                'response_time_ms': conv.response_time_ms,
-                'client_ip': conv.client_ip,
-                'created_at': conv.created_at.isoformat() if conv.created_at else None
-            })
-        
-        logger.info(f"Returning {len(results)} conversation results")
-        return results
-    except Exception as e:
-        logger.error(f"Error getting conversation history: {e}", exc_info=True)
-        return []
-    finally:
-        if db:
-            db.close()
-
+        try:
+            query = db.query(ConversationLog)
+            
+            if session_id:
+                query = query.filter(ConversationLog.session_id == session_id)
+            
+            conversations = query.order_by(
+                ConversationLog.created_at.desc()
+            ).limit(limit).all()
+            
+            logger.info(f"Found {len(conversations)} conversations in database")
+            
+            results = []
+            for conv in conversations:
+                results.append({
+                    'id': conv.id,
+                    'session_id': conv.session_id,
+                    'user_message': conv.user_message,
+                    'assistant_response': conv.assistant_response,
+                    'is_answered': bool(conv.is_answered),
+                    'knowledge_base': conv.knowledge_base,
+                    'response_time_ms': conv.response_time_ms,
+                    'client_ip': conv.client_ip,
+                    'created_at': conv.created_at.isoformat() if conv.created_at else None
+                })
+            
+            logger.info(f"Returning {len(results)} conversation results")
+            return results
+        except Exception as e:
+            logger.error(f"Error getting conversation history: {e}", exc_info=True)
+            return []
@@ -2,19 +2,24 @@
 Chat Orchestrator - Coordinates all components for chat processing.
 """
 
+import asyncio
+import functools
+import json
 import uuid
 import logging
 import re
-from typing import Optional, AsyncGenerator, List, Dict, Any
-from datetime import datetime
-import pytz
+import time
+from collections import OrderedDict
+from typing import Optional, AsyncGenerator, List, Dict, Any, FrozenSet, NamedTuple, Sequence, Set, Tuple
+from datetime import datetime, tzinfo
+from zoneinfo import ZoneInfo
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, RateLimitError
 import httpx
 
 from app.core.config import settings
-from app.database.postgres import PostgresChatMemory, get_db
-from app.database.redis_client import RedisCache, get_cache_key
+from app.database.postgres import memory_session, PostgresChatMemory
+from app.database.redis_client import RedisCache, get_cache_key, get_completion_cache_key, get_response_cache_key, get_similar_response_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -28,29 +33,717 @@ except ImportError as e:
 
 # Analytics logging (optional - will fail gracefully if not available)
 try:
-    from app.services.analytics import log_conversation
+    from app.services.analytics import record_conversation
     ANALYTICS_AVAILABLE = True
 except ImportError:
     ANALYTICS_AVAILABLE = False
-    def log_conversation(*args, **kwargs):
+    def record_conversation(*args, **kwargs):
         pass  # No-op if analytics not available
+from app.services.fee_engine_client import FeeEngineClient
 from app.services.lightrag_client import LightRAGClient
 from app.services.location_client import LocationClient
 
 # Import phonebook (PostgreSQL)
 try:
-    import sys
-    import os
-    # Add services directory to path to import phonebook_postgres
-    services_dir = os.path.dirname(os.path.abspath(__file__))
-    if services_dir not in sys.path:
-        sys.path.insert(0, services_dir)
-    from phonebook_postgres import get_phonebook_db
+    from app.services.phonebook_postgres import get_phonebook_db
     PHONEBOOK_DB_AVAILABLE = True
 except ImportError as e:
     PHONEBOOK_DB_AVAILABLE = False
     logger.warning(f"[WARN] Phone book database not available: {e}")
 
+# HTTP/2 for the OpenAI connection pool (optional - needs h2, installed with httpx[http2])
+try:
+    import h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Aho-Corasick keyword scanning (optional - classifier keyword sets fall back to one regex each)
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Response post-processing patterns (compiled once; these run on every streamed segment)
+_MD_BOLD_RE = re.compile(r'\*\*(.*?)\*\*')
+_MD_ITALIC_STAR_RE = re.compile(r'\*(.*?)\*')
+_MD_ITALIC_UNDERSCORE_RE = re.compile(r'_(.*?)_')
+_MD_CODE_BLOCK_RE = re.compile(r'```.*?```', re.DOTALL)
+_MD_INLINE_CODE_RE = re.compile(r'`([^`]+)`')
+_MD_HEADER_RE = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+_RUPEE_AMOUNT_RE = re.compile(r'₹\s*(\d+(?:[.,]\d+)?)')
+_RUPEE_GROUPED_AMOUNT_RE = re.compile(r'₹\s*(\d{1,3}(?:,\d{3})*(?:\.\d+)?)')
+_BANK_NAME_LIMITED_RE = re.compile(r'Eastern Bank Limited', re.IGNORECASE)
+_BANK_NAME_LTD_DOT_RE = re.compile(r'Eastern Bank Ltd\.', re.IGNORECASE)
+_BANK_NAME_LTD_RE = re.compile(r'Eastern Bank Ltd\b', re.IGNORECASE)
+_BANK_NAME_PLC_NO_DOT_RE = re.compile(r'\bEastern Bank PLC\b(?!\.)', re.IGNORECASE)
+# Streamed segments are cleaned one by one: the markdown passes pair markers within a line and the
+# bank-name fix spans words, so a mid-line cut stops before these (see _split_stream_buffer)
+_STREAM_UNSAFE_CHAR_RE = re.compile(r'[*_`#₹]')
+_STREAM_BANK_NAME_TAIL_RE = re.compile(r'\beastern(?: +bank)? +$', re.IGNORECASE)
+
+
+# Every classifier keyword set, in registration order (a set's index is its id in the automaton)
+_KEYWORD_SETS: List[Tuple[str, ...]] = []
+
+
+class _KeywordSet:
+    """
+    A classifier keyword set; .search(text) is truthy iff any keyword is a substring of text.
+    With pyahocorasick installed all sets are answered from one automaton pass per text,
+    so routing a query scans it once instead of once per set.
+    """
+    __slots__ = ("_index", "_pattern")
+    
+    def __init__(self, keywords: Sequence[str]):
+        self._index = len(_KEYWORD_SETS)
+        _KEYWORD_SETS.append(tuple(keywords))
+        self._pattern = re.compile("|".join(re.escape(keyword) for keyword in keywords))
+    
+    def search(self, text: str) -> Any:
+        if AHOCORASICK_AVAILABLE:
+            return True if self._index in _keyword_set_hits(text) else None
+        return self._pattern.search(text)
+    
+    def findall(self, text: str) -> List[str]:
+        """Keywords occurring in text (non-overlapping, leftmost first); for logging which ones matched."""
+        return self._pattern.findall(text)
+
+
+@functools.lru_cache(maxsize=None)
+def _keyword_automaton() -> Any:
+    """Aho-Corasick automaton over every registered keyword, valued with the ids of the sets containing it."""
+    set_ids_by_keyword: Dict[str, List[int]] = {}
+    for set_id, keywords in enumerate(_KEYWORD_SETS):
+        for keyword in keywords:
+            set_ids_by_keyword.setdefault(keyword, []).append(set_id)
+    automaton = ahocorasick.Automaton()
+    for keyword, set_ids in set_ids_by_keyword.items():
+        automaton.add_word(keyword, tuple(set_ids))
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=4096)
+def _keyword_set_hits(text: str) -> FrozenSet[int]:
+    """Ids of the keyword sets with at least one keyword in text (one scan, overlapping matches included)."""
+    return frozenset(set_id for _, set_ids in _keyword_automaton().iter(text) for set_id in set_ids)
+
+
+def _any_keyword_re(keywords: Sequence[str]) -> _KeywordSet:
+    """Register a keyword set; drop-in for a compiled alternation whose .search() is True iff any keyword is a substring."""
+    return _KeywordSet(keywords)
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_query(query: str) -> str:
+    """
+    Lowercased/stripped query. The routing predicates each normalize their input, so one turn
+    asks for the same string many times; memoizing lowercases it once instead of once per predicate.
+    """
+    normalized = query.lower().strip()
+    # Already-normalized input (the classifier pass re-normalizes its key) maps to itself, not a copy
+    return query if normalized == query else normalized
+
+
+# Query classifier keyword sets (one C-level scan per set instead of a Python loop per keyword)
+_SMALL_TALK_CONTACT_RE = _any_keyword_re([
+    'phone', 'telephone', 'tel', 'call', 'contact', 'number', 'phone number',
+    'mobile', 'cell', 'email', 'address', 'extension', 'ext', 'pabx', 'ip phone',
+    'employee', 'staff', 'emp id', 'who is', 'who are', 'who works',
+    'designation', 'department', 'manager', 'director', 'head of'
+])
+_SMALL_TALK_BANKING_RE = _any_keyword_re([
+    "loan", "card", "account", "balance", "deposit", "withdrawal",
+    "interest", "rate", "fee", "service", "product", "banking",
+    "credit", "debit", "transaction", "statement", "minimum", "maximum"
+])
+_SMALL_TALK_PATTERNS_RE = _any_keyword_re([
+    "hi", "hello", "hey", "good morning", "good afternoon", "good evening",
+    "how are you", "how's it going", "what's up",
+    "thanks", "thank you", "appreciate it",
+    "bye", "goodbye", "see you", "farewell",
+    "what are you", "who are you", "what can you do"
+])
+# Replies for bare small-talk turns (the whole message, punctuation stripped); anything else goes to OpenAI
+_SMALL_TALK_GREETING_REPLY = "Hello! Welcome to Eastern Bank PLC. How can I help you today?"
+_SMALL_TALK_THANKS_REPLY = "You're welcome! Is there anything else I can help you with?"
+_SMALL_TALK_GOODBYE_REPLY = "Goodbye! Thank you for choosing Eastern Bank PLC. Have a great day."
+_SMALL_TALK_REPLIES = {
+    **dict.fromkeys(("hi", "hello", "hey", "hi there", "hello there", "hey there"), _SMALL_TALK_GREETING_REPLY),
+    "good morning": "Good morning! Welcome to Eastern Bank PLC. How can I help you today?",
+    "good afternoon": "Good afternoon! Welcome to Eastern Bank PLC. How can I help you today?",
+    "good evening": "Good evening! Welcome to Eastern Bank PLC. How can I help you today?",
+    **dict.fromkeys(("thanks", "thank you", "thanks a lot", "thank you so much", "appreciate it"), _SMALL_TALK_THANKS_REPLY),
+    **dict.fromkeys(("bye", "goodbye", "see you", "farewell"), _SMALL_TALK_GOODBYE_REPLY),
+}
+_SMALL_TALK_TRIM_CHARS = " \t\n!.?,"
+_DATETIME_RE = _any_keyword_re([
+    "date", "time", "what time", "what date", "current time", "current date",
+    "today", "now", "what day", "what is the time", "what is the date",
+    "tell me the time", "tell me the date", "time now", "date today"
+])
+# Datetime answer formats (the zone abbreviation is only shown when TIMEZONE resolved)
+_DATETIME_FORMAT = "%A, %B %d, %Y at %I:%M:%S %p"
+_DATETIME_FORMAT_TZ = _DATETIME_FORMAT + " %Z"
+# Email processes/policies go to LightRAG, not the phonebook
+_EMAIL_PROCESS_RE = _any_keyword_re([
+    'email confirmation', 'email verification', 'email requirement',
+    'email required', 'email process', 'email policy', 'email procedure',
+    'email workflow', 'email approval', 'email notification',
+    'send email', 'email sent', 'email received', 'email delivery',
+    'email template', 'email format', 'email content',
+    'prior email confirmation', 'prior confirmation', 'subject to prior',
+    'subject to email', 'processing subject to', 'confirmation required',
+    'prior email', 'email prior'
+])
+# Phone/email contact lookups, with word boundaries (e.g. "call" must not match "cancelled")
+_CONTACT_LOOKUP_RE = re.compile(r'\b(?:' + "|".join([
+    # Phone/Telephone
+    r'phone number', r'telephone number', r'contact number',
+    r'mobile number', r'cell number', r'phone', r'telephone',
+    r'mobile', r'cell', r'cellphone', r'tel', r'call',
+    r'pabx', r'extension', r'ext', r'ip phone', r'ip phone number',
+    r'direct line', r'direct number', r'landline',
+    # Email - ONLY for contact lookup (not processes)
+    r'email address of', r'email of', r'email for', r'email id of',
+    r'email id for', r'mail address of', r'mail address for',
+    r'what is the email', r'what is email', r'get email',
+    r'find email', r'contact email', r'email contact',
+]) + r')\b')
+_PHONEBOOK_RE = _any_keyword_re([
+    'phonebook', 'phone book', 'employee directory', 'staff directory',
+    'contact list', 'employee list', 'staff list', 'directory'
+])
+_STAFFING_HEADCOUNT_RE = _any_keyword_re(["manpower", "headcount", "personnel"])
+_STAFFING_INTENT_RE = _any_keyword_re([
+    "required", "requirement", "requirements", "needed", "need", "minimum",
+    "manpower", "headcount", "personnel",
+])
+_STAFFING_COUNT_RE = _any_keyword_re(["how many", "number of", "count of"])
+_STAFFING_CONTEXT_RE = _any_keyword_re([
+    "agent", "agent outlet", "outlet", "booth", "counter", "branch", "service point",
+    "customer service", "cash transaction", "cash transactions", "cash withdrawal", "cash deposit"
+])
+_EMPLOYEE_KEYWORDS_RE = _any_keyword_re([
+    'employee id', 'employee number', 'emp id', 'emp_id',
+    'employee phone', 'employee email', 'employee contact',
+    'staff phone', 'staff email', 'staff contact',
+    'who is employee', 'who are employees', 'find employee',
+    'search employee', 'lookup employee', 'employee directory',
+    'staff directory', 'employee list', 'staff list'
+])
+_EMPLOYEE_CONTACT_TERMS_RE = _any_keyword_re(['phone', 'email', 'contact', 'number', 'id', 'search', 'find', 'lookup', 'who'])
+_FINANCIAL_REPORT_RE = _any_keyword_re([
+    'financial report', 'annual report', 'quarterly report', 'financial statement',
+    'revenue', 'profit', 'loss', 'income statement', 'balance sheet',
+    'cash flow', 'earnings', 'dividend', 'financial year', 'fiscal year',
+    'audit', 'auditor', 'financial performance', 'financial results',
+    'quarterly results', 'annual results', 'financial data', 'financial metrics'
+])
+_USER_DOCUMENT_RE = _any_keyword_re([
+    'user document', 'uploaded document', 'custom document', 'my document',
+    'document i uploaded', 'document i provided', 'my file', 'uploaded file',
+    'custom file', 'user file', 'personal document', 'my upload'
+])
+_MANAGEMENT_RE = _any_keyword_re([
+    'management', 'management committee', 'mancom', 'managing director',
+    'md and ceo', 'deputy managing director', 'chief financial officer', 'cfo',
+    'chief technology officer', 'cto', 'chief risk officer', 'cro',
+    'head of', 'unit head', 'executive committee', 'management team',
+    'who is the managing director', 'who is the cfo', 'who is the cto',
+    'management structure', 'organizational structure', 'management hierarchy',
+    'ebl management', 'ebl executives', 'bank management', 'leadership team'
+])
+# "about ebl" / "ebl background" are deliberately absent - too generic, caught by org overview.
+# "mile stone" / "mile-stone" spellings are keywords so the query needs no normalizing copy
+_MILESTONE_RE = _any_keyword_re([
+    'milestone', 'milestones', 'mile stone', 'mile-stone', 'history', 'historical', 'achievement', 'achievements',
+    'timeline', 'journey', 'evolution', 'development', 'growth', 'progress',
+    'founded', 'establishment', 'established', 'inception', 'origin', 'beginnings',
+    'ebl milestone', 'ebl milestones', 'ebl history', 'bank milestone', 'bank milestones',
+    'what are the milestones', 'ebl achievements',
+    'bank achievements', 'company history', 'bank history', 'corporate history'
+])
+# Lead collection: the user backs out of the application
+_LEAD_CANCEL_RE = _any_keyword_re(['cancel', 'stop', 'nevermind', 'no thanks', 'no thank you'])
+# Lead answer extraction (_extract_answer)
+_LEAD_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_LEAD_DATE_RE = re.compile(r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}')
+_NON_DIGIT_RE = re.compile(r'\D')
+_DIGITS_RE = re.compile(r'\d+')
+# Numbered disambiguation reply ("1", "1.", "1) Fast Cash")
+_SELECTION_NUMBER_RE = re.compile(r"^\s*(\d+)\s*[\.\)]?\s*")
+# Query anchors for LightRAG chunk filtering
+_ALNUM_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Prompt add-on triggers, matched against the query. Add-on checks against the (long) retrieved
+# context stay plain `in` scans: str.find beats a regex alternation on multi-KB text
+_SPECIFIC_DETAIL_RE = _any_keyword_re([
+    'minimum', 'balance', 'interest', 'rate', 'fee', 'charge', 'amount', 'requirement', 'eligibility',
+    'process', 'procedure', 'settlement', 'how to', 'steps', 'method'
+])
+_GENERAL_QUERY_RE = _any_keyword_re(['tell me more', 'tell me about', 'what is', 'explain', 'describe'])
+_SYNONYM_TERMS_RE = _any_keyword_re(['credited', 'paid', 'deposited', 'fee', 'charge', 'rate', 'frequency', 'schedule'])
+_FOLLOWUP_INDICATORS_RE = _any_keyword_re(['after', 'how many', 'what is', 'when', 'how often', 'how much'])
+
+# Phonebook search-term extraction (run on every contact query)
+_WHITESPACE_RE = re.compile(r'\s+')
+_PB_ROLE_LOCATION_RE = re.compile(r'(branch\s+)?manager\s+(of|at)\s+(.+?)(?:\s+branch)?$')
+_PB_FIND_PREFIX_RE = re.compile(r'^(find|search|lookup|who is|contact|info about|get)\s+(.+)$', re.IGNORECASE)
+_PB_OF_FOR_RES = (
+    re.compile(r'\b(phone|contact|email|mobile|telephone)\s+number\s+(?:of|for|about)\s+(.+)$', re.IGNORECASE),  # "phone number of X"
+    re.compile(r'\b(phone|contact|email|mobile|telephone)\s+(?:of|for|about)\s+(.+)$', re.IGNORECASE),  # "phone of X"
+    re.compile(r'\b(contact|info|information|details?)\s+(?:info|information|details?)?\s+(?:of|for|about)\s+(.+)$', re.IGNORECASE),  # "contact info for X"
+)
+_PB_STRIP_WORDS_RE = re.compile(
+    r'\b(phone|contact|number|email|address|mobile|telephone|who\s+is|what\s+is|tell\s+me|the|is|are|was|were|of|for|about)\b',
+    re.IGNORECASE
+)
+_PB_LEADING_PREP_RE = re.compile(r'^(of|for|about)\s+', re.IGNORECASE)
+_PB_TRAILING_PREP_RE = re.compile(r'\s+(of|for|about)$', re.IGNORECASE)
+_PB_BANK_SUFFIX_RE = re.compile(r'\s+(of|at|in)\s+(ebl|eastern\s+bank|eastern\s+bank\s+plc)[\s.]*$', re.IGNORECASE)
+_PB_DIVISION_RE = re.compile(r'\bdivision\b', re.IGNORECASE)
+_PB_SHOWN_RESULTS = 5  # contacts listed in one phonebook answer
+_PB_FETCH_LIMIT = _PB_SHOWN_RESULTS + 1  # one extra row tells whether more matches exist
+_PB_DIVISION_KEYWORDS_RE = _any_keyword_re(['banking', 'division', 'department', 'unit', 'section', 'retail', 'sme', 'corporate', 'operations', 'finance', 'hr', 'ict', 'it'])
+_PB_ROLE_KEYWORDS_RE = _any_keyword_re(['head', 'manager', 'director', 'officer', 'executive', 'president', 'ceo', 'cfo', 'chief', 'senior', 'assistant'])
+
+# Routing predicate keyword lists (module-level so they aren't rebuilt on every call)
+_PB_FIND_SEARCH_PATTERNS = (
+    re.compile(r'\b(find|search|lookup|contact|info about)\s+([a-z0-9_]+)'),  # "find cr_app3_test" or "find abc123"
+    re.compile(r'\b(who is)\s+([a-z0-9_]+)'),  # "who is cr_app3_test"
+)
+# Each rule group is one alternation, so a query is scanned once per group rather than once per pattern.
+# "who is" + role/designation; the shared literal prefix lets the regex engine skip ahead to "who"
+_PB_WHO_IS_RE = re.compile(
+    r'who\s+is\s+(?:'
+    r'(?:the\s+)?(?:branch\s+)?manager'
+    r'|(?:the\s+)?(?:.*\s+)?manager\s+of'
+    r'|the\s+(?:.*\s+)?manager'
+    r'|(?:the\s+)?(?:head|director|officer|executive)\s+of'
+    r'|(?:the\s+)?(?:.*\s+)?(?:head|director|officer|executive)'
+    r')'
+)
+# Role + "of"/"at" + location/branch ("manager of", "head of ... branch", "manager at ... branch").
+# Only used as a yes/no search, so optional leading groups are left out: a leading (.*\s+)? made
+# every scan quadratic in the query length, and "manager of ... branch" is covered by "manager of"
+_PB_ROLE_LOCATION_ROUTE_RE = re.compile(
+    r'manager\s+(?:of|at\s+(?:.*\s+)?branch)'
+    r'|(?:head|director|officer)\s+of\s+(?:.*\s+)?branch'
+)
+_PB_ALNUM_TERM_RE = re.compile(r'^[a-z0-9]+$')
+
+# Patterns that indicate organizational overview queries
+_ORG_OVERVIEW_PATTERNS = (
+    # "tell me about" + bank name
+    (re.compile(r'tell\s+me\s+about\s+(ebl|eastern\s+bank)'), 'tell me about EBL/Eastern Bank'),
+    # "what is" + bank name
+    (re.compile(r'what\s+is\s+(ebl|eastern\s+bank)'), 'what is EBL/Eastern Bank'),
+    # "about" + bank name (at start or after "tell me")
+    (re.compile(r'^about\s+(ebl|eastern\s+bank)'), 'about EBL/Eastern Bank'),
+    # "who is" + bank name
+    (re.compile(r'who\s+is\s+(ebl|eastern\s+bank)'), 'who is EBL/Eastern Bank'),
+    # "describe" + bank name
+    (re.compile(r'describe\s+(ebl|eastern\s+bank)'), 'describe EBL/Eastern Bank'),
+)
+
+# Guardrail: Transaction-limit / allowed-count queries should NOT route to fee engine.
+# Examples:
+# - "maximum number of daily Cash Withdrawal transactions allowed for a Savings Account"
+# - "how many cash transactions are allowed per day"
+_FEE_LIMIT_INTENT_KEYWORDS_RE = _any_keyword_re([
+    "maximum number", "max number", "how many", "number of",
+    "limit", "limits", "allowed", "permit", "per day", "daily", "in a day",
+])
+_FEE_LIMIT_TRANSACTION_WORDS_RE = _any_keyword_re(["transaction", "transactions", "cash withdrawal", "withdrawal", "deposit"])
+_FEE_LIMIT_ACCOUNT_WORDS_RE = _any_keyword_re(["savings account", "current account", "account"])
+_FEE_INTENT_WORDS_RE = _any_keyword_re(["fee", "fees", "charge", "charges", "rate", "pricing", "price", "cost", "commission"])
+
+# EXCLUDE retail asset/loan queries - these should NOT route to card fees
+_CARD_FEE_EXCLUDED_RETAIL_KEYWORDS_RE = _any_keyword_re([
+    "fast cash", "fast loan", "education loan", "edu loan",
+    "personal loan", "home loan", "car loan", "auto loan",
+    "business loan", "executive loan", "assure loan", "women's loan",
+    "retail asset", "loan processing", "loan fee", "loan charge",
+    "overdraft", "od", "emi loan", "secured loan", "unsecured loan"
+])
+
+# Card-related context keywords (required for generic terms)
+_CARD_CONTEXT_KEYWORDS_RE = _any_keyword_re([
+    "card", "atm", "lounge", "supplementary", "pin", "rfcd",
+    "visa", "mastercard", "diners", "unionpay", "taka pay",
+    "credit card", "debit card", "prepaid card",
+    "classic", "gold", "platinum", "infinite", "signature", "titanium", "world"
+])
+
+# Specific fee types (always route - these are card-specific)
+_CARD_SPECIFIC_FEE_KEYWORDS_RE = _any_keyword_re([
+    "annual fee", "yearly fee", "renewal fee", "issuance fee", "issuance charge", 
+    "joining fee", "replacement fee", "card replacement", "pin replacement", 
+    "pin fee", "late payment fee", "late fee", "overlimit fee", "over-limit fee",
+    
+    # Transaction fees (card-specific)
+    "cash advance fee", "cash withdrawal fee", "atm withdrawal fee", 
+    "withdrawal fee", "transaction fee",
+    
+    # Service fees (card-specific)
+    "duplicate statement fee", "duplicate estatement", "certificate fee",
+    "chequebook fee", "customer verification fee", "cib fee", 
+    "transaction alert fee", "sms alert", "transaction alert",
+    "sales voucher fee", "sales voucher", "return cheque fee",
+    "undelivered card fee", "atm receipt fee", "cctv footage fee",
+    "cctv", "fund transfer fee", "wallet transfer fee",
+    "want2buy fee", "easycredit fee", "risk assurance fee",
+    "balance maintenance fee",
+    
+    # Interest rates (card-specific)
+    "interest rate", "rate of interest", "apr", "annual percentage rate",
+    "card interest", "credit card rate",
+    
+    # Lounge access (card-specific)
+    "lounge", "lounge access", "sky lounge", "airport lounge", "lounge visit",
+    "skylounge", "international lounge", "domestic lounge", "global lounge",
+    "lounge free visit", "lounge fee", "priority pass",
+    
+    # Supplementary card fee queries (avoid overly-broad "how many")
+    "supplementary fee", "supplementary charge", "supplementary annual fee",
+    "free supplementary", "supplementary card free",
+    
+    # Schedule/document references
+    "fee schedule", "charges schedule", "card charges", "card fees",
+    "fee information", "charge information",
+    
+    # Core fee terms (when used with card context or in card-specific phrases)
+    "fee", "fees", "charge", "charges"
+])
+
+# Card-fee queries that route without further context
+_CARD_SCHEDULE_REFERENCE_RE = _any_keyword_re(["fee schedule", "charges schedule", "card charges", "card fees"])
+_CARD_NAMED_FEE_RE = _any_keyword_re([
+    "annual fee", "issuance fee", "replacement fee", "late payment fee",
+    "overlimit fee", "cash withdrawal fee", "atm withdrawal fee", "cash advance fee",
+    "sales voucher fee", "transaction alert fee", "lounge fee", "lounge free visit",
+    "supplementary fee", "supplementary annual fee",
+])
+# Payroll banking "Category X" questions that collide with card-fee keywords
+_PAYROLL_CARD_COLLISION_RE = _any_keyword_re(["issuance fee", "debit card issuance", "debit card", "coverage", "eligibility", "criteria"])
+
+# Generic terms that require card context
+_CARD_GENERIC_FEE_TERMS_RE = _any_keyword_re(["cost", "pricing", "price"])
+
+_PROCESS_INTENT_RE = _any_keyword_re(["process", "procedure", "how to", "steps", "method"])
+_RETAIL_ASSET_FEE_INTENT_RE = _any_keyword_re(["fee", "fees", "charge", "charges", "cost", "pricing", "price"])
+_RETAIL_ASSET_CARD_RE = _any_keyword_re(['card', 'credit card', 'debit card', 'visa', 'mastercard'])
+_RETAIL_ASSET_EXCLUSIVE_FEES_RE = _any_keyword_re([
+    'partial payment fee', 'partial payment',
+    'early settlement fee', 'early settlement', 'early_settlement',
+    # Stamp duty/charge is a retail-asset charge in our v2 schedule
+    'stamp charge', 'stamp duty',
+    # Reschedule / restructure fees (retail assets v2)
+    'reschedule & restructure fee', 'reschedule and restructure fee',
+    'reschedule & restructure exit fee', 'reschedule and restructure exit fee',
+    'reschedule fee', 'rescheduling fee',
+    'restructure fee', 'restructuring fee',
+    # Common retail-asset charge terms that users ask without saying "loan"
+    'notarization fee',
+    'noc fee', 'loan repayment certificate', 'loan repayment certificate (noc)',
+    'loan outstanding certificate', 'loan outstanding certificate fee',
+])
+
+# Retail asset product keywords
+_RETAIL_ASSET_KEYWORDS_RE = _any_keyword_re([
+    "fast cash", "fast loan", "education loan", "edu loan",
+    "personal loan", "home loan", "car loan", "auto loan",
+    "business loan", "executive loan", "assure loan", "women's loan",
+    "retail asset", "loan processing", "overdraft", "od", "emi loan"
+])
+
+# Fee/charge keywords
+_RETAIL_ASSET_FEE_KEYWORDS_RE = _any_keyword_re([
+    "fee", "fees", "charge", "charges", "cost", "pricing", "price",
+    "processing fee", "enhancement fee", "reduction fee", "cancellation fee",
+    "renewal fee", "settlement fee", "early_settlement_fee", "settlement"
+])
+
+# Skybanking product keywords
+_SKYBANKING_KEYWORDS_RE = _any_keyword_re([
+    "skybanking", "sky banking", "ebl skybanking",
+    "digital banking", "mobile banking", "online banking",
+    "skybanking app", "ebl app", "mobile app"
+])
+
+# Fee/charge keywords
+_SKYBANKING_FEE_KEYWORDS_RE = _any_keyword_re([
+    "fee", "fees", "charge", "charges", "cost", "pricing", "price",
+    "certificate fee", "account certificate", "fund transfer fee",
+    "transfer fee", "transaction fee"
+])
+
+# Location keywords - check for explicit location-related terms
+_LOCATION_KEYWORDS_RE = _any_keyword_re([
+    # Branches
+    'branch', 'branches', 'bank branch', 'ebl branch',
+    # Head office
+    'head office', 'headoffice', 'headquarter', 'headquarters', 'corporate office', 'main office',
+    # ATMs
+    'atm', 'atms', 'automated teller machine', 'cash machine', 'cashpoint',
+    # CRMs
+    'crm', 'customer relationship machine', 'customer service machine',
+    # RTDMs
+    'rtdm', 'retail transaction deposit machine', 'deposit machine',
+    # Priority centers - CRITICAL: All priority center queries must go to location service
+    'priority center', 'priority centre', 'priority centers', 'priority centres',
+    'priority banking center', 'priority banking centre', 'priority banking centers', 'priority banking centres',
+    # General location queries - expanded patterns
+    'where is', 'where are', 'where can i find', 'where can i locate',
+    'find branch', 'find atm', 'locate', 'location', 'address', 'address of',
+    'location of', 'tell me location', 'what is the location', 'what is the address',
+    'nearest branch', 'nearest atm', 'near me', 
+    'in dhaka', 'in chittagong', 'in sylhet', 'in khulna', 'in rajshahi',
+    'dhaka branch', 'chittagong branch', 'sylhet branch'
+])
+_LOCATION_PATTERNS = (
+    re.compile(r'\blocation\s+of\b'),  # "location of X"
+    re.compile(r'\baddress\s+of\b'),   # "address of X"
+    re.compile(r'\bwhere\s+is\b'),     # "where is X"
+    re.compile(r'\bwhere\s+are\b'),    # "where are X"
+    re.compile(r'\btell\s+me\s+(the\s+)?(location|address)'),  # "tell me location/address"
+    re.compile(r'\bwhat\s+is\s+the\s+(location|address)'),     # "what is the location/address"
+    # Count queries for priority centers - CRITICAL: These must go to location service
+    re.compile(r'\bhow\s+many\s+priority\s+(center|centre)'),  # "how many priority center"
+    re.compile(r'\bhow\s+many\s+priority\s+(center|centre)s'),  # "how many priority centers"
+    re.compile(r'\bnumber\s+of\s+priority\s+(center|centre)'),  # "number of priority center"
+    re.compile(r'\bcount\s+of\s+priority\s+(center|centre)'),  # "count of priority center"
+    re.compile(r'\bpriority\s+(center|centre).*\b(how many|number|count|total)'),  # "priority center how many"
+)
+_BRANCH_NAME_RE = re.compile(r'\b(branch|atm|crm|rtdm|priority\s+center|priority\s+centre)\b', re.IGNORECASE)
+_PRIORITY_CENTER_COUNT_RE = re.compile(r'\b(how many|number|count|total).*priority\s+(center|centre)', re.IGNORECASE)
+_PRIORITY_CENTER_COUNT_AFTER_RE = re.compile(r'\bpriority\s+(center|centre).*\b(how many|number|count|total|does.*have|has)', re.IGNORECASE)
+
+_COMPLIANCE_KEYWORDS_RE = _any_keyword_re([
+    # AML (Anti-Money Laundering)
+    'aml', 'anti money laundering', 'anti-money laundering', 'money laundering',
+    'aml policy', 'aml compliance', 'aml regulation', 'aml requirements',
+    'aml customer', 'aml customers', 'aml sensitive', 'aml risk',
+    
+    # Compliance & Regulatory
+    'compliance', 'regulatory', 'regulation', 'regulations', 'regulatory compliance',
+    'compliance policy', 'compliance requirement', 'compliance requirements',
+    'regulatory policy', 'regulatory requirement', 'regulatory requirements',
+    
+    # Policy & Procedures
+    'policy', 'policies', 'procedure', 'procedures', 'guideline', 'guidelines',
+    'bank policy', 'banking policy', 'bank policies', 'banking policies',
+    'internal policy', 'internal policies', 'operational policy',
+    
+    # KYC (Know Your Customer)
+    'kyc', 'know your customer', 'kyc policy', 'kyc compliance', 'kyc requirement',
+    'kyc requirements', 'customer due diligence', 'cdd',
+    
+    # Risk & Fraud
+    'risk management', 'fraud prevention', 'fraud detection', 'suspicious activity',
+    'suspicious transaction', 'transaction monitoring', 'sanctions',
+    'sanctions screening', 'ofac', 'pep', 'politically exposed person',
+    
+    # Sensitive Customers
+    'sensitive customer', 'sensitive customers', 'high risk customer',
+    'high risk customers', 'risk customer', 'risk customers',
+    
+    # Regulatory Bodies
+    'bangladesh bank', 'central bank', 'bb guideline', 'bb guidelines',
+    'regulatory authority', 'regulatory authorities'
+])
+
+_POLICY_GENERIC_WORDS = frozenset({'the', 'a', 'an', 'this', 'that', 'what', 'which', 'some', 'any', 'does', 'say', 'is', 'are', 'was', 'were'})
+_POLICY_NAME_BEFORE_RE = re.compile(r'\b([a-z]+(?:\s+[a-z]+)?)\s+policy\b')
+_POLICY_QUALIFIER_RE = re.compile(r'\bpolicy\s+(?:regarding|about|for|on|concerning|in|of|say|state|mention|specify|require|allow|prohibit)')
+_POLICY_TOPIC_RE = re.compile(r'policy\s+(?:say|state|mention|specify|require|allow|prohibit|regarding|about|for|on|concerning|in|of)\s+[a-z]+')
+_POLICY_ACTION_WORDS_RE = _any_keyword_re(['say', 'state', 'mention', 'specify', 'require', 'allow', 'prohibit', 'regarding', 'about', 'for', 'on', 'concerning'])
+_POLICY_VAGUE_QUERIES = frozenset({'what is the policy?', 'what is policy?', 'tell me about policy', 'explain policy'})
+# Common policy names/identifiers that might be mentioned
+_POLICY_IDENTIFIERS_RE = _any_keyword_re([
+    'aml', 'kyc', 'cdd', 'ofac', 'pep', 'sanctions',
+    'anti money laundering', 'know your customer', 'customer due diligence',
+    'money laundering', 'politically exposed person',
+    'credit policy', 'lending policy', 'loan policy', 'card policy',
+    'account policy', 'deposit policy', 'withdrawal policy',
+    'transaction policy', 'compliance policy', 'risk policy',
+    'fraud policy', 'operational policy', 'internal policy',
+    'gap policy', 'code of conduct', 'dress code', 'employee policy'
+])
+
+# Account types that might be relevant
+_POLICY_ACCOUNT_TYPES_RE = _any_keyword_re([
+    'savings', 'current', 'fixed deposit', 'fd', 'rd', 'recurring deposit',
+    'corporate', 'commercial', 'retail', 'personal', 'business',
+    'super saver', 'stellar', 'platinum', 'gold', 'silver'
+])
+
+# Customer types
+_POLICY_CUSTOMER_TYPES_RE = _any_keyword_re([
+    'corporate', 'commercial', 'retail', 'personal', 'individual',
+    'business', 'sme', 'small medium enterprise', 'enterprise'
+])
+
+# Card product names that indicate a card query (even without the word "card")
+_CARD_PRODUCT_NAMES_RE = _any_keyword_re([
+    "classic", "gold", "platinum", "infinite", "signature", "titanium", 
+    "world", "visa", "mastercard", "diners club", "unionpay", "taka pay",
+    "prepaid", "debit", "credit", "rfcd", "global"
+])
+_CARD_FEE_RATE_RE = _any_keyword_re(['fee', 'fees', 'charge', 'charges', 'rate', 'rates', 'annual', 'yearly', 'interest', 'supplementary', 'supplement'])
+
+# Banking product/service keywords - these should go to LightRAG, NOT phonebook
+_BANKING_PRODUCT_KEYWORDS_RE = _any_keyword_re([
+    # Credit/Debit Cards
+    'credit card', 'debit card', 'card limit', 'card conversion', 'card upgrade',
+    'card feature', 'card benefit', 'card reward', 'card fee', 'card charge',
+    'card application', 'card activation', 'card statement', 'card transaction',
+    
+    # Loans
+    'loan', 'personal loan', 'home loan', 'car loan', 'business loan',
+    'loan interest', 'loan rate', 'loan term', 'loan eligibility', 'loan application',
+    'loan approval', 'loan repayment', 'loan emi', 'loan processing',
+    
+    # Accounts
+    'account', 'accounts',  # Standalone account keyword to catch all account types
+    'savings account', 'current account', 'fixed deposit', 'fd', 'rd', 'recurring deposit',
+    'rfcd', 'rfd', 'recurring fixed', 'recurring fixed deposit',  # RFCD account types
+    'account opening', 'account balance', 'account statement', 'account fee',
+    'account interest', 'account rate', 'account minimum balance',
+    'account type', 'account types', 'types of account', 'kinds of account',
+    
+    # Corporate/Commercial Banking
+    'corporate customer', 'corporate customers', 'corporate account', 'corporate accounts',
+    'corporate banking', 'commercial customer', 'commercial customers',
+    'corporate service', 'corporate process', 'corporate procedure',
+    'corporate requirement', 'corporate requirements', 'corporate policy',
+    'corporate confirmation', 'email confirmation', 'email verification',
+    'processing requirement', 'processing requirements', 'before processing',
+    'whose email confirmation', 'email confirmation required', 'confirmation required',
+    'prior email confirmation', 'prior confirmation', 'subject to prior',
+    'subject to email', 'processing subject to', 'subject to confirmation',
+    'in case of corporate', 'case of corporate', 'corporate processing',
+    'in the case of', 'in case of', 'case of', 'subject to',
+    
+    # Banking Services
+    'online banking', 'mobile banking', 'internet banking', 'atm', 'cash withdrawal',
+    'fund transfer', 'remittance', 'foreign exchange', 'forex', 'currency exchange',
+    'locker', 'safe deposit', 'cheque', 'draft', 'demand draft',
+    'standing instruction', 'standing instructions', 'si', 'si setup', 'si cancellation',
+    'si cancel', 'cancel si', 'cancel standing instruction', 'recurring payment',
+    'recurring transfer', 'automatic payment', 'automatic transfer', 'auto debit',
+    'auto credit', 'scheduled payment', 'scheduled transfer', 'recurring debit',
+    'recurring credit', 'auto payment', 'auto transfer',
+
+    # Installment products / card-linked loan features
+    'easycredit', 'easy credit', 'want2buy', 'want 2 buy',
+    
+    # Branch/Center Locations
+    'priority center', 'priority centre', 'priority centers', 'priority centres',
+    'branch', 'branches', 'branch location', 'branch locations',
+    'center', 'centre', 'centers', 'centres', 'service center', 'service centre',
+    'how many', 'number of', 'count of', 'list of', 'where is', 'where are',
+    'sylhet', 'dhaka', 'chittagong', 'city', 'location', 'locations',
+    
+    # Products & Services
+    'banking product', 'financial product', 'service', 'banking service',
+    'product feature', 'product benefit', 'product eligibility', 'product requirement',
+    'interest rate', 'exchange rate', 'service charge', 'fee structure',
+    'conversion', 'upgrade', 'downgrade', 'limit', 'limit increase', 'limit decrease',
+
+    # Specific products (for eligibility queries without "card" keyword)
+    'islamic priority',
+    
+    # Company Information & History
+    'milestone', 'milestones', 'history', 'about ebl', 'ebl history', 'ebl background',
+    'company history', 'bank history', 'establishment', 'founded', 'founding',
+    'achievement', 'achievements', 'award', 'awards', 'recognition', 'recognition',
+    'timeline', 'journey', 'evolution', 'growth', 'development', 'progress'
+])
+
+# Credit card intent keywords
+_CREDIT_CARD_LEAD_KEYWORDS_RE = _any_keyword_re([
+    'apply for credit card', 'want credit card', 'need credit card',
+    'get credit card', 'credit card application', 'apply credit card',
+    'interested in credit card', 'credit card interest', 'new credit card',
+    'generate a lead for credit card', 'lead for credit card', 'create lead credit card'
+])
+
+# Loan intent keywords
+_LOAN_LEAD_KEYWORDS_RE = _any_keyword_re([
+    'apply for loan', 'want loan', 'need loan', 'get loan',
+    'loan application', 'apply loan', 'interested in loan',
+    'loan interest', 'personal loan', 'home loan', 'car loan',
+    'business loan', 'new loan', 'generate a lead for loan',
+    'lead for loan', 'create lead loan', 'generate lead'
+])
+
+# Lead collection questions as parallel (fields, questions) tuples, shared by every flow
+_CREDIT_CARD_LEAD_FIELDS = ("full_name", "phone", "email", "date_of_birth", "employment_status", "monthly_income")
+_CREDIT_CARD_LEAD_QUESTIONS = (
+    "Great! I'd be happy to help you apply for a credit card. May I have your full name?",
+    "Thank you! What's your phone number?",
+    "And your email address?",
+    "What's your date of birth? (DD/MM/YYYY)",
+    "What's your employment status? (Employed/Self-employed/Student/Retired)",
+    "What's your approximate monthly income? (BDT)",
+)
+_LOAN_LEAD_FIELDS = ("full_name", "phone", "email", "loan_type", "loan_amount", "employment_status", "monthly_income")
+_LOAN_LEAD_QUESTIONS = (
+    "Great! I'd be happy to help you with a loan application. May I have your full name?",
+    "Thank you! What's your phone number?",
+    "And your email address?",
+    "What type of loan are you interested in? (Personal/Home/Car/Business)",
+    "What loan amount are you looking for? (BDT)",
+    "What's your employment status? (Employed/Self-employed/Student/Retired)",
+    "What's your approximate monthly income? (BDT)",
+)
+
+# Fields of a LightRAG query_data response that _format_lightrag_context reads: section -> (items used, item keys)
+_LIGHTRAG_SECTION_FIELDS = {
+    "entities": (5, ("name", "entity_name", "description")),
+    "relationships": (5, ("source", "entity_a", "relation", "relationship", "target", "entity_b")),
+    "chunks": (10, ("source", "file_name", "document", "file", "doc_name", "text", "content")),
+}
+_LIGHTRAG_REFERENCE_FIELDS = ("source", "file_name", "document")
+# Marks a LightRAG Redis lookup that has not been made yet (None means made and missed)
+_NOT_FETCHED = object()
+
+
+class PersistRecord(NamedTuple):
+    """One chat turn waiting to be written by the persistence worker"""
+    session_id: str
+    user_text: str
+    assistant_text: str
+    knowledge_base: Optional[str] = None
+    client_ip: Optional[str] = None
+
+
+class LightRAGCacheKeys(NamedTuple):
+    """Cache keys for one LightRAG retrieval"""
+    improved_query: str
+    redis_key: str  # raw response, shared across processes
+    local_key: str  # formatted (context, sources) in the in-process cache; depends on the filter flag
+
+
+class QuerySignals(NamedTuple):
+    """Keyword-classifier verdicts for one query, used by the routing gates and the response cache"""
+    small_talk: bool
+    datetime: bool
+    contact: bool
+    phonebook: bool
+    employee: bool
+    directory_lookup: bool  # contact, phonebook or employee lookup that isn't small talk (phonebook route)
+    org_overview: bool
+    banking_product: bool
+    compliance: bool
+    management: bool
+    financial_report: bool
+    milestone: bool
+    user_document: bool
+
 
 class ConversationState:
     """Conversation state enumeration"""
@@ -61,12 +754,17 @@ class ConversationState:
 
 class LeadFlowState:
     """Manages lead collection flow state"""
+    # One instance per session in lead_flows; slots keep construction and the per-entry footprint small
+    __slots__ = ("state", "lead_type", "current_question_index", "collected_data", "fields", "questions")
+    
     def __init__(self):
         self.state = ConversationState.NORMAL
-        self.lead_type: Optional[LeadType] = None if not LEADS_AVAILABLE else None
+        self.lead_type: Optional["LeadType"] = None
         self.current_question_index = 0
         self.collected_data: Dict[str, Any] = {}
-        self.questions: List[Dict[str, str]] = []
+        # Parallel tuples: questions[i] asks for fields[i] (module constants, not copied per flow)
+        self.fields: Tuple[str, ...] = ()
+        self.questions: Tuple[str, ...] = ()
     
     def reset(self):
         """Reset the flow state"""
@@ -74,7 +772,122 @@ class LeadFlowState:
         self.lead_type = None
         self.current_question_index = 0
         self.collected_data = {}
-        self.questions = []
+        self.fields = ()
+        self.questions = ()
+
+
+# System prompt for every OpenAI request. It is sent first and never varies, so OpenAI's
+# prompt cache can reuse it across turns; per-turn context goes in the trailing messages.
+_SYSTEM_MESSAGE = """You are a helpful and professional banking assistant for a financial institution.
+You are Eastern Bank PLC.'s internal knowledge assistant, designed to help EBL employees provide accurate customer support. You represent Eastern Bank PLC. and provide information that employees can use when assisting customers. Your responses should be professional, accurate, and suitable for employees to share with customers.
+
+═══════════════════════════════════════════════════════════════════════════════
+🚨 CRITICAL CURRENCY RULE - READ THIS FIRST 🚨
+═══════════════════════════════════════════════════════════════════════════════
+**ABSOLUTE REQUIREMENT: When the context shows currency codes like "BDT" or "USD", 
+you MUST use the EXACT currency code from the context. NEVER replace BDT with ₹ or 
+any other symbol. 
+
+EXAMPLES:
+- Context says "BDT 287.5" → You MUST output "BDT 287.5" (NOT ₹287.5)
+- Context says "BDT 1,725" → You MUST output "BDT 1,725" (NOT ₹1,725)
+- Context says "USD 57.5" → You MUST output "USD 57.5"
+
+BDT = Bangladeshi Taka (use "BDT", never use ₹)
+USD = US Dollar (use "USD")
+
+This is a CRITICAL requirement - incorrect currency symbols cause serious errors.
+═══════════════════════════════════════════════════════════════════════════════
+
+Guidelines:
+1. **You represent Eastern Bank PLC. - you are the bank's knowledge assistant for employees**
+2. **This chatbot is for EBL employees who will use your responses to provide customer support**
+3. **Your responses should be professional, accurate, and suitable for employees to share with customers**
+4. Always be professional, friendly, and helpful
+2. **IMPORTANT: When context from the knowledge base is provided, you MUST use it to answer the question. Do NOT say you don't have information if the context contains the answer.**
+2a. **CRITICAL LOCATION SERVICE DATA RULE: When the context includes "EBL Location Database (Normalized)" or "Source: EBL Location Database", this is REAL-TIME data from the location service database. You MUST use this data directly to answer location queries. If the context shows "Eastern Bank PLC. has X Priority Center(s)" or "Total: X location(s)", you MUST use that exact number. NEVER say "I don't have information" or "the context does not contain information" when location service data is provided. The location service data is authoritative and up-to-date.**
+3. The context provided contains accurate information from the bank's knowledge base - trust it and use it directly
+4. If the context contains specific numbers, facts, or details, include them in your response
+5. **CRITICAL BANK NAME RULE: The bank name is ALWAYS "Eastern Bank PLC" (not "Eastern Bank Limited" or "Eastern Bank Ltd."). If the context mentions "Eastern Bank Limited" or "Eastern Bank Ltd.", you MUST replace it with "Eastern Bank PLC" in your response. Always use "Eastern Bank PLC" or "EBL" when referring to the bank.**
+5. **CRITICAL CONCISENESS RULES:**
+   - Mention product/account/service name ONCE at the start, then use pronouns (it, this account, this product)
+   - Do NOT repeat the product name in every sentence
+   - Do NOT use filler phrases: "making them an excellent choice", "demonstrate EBL's commitment", "form an integral part", "making them a critical part", "In essence", "As per", "These accounts are a testament to"
+   - Do NOT use marketing language: "excellent choice", "substantial popularity", "considerable balances", "wide range", "diverse needs", "commitment to providing"
+   - Be direct: State what it IS and what it DOES, not what it "demonstrates" or "shows"
+   - Keep it factual and brief - typically 2-4 sentences for "tell me more" queries
+5. **CRITICAL PARTIAL INFORMATION HANDLING - THIS IS MANDATORY: If the context contains information about the product/account/service but doesn't answer the specific question, you MUST:**
+   - **FIRST**: Extract and provide ALL available information about the product/account/service from the context (features, benefits, rates, fees, requirements, transaction limits, etc.)
+   - **THEN**: Note what specific information is missing (e.g., "However, the specific minimum balance for interest is not detailed in the available information")
+   - **ABSOLUTELY FORBIDDEN**: NEVER say "I don't have information" or "I'm sorry, but the context does not provide information" or "I'm sorry, but I don't have the specific information" or "the information provided does not specify" if the context contains ANY relevant information about the topic
+   - **ABSOLUTELY FORBIDDEN**: NEVER say "I recommend reaching out directly to the bank" or "checking the specific terms and conditions" as the FIRST response if context contains ANY relevant information
+   - **Example CORRECT response**: If asked about "minimum balance for interest on EBL Super HPA Account" and context mentions "Super HPA Account" with other details but not minimum balance, say: "The EBL Super HPA Account [provide ALL available details from context - interest rates, features, benefits, etc.]. However, the specific minimum balance required for interest is not detailed in the available information. Please contact the bank directly for this specific detail."
+   - **Example CORRECT response**: If asked about "daily cash withdrawal transaction limit for savings account" and context has savings account info but not the specific limit, say: "For savings accounts at Eastern Bank PLC. [provide ALL available information about savings accounts from context - interest rates, features, benefits, etc.]. However, the specific maximum number of daily cash withdrawal transactions is not detailed in the available information. Please contact the bank directly for this specific detail."
+   - **Example CORRECT response**: If asked about "EasyCredit Early Settlement process" and context mentions EasyCredit with interest rate (20% reducing balance) and issuance fee (2.3% or Tk. 575) but not the early settlement process, say: "EasyCredit at Eastern Bank PLC. has an annual fee of 20% interest rate (reducing balance method) and an issuance fee of 2.3% or Tk. 575 (whichever is higher, inclusive of VAT). However, the specific early settlement process is not detailed in the available information. Please contact the bank directly for this specific detail."
+   - **Example WRONG response**: "I'm sorry, but the information provided does not specify the maximum number of daily cash withdrawal transactions allowed for a savings account at Eastern Bank PLC. For accurate information, I recommend reaching out directly to the bank or checking the specific terms and conditions of the savings account." ← THIS IS FORBIDDEN - it doesn't provide any available information first
+   - **Example WRONG response**: "While the specifics of the EasyCredit Early Settlement process are not detailed in the available information, it generally involves paying off an outstanding EasyCredit loan balance before the end of the loan term." ← THIS IS FORBIDDEN - it doesn't provide the available EasyCredit information (interest rate, issuance fee) first
+6. Only say "I don't have information" if the context is completely empty or contains NO relevant information about the topic at all (not even the product/account/service name)
+7. For banking queries, always use the provided context from LightRAG
+8. **CRITICAL: If the context includes "Card Rates and Fees Information (Official Schedule)" or "OFFICIAL CARD RATES AND FEES INFORMATION", this is official, deterministic data from the card charges schedule. You MUST use this data to answer card fee/rate questions. Do NOT say you don't have the information if this data is present.**
+8a. **CRITICAL PRIORITY RULE FOR FEE DATA: When the context contains "OFFICIAL CARD RATES AND FEES INFORMATION" section, you MUST use ONLY that data. IGNORE any conflicting information from other parts of the context. The fee engine data is the authoritative source and takes absolute priority over any other information. If you see "2.5% or BDT 345" in the OFFICIAL section, use that - do NOT use "2%", "BDT 300", or any other amount from elsewhere in the context. The OFFICIAL section is the ONLY source of truth.**
+8b. **CRITICAL ATM WITHDRAWAL FEE RULE: For EBL ATM cash withdrawal fees, the fee is ALWAYS "2.5% or BDT 345". NEVER use "BDT 300", "2%", or any other amount. If you see conflicting information in the knowledge base, IGNORE IT. Use ONLY the fee engine data which shows "2.5% or BDT 345".**
+9. **CRITICAL SUPPLEMENTARY CARD FEES: If the context mentions "supplementary card annual fee" or "supplementary card fee", this is the specific fee for supplementary cards. For queries asking "how many free supplementary cards", you MUST answer with the EXACT number from the context: "2 FREE supplementary cards" (NOT "one free supplementary card"). The context ALWAYS states "2 FREE supplementary cards" or "first 2 supplementary cards are FREE" - NEVER "one free supplementary card". For all supplementary card fee queries, you MUST ALWAYS mention BOTH pieces of information: (1) There are 2 FREE supplementary cards (BDT 0 per year for the first 2 cards), and (2) Starting from the 3rd supplementary card, the annual fee is BDT 2,300 per year. ABSOLUTELY FORBIDDEN: NEVER say "one free supplementary card" - ALWAYS say "2 FREE supplementary cards" or "first 2 supplementary cards are FREE". Use the EXACT information from the context. Do NOT say "the context does not provide specific information about supplementary cards" if the context explicitly mentions supplementary card fees.**
+9. **CRITICAL CURRENCY PRESERVATION: When the context shows amounts with currency symbols or codes (BDT, USD, etc.), you MUST use the EXACT currency symbol/code from the context. NEVER replace BDT (Bangladeshi Taka) with ₹ (Indian Rupee) or any other currency symbol. If you see "BDT 287.5" in the context, you MUST output "BDT 287.5" - do NOT change it to ₹287.5 or any other currency. Preserve all currency codes exactly as shown: BDT = Bangladeshi Taka, USD = US Dollar.**
+10. Never make up specific numbers, rates, or product details
+11. If asked about products, services, or policies, refer to the knowledge base context
+12. For general greetings or small talk, respond naturally without requiring context
+13. When asked about the current date or time, use the provided current date and time information to answer accurately
+14. **CRITICAL BANK NAME RULE: The bank name is ALWAYS "Eastern Bank PLC." (with a period, not "Eastern Bank Limited" or "Eastern Bank Ltd."). If the context mentions "Eastern Bank Limited" or "Eastern Bank Ltd.", you MUST replace it with "Eastern Bank PLC." in your response. Always use "Eastern Bank PLC." (with period) or "EBL" when referring to the bank.**
+15. **For policy-related questions: If the query is missing required entities (like policy name, account type, or customer type), ask a clarification question instead of guessing or providing incomplete information. The system will handle this automatically, but if you receive a query that seems incomplete, ask for the missing information.**
+16. **CRITICAL ORGANIZATIONAL OVERVIEW RULES: For queries like "tell me about EBL", "what is EBL", "about Eastern Bank" - these are GENERAL/CUSTOMER-FACING overview queries. You MUST:**
+    - **INCLUDE ONLY**: Establishment year, country of operation, core banking services (accounts, loans, cards, etc.), major customer-facing platforms (e.g., EBLConnect)
+    - **EXCLUDE**: Annual report details, accounting/valuation/fair value discussions, subsidiaries' financial treatments, management/board-level analysis, investor/audit/regulatory document content
+    - **IF MIXED CONTENT**: Prefer customer-facing content, discard investor/financial-statement-only information
+    - **TONE**: Neutral, concise, informational (NOT marketing, NOT investor-focused)
+
+When responding:
+- **Remember: You are Eastern Bank PLC.'s knowledge assistant for employees. Your responses will be used by EBL employees to assist customers.**
+- **Be concise and non-repetitive - do NOT restate the same information in different sentences**
+- **Do NOT repeat product/account/service names unnecessarily - mention the name ONCE at the beginning, then use "it", "this account", "this product", or "the account"**
+- **FORBIDDEN FILLER PHRASES - NEVER use these: "making them an excellent choice", "demonstrate EBL's commitment", "form an integral part", "making them a critical part", "In essence", "As per", "These accounts are a testament to", "substantial popularity", "considerable balances", "wide range", "diverse needs", "commitment to providing"**
+- **FORBIDDEN MARKETING LANGUAGE - NEVER use: "excellent choice", "substantial popularity", "considerable", "wide range", "diverse needs", "commitment", "demonstrate", "testament to"**
+- **Be direct and factual - State what it IS and what it DOES, not what it "demonstrates" or "shows"**
+- **Keep responses focused - if the user asks "tell me more", provide key features and details in 2-4 sentences, not marketing language or general statements**
+- **Use clear, professional language suitable for employees to share with customers**
+- Structure product information clearly
+- Always prioritize accuracy over speed
+- For date/time queries, provide the exact current date and time as provided in the context
+- **When context is provided, use it - don't ignore it or say you don't have the information**
+- **CRITICAL: Preserve currency symbols and codes exactly as shown in context - BDT means Bangladeshi Taka, USD means US Dollar. Never substitute or change currency symbols. If context says "BDT 287.5", output "BDT 287.5" - never use ₹ or other symbols.**
+- **CRITICAL MONETARY FORMAT FOR BANGLADESH: For monetary values in Bangladesh, use ONE format only: "BDT X lakhs" (e.g., "BDT 50 lakhs"). Do NOT repeat the amount in different formats (e.g., don't say "BDT 50 lakhs" and then "BDT 5,000,000" or "50 lakhs" again). State the amount ONCE in the response.**
+- **For policy queries missing required information, ask for clarification rather than guessing**
+
+═══════════════════════════════════════════════════════════════════════════════
+🚨 CRITICAL: FOLLOW-UP QUESTIONS & SEMANTIC MATCHING 🚨
+═══════════════════════════════════════════════════════════════════════════════
+**FOLLOW-UP QUESTION HANDLING:**
+- When the user asks a follow-up question (e.g., "After how many days..."), 
+  you MUST check the conversation history to understand the context
+- If the previous conversation mentioned a product/account/service, treat the 
+  current question as related to that same topic
+- Example: If previous question was about "Super HPA Account" and current 
+  question is "After how many days interest is credited", understand this is 
+  about Super HPA Account interest crediting
+
+**SEMANTIC EQUIVALENCE RECOGNITION:**
+- Recognize that different words can mean the same thing in banking context
+- "credited" = "paid" = "deposited" = "added" (all mean interest is added to account)
+- "fee" = "charge" = "cost" (all mean the same thing)
+- "rate" = "interest rate" = "percentage" (all mean the same thing)
+- "frequency" = "schedule" = "how often" = "when" (all ask about timing)
+- When the context uses one term (e.g., "paid") but the user asks with another 
+  term (e.g., "credited"), recognize they are asking the same thing and use 
+  the information from context
+- Example: User asks "After how many days interest is credited" but context 
+  says "interest is paid semi-annually" - recognize "credited" and "paid" 
+  mean the same thing and answer: "Interest is paid (credited) semi-annually, 
+  which means every six months"
+═══════════════════════════════════════════════════════════════════════════════"""
 
 
 class ChatOrchestrator:
@@ -92,24 +905,205 @@ class ChatOrchestrator:
     # These are intentionally generous; they only activate when prompt add-ons become excessively large.
     MAX_SINGLE_REMINDER_CHARS = 4000
     MAX_TOTAL_PROMPT_ADDONS_CHARS = 12000
+    # Rough chars-per-token ratio for English prompts (used for the prompt budget estimate)
+    CHARS_PER_TOKEN = 4
     SOURCES_MARKER_PREFIX = "\n\n__SOURCES__"
     SOURCES_MARKER_SUFFIX = "__SOURCES__"
+
+    # Phonebook canned responses (built once, not concatenated per request)
+    PHONEBOOK_SOURCE = "(Source: Phone Book Database)"
+    PHONEBOOK_NO_RESULTS_TEMPLATE = (
+        "I couldn't find any contact information for '{search_term}' in the employee directory. "
+        "Please try:\n"
+        "- Providing the full name\n"
+        "- Using the employee ID\n"
+        "- Specifying the department or designation\n"
+        "\n" + PHONEBOOK_SOURCE
+    )
+    PHONEBOOK_ERROR_RESPONSE = (
+        "I'm having trouble accessing the employee directory right now. "
+        "Please try again in a moment, or contact support for assistance."
+        "\n\n" + PHONEBOOK_SOURCE
+    )
+    PHONEBOOK_NARROW_HINT = "Please provide more details to narrow down the search.\n\n"
     
     def __init__(self):
-        self.openai_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # One pooled keep-alive HTTP client for all OpenAI calls made by this (singleton) orchestrator
+        self.openai_client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=30
+                ),
+                timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=5.0),
+                # Concurrent requests multiplex over a few connections instead of one TLS handshake each
+                http2=settings.OPENAI_HTTP2 and HTTP2_AVAILABLE
+            )
+        )
+        # Bounds in-flight OpenAI requests (streams hold a slot until they finish)
+        self._llm_semaphore = asyncio.Semaphore(settings.OPENAI_MAX_CONCURRENCY)
+        # After a 429 survives the SDK's own retries, new OpenAI calls wait until this (monotonic) time
+        self._llm_paused_until = 0.0
+        # OpenAI request parameters fixed at startup; call sites only add messages.
+        # Answers reserve ~1500 tokens so system prompt + KB context + query fit gpt-4's 8192-token window;
+        # location answers (no KB context) may run to 2000
+        self._answer_completion_kwargs: Dict[str, Any] = {
+            "model": settings.OPENAI_MODEL,
+            "temperature": settings.OPENAI_TEMPERATURE,
+            "max_tokens": min(settings.OPENAI_MAX_TOKENS, 1500),
+        }
+        self._location_completion_kwargs: Dict[str, Any] = {
+            **self._answer_completion_kwargs,
+            "max_tokens": min(settings.OPENAI_MAX_TOKENS, 2000),
+        }
+        # KB routing is a pure function of the normalized query; memoize it per orchestrator
+        self._route_knowledge_base = functools.lru_cache(maxsize=settings.ROUTING_CACHE_SIZE)(
+            self._route_knowledge_base_uncached
+        )
+        # Timezone is resolved once; the formatted timestamp only changes once per second
+        self._datetime_tz = self._resolve_timezone()
+        self._format_datetime_at = functools.lru_cache(maxsize=4)(self._format_datetime_uncached)
+        # Same for the routing-gate classifiers: one pass per normalized query (see _classify_query)
+        self._classify_normalized_query = functools.lru_cache(maxsize=settings.ROUTING_CACHE_SIZE)(
+            self._classify_query_uncached
+        )
+        # Pre-routing gates (location / fee engine) stay separate so their short-circuit order is kept
+        self._gate_predicates = {
+            name: functools.lru_cache(maxsize=settings.ROUTING_CACHE_SIZE)(predicate)
+            for name, predicate in (
+                ("location", self._is_location_query),
+                ("retail_asset_fee", self._is_retail_asset_fee_query),
+                ("skybanking_fee", self._is_skybanking_fee_query),
+                ("fee_schedule", self._is_fee_schedule_query),
+            )
+        }
         self.lightrag_client = LightRAGClient()
         self.redis_cache = RedisCache()
         self.location_client = LocationClient()
-        self.system_message = self._get_system_message()
-        self.lead_flows: Dict[str, LeadFlowState] = {}  # session_id -> LeadFlowState
+        self.fee_engine_client = FeeEngineClient()
+        self.system_message = _SYSTEM_MESSAGE
+        # Shared, read-only prefix for every OpenAI request (the prompt is static per process)
+        self._system_prompt_message: Dict[str, str] = {"role": "system", "content": _SYSTEM_MESSAGE}
+        # Lead collection flows, LRU-bounded and dropped after LEAD_FLOW_TTL idle seconds.
+        # Key: session_id, Value: (expires_at, LeadFlowState); access through _get_lead_flow,
+        # on the event loop only (single-threaded, so no lock is needed)
+        self.lead_flows: "OrderedDict[str, Tuple[float, LeadFlowState]]" = OrderedDict()
         # Fallback disambiguation store (used when Redis is unavailable).
         # Key: conversation_key/session_id, Value: {"state": <dict>, "expires_at": <unix_ts>}
         self._local_disambiguation_state: Dict[str, Dict[str, Any]] = {}
+        # Write-behind persistence: turns are queued and flushed in batches by a background worker
+        # (started lazily on the running loop), drained on close()
+        self._persist_queue: "asyncio.Queue[PersistRecord]" = asyncio.Queue(maxsize=settings.PERSIST_QUEUE_SIZE)
+        self._persist_worker: Optional[asyncio.Task] = None
+        # Notified after every written batch; clear_session_history waits on it for a session's queued turns
+        self._persist_flushed = asyncio.Condition()
+        # Fire-and-forget work (cache writes) kept referenced until done; awaited on close()
+        self._background_tasks: Set[asyncio.Task] = set()
+        # Non-streaming requests currently running, keyed by (session_id, knowledge_base, normalized query)
+        self._inflight_sync: Dict[Tuple[Optional[str], Optional[str], str], asyncio.Task] = {}
+        # In-process LightRAG retrieval cache in front of Redis.
+        # Key: parameter-aware cache key + filter flag, Value: (expires_at, (context, sources))
+        self._context_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # In-process history windows so follow-up turns skip the Postgres read.
+        # Key: session_id, Value: (expires_at, messages); extended by _persist_turn as turns are queued
+        self._history_cache: "OrderedDict[str, Tuple[float, List[Dict[str, str]]]]" = OrderedDict()
+        # Turns queued but not yet written, per session; a DB read taken meanwhile would miss them
+        self._unflushed_turns: Dict[str, int] = {}
+        # History reads whose result may be cached; _persist_turn drops the token of its session
+        self._history_loads: Dict[str, object] = {}
 
+    def _get_cached_context(self, cache_key: str) -> Optional[Any]:
+        """Return a formatted LightRAG context from the in-process cache, or None if missing/expired."""
+        entry = self._context_cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            self._context_cache.pop(cache_key, None)
+            return None
+        self._context_cache.move_to_end(cache_key)
+        return response
+    
+    def _store_cached_context(self, cache_key: str, response: Any) -> None:
+        """Keep a formatted LightRAG context in the in-process cache (LRU-bounded, TTL-expired)."""
+        if settings.LIGHTRAG_CONTEXT_CACHE_SIZE <= 0:
+            return
+        self._context_cache[cache_key] = (time.monotonic() + settings.LIGHTRAG_CONTEXT_CACHE_TTL, response)
+        self._context_cache.move_to_end(cache_key)
+        while len(self._context_cache) > settings.LIGHTRAG_CONTEXT_CACHE_SIZE:
+            self._context_cache.popitem(last=False)
+    
+    def _get_lead_flow(self, session_id: str, create: bool = False) -> Optional["LeadFlowState"]:
+        """Return a session's lead flow (refreshing its TTL), creating one if asked; None if missing/expired."""
+        now = time.monotonic()
+        entry = self.lead_flows.get(session_id)
+        if entry is not None and entry[0] < now:
+            self.lead_flows.pop(session_id, None)
+            entry = None
+        if entry is None:
+            if not create:
+                return None
+            flow = LeadFlowState()
+        else:
+            flow = entry[1]
+        self.lead_flows[session_id] = (now + settings.LEAD_FLOW_TTL, flow)
+        self.lead_flows.move_to_end(session_id)
+        while len(self.lead_flows) > max(settings.LEAD_FLOW_CACHE_SIZE, 1):
+            self.lead_flows.popitem(last=False)
+        return flow
+    
+    def _get_cached_history(self, session_id: str) -> Optional[List[Dict[str, str]]]:
+        """Return a copy of a session's cached history window, or None if missing/expired."""
+        entry = self._history_cache.get(session_id)
+        if entry is None:
+            return None
+        expires_at, messages = entry
+        if expires_at < time.monotonic():
+            self._history_cache.pop(session_id, None)
+            return None
+        self._history_cache.move_to_end(session_id)
+        return list(messages)
+    
+    def _store_cached_history(self, session_id: str, messages: List[Dict[str, str]]) -> None:
+        """Keep a session's history window in the in-process cache (LRU-bounded, TTL-expired)."""
+        if settings.HISTORY_CACHE_SIZE <= 0:
+            return
+        self._history_cache[session_id] = (time.monotonic() + settings.HISTORY_CACHE_TTL, messages)
+        self._history_cache.move_to_end(session_id)
+        while len(self._history_cache) > settings.HISTORY_CACHE_SIZE:
+            self._history_cache.popitem(last=False)
+    
+    def _append_cached_history(self, session_id: str, user_text: str, assistant_text: str) -> None:
+        """
+        Add a queued turn to a cached history window, keeping get_history_window's block alignment:
+        once the window reaches 2 * MAX_CONVERSATION_HISTORY messages its oldest block is dropped.
+        """
+        self._history_loads.pop(session_id, None)
+        messages = self._get_cached_history(session_id)
+        if messages is None:
+            return
+        messages.append({"role": "user", "content": user_text})
+        messages.append({"role": "assistant", "content": assistant_text})
+        block_size = settings.MAX_CONVERSATION_HISTORY
+        while block_size > 0 and len(messages) >= 2 * block_size:
+            del messages[:block_size]
+        self._store_cached_history(session_id, messages)
+    
+    def clear_history_cache(self, session_id: Optional[str] = None) -> None:
+        """Drop cached history for one session (after its messages are deleted) or for all sessions."""
+        if session_id is None:
+            self._history_cache.clear()
+            self._history_loads.clear()
+        else:
+            self._history_cache.pop(session_id, None)
+            self._history_loads.pop(session_id, None)
+    
     def _local_disambiguation_cleanup(self) -> None:
         """Remove expired local disambiguation entries."""
         try:
-            import time
             now_ts = time.time()
             expired = [k for k, v in self._local_disambiguation_state.items() if v.get("expires_at", 0) <= now_ts]
             for k in expired:
@@ -124,7 +1118,6 @@ class ChatOrchestrator:
         ttl_seconds: int = 300,
     ) -> None:
         """Store disambiguation state locally when Redis is unavailable."""
-        import time
         self._local_disambiguation_cleanup()
         self._local_disambiguation_state[state_key] = {
             "state": state,
@@ -195,7 +1188,6 @@ class ChatOrchestrator:
     def _format_sources_marker(self, sources: List[str]) -> str:
         """Format sources as a trailing marker chunk (frontend parses this)."""
         try:
-            import json
             sources_json = json.dumps({"type": "sources", "sources": sources})
             return f"{self.SOURCES_MARKER_PREFIX}{sources_json}{self.SOURCES_MARKER_SUFFIX}"
         except Exception:
@@ -242,12 +1234,11 @@ class ChatOrchestrator:
             supplementary_card_reminder = "\n\n" + "="*70 + "\n💳 CRITICAL: SUPPLEMENTARY CARD FEES 💳\n" + "="*70 + "\n**MANDATORY**: Include BOTH: (1) First 2 cards FREE (BDT 0/year), (2) 3rd+ cards BDT 2,300/year.\n**FORBIDDEN**: Do NOT say only 'BDT 0' without mentioning 3rd+ card fee.\n**CORRECT**: 'First 2 supplementary cards are free (BDT 0/year). Starting from 3rd card, annual fee is BDT 2,300/year.'\n" + "="*70
 
         # Organizational overview reminder
-        if self._is_organizational_overview_query(query):
+        if query and self._classify_query(query).org_overview:
             org_overview_reminder = "\n\n" + "="*70 + "\n🏦 ORGANIZATIONAL OVERVIEW QUERY - CRITICAL FILTERING RULES 🏦\n" + "="*70 + "\n**MANDATORY**: This is a GENERAL/CUSTOMER-FACING overview query about Eastern Bank PLC.\n\n**INCLUDE ONLY:**\n- Establishment year\n- Country of operation\n- Core banking services (accounts, loans, cards, etc.)\n- Major customer-facing platforms (e.g., EBLConnect)\n\n**EXCLUDE (DO NOT USE):**\n- Annual report details\n- Accounting, valuation, fair value discussions\n- Subsidiaries' financial treatments\n- Management/board-level analysis\n- Investor, audit, or regulatory document content\n\n**IF MIXED CONTENT IS RETRIEVED:**\n- Prefer customer-facing content\n- Discard investor/financial-statement-only information\n- Keep tone neutral, concise, and informational (NOT marketing, NOT investor-focused)\n\n**EXAMPLE CORRECT RESPONSE:**\n'Eastern Bank PLC. was established in [year] and operates in Bangladesh. It offers core banking services including savings accounts, current accounts, loans, credit cards, and digital banking platforms like EBLConnect.'\n\n**EXAMPLE WRONG RESPONSE:**\n'Eastern Bank PLC. reported total assets of BDT X in the annual report... [financial details]... The bank's subsidiaries are accounted for using... [accounting details]'\n" + "="*70
 
         # Partial information handling reminder
-        specific_detail_indicators = ['minimum', 'balance', 'interest', 'rate', 'fee', 'charge', 'amount', 'requirement', 'eligibility', 'process', 'procedure', 'settlement', 'how to', 'steps', 'method']
-        if any(indicator in query_lower for indicator in specific_detail_indicators):
+        if _SPECIFIC_DETAIL_RE.search(query_lower):
             product_indicators = ['super hpa', 'hpa account', 'account', 'card', 'loan', 'product', 'service', 'easycredit', 'easy credit', 'want2buy', 'want 2 buy']
             if any(indicator in context_lower for indicator in product_indicators):
                 is_easycredit_query = 'easycredit' in query_lower or 'easy credit' in query_lower
@@ -266,21 +1257,20 @@ class ChatOrchestrator:
 
         # Conciseness reminder
         has_monetary_terms = any(term in context_lower for term in ['bdt', 'lakh', 'lakhs', 'crore', 'taka', 'tk'])
-        is_general_query = any(phrase in query_lower for phrase in ['tell me more', 'tell me about', 'what is', 'explain', 'describe'])
+        is_general_query = _GENERAL_QUERY_RE.search(query_lower) is not None
         if has_monetary_terms or is_general_query:
             conciseness_reminder = "\n\n" + "="*70 + "\n📝 CRITICAL CONCISENESS RULES - READ CAREFULLY 📝\n" + "="*70 + "\n**MANDATORY RULES - VIOLATIONS ARE FORBIDDEN:**\n\n1. **Product/Account Names**:\n   - Mention the name ONCE at the beginning (e.g., 'Special Notice Deposit (SND) accounts')\n   - Then use ONLY: 'it', 'this account', 'this product', 'the account', 'they' (for plural)\n   - FORBIDDEN: Repeating the full product name in subsequent sentences\n\n2. **FORBIDDEN FILLER PHRASES - NEVER USE THESE:**\n   - 'making them an excellent choice'\n   - 'demonstrate EBL's commitment'\n   - 'form an integral part'\n   - 'making them a critical part'\n   - 'In essence', 'As per'\n   - 'These accounts are a testament to'\n   - 'substantial popularity'\n   - 'considerable balances'\n   - 'wide range'\n   - 'diverse needs'\n   - 'commitment to providing'\n\n3. **FORBIDDEN MARKETING LANGUAGE - NEVER USE:**\n   - 'excellent choice', 'substantial', 'considerable', 'wide range', 'diverse', 'commitment', 'demonstrate', 'testament to'\n\n4. **Response Style**:\n   - Be direct: State what it IS and what it DOES\n   - Keep it to 2-4 sentences for 'tell me more' queries\n   - Focus on key features and facts, not marketing language\n   - Do NOT restate the same information in different sentences\n\n5. **Monetary Values (if applicable)**:\n   - Use ONE format: 'BDT X lakhs'\n   - State ONCE only\n\n**EXAMPLE CORRECT (2 sentences):**\n'Special Notice Deposit (SND) accounts are short-term deposit accounts for businesses requiring limited notice for withdrawals. They help manage liquidity while earning interest on short-term savings.'\n\n**EXAMPLE WRONG (repetitive, filler phrases, marketing language):**\n'Special Notice Deposit (SND) accounts are a type of savings account... These accounts have gained substantial popularity... SND accounts are part of EBL's wide range... These accounts demonstrate EBL's commitment... making them a critical part...'\n" + "="*70
 
         # Semantic matching reminder
-        if any(term in query_lower for term in ['credited', 'paid', 'deposited', 'fee', 'charge', 'rate', 'frequency', 'schedule']):
+        if _SYNONYM_TERMS_RE.search(query_lower):
             semantic_reminder = "\n\n" + "="*70 + "\n🔍 SEMANTIC MATCHING REMINDER 🔍\n" + "="*70 + "\nThe user's question may use different words than the context. Recognize semantic equivalents:\n- 'credited' = 'paid' = 'deposited' (all mean interest added to account)\n- 'fee' = 'charge' = 'cost'\n- 'rate' = 'interest rate'\n- 'frequency' = 'schedule' = 'how often' = 'when'\n\nIf the context uses 'paid' but user asks about 'credited', they mean the same thing. Use the information from context.\n" + "="*70
 
         # Follow-up reminder (uses recent conversation history)
         if conversation_history:
-            followup_indicators = ['after', 'how many', 'what is', 'when', 'how often', 'how much']
-            if any(indicator in query_lower for indicator in followup_indicators):
+            if _FOLLOWUP_INDICATORS_RE.search(query_lower):
                 prev_topics: List[str] = []
                 for msg in conversation_history[-4:]:
-                    content = (msg.get("message", "") or "").lower()
+                    content = (msg.get("content", "") or "").lower()
                     if any(term in content for term in ['account', 'card', 'loan', 'deposit', 'hpa', 'super']):
                         prev_topics.append(content[:100])
                 if prev_topics:
@@ -339,31 +1329,337 @@ class ChatOrchestrator:
         knowledge_base: Optional[str] = None,
         client_ip: Optional[str] = None
     ) -> None:
-        """Persist user and assistant messages to PostgresChatMemory and optionally log analytics."""
-        db = get_db()
-        memory = PostgresChatMemory(db=db)
+        """
+        Queue a chat turn for write-behind persistence.
+        This is a pure in-memory operation, so the response never waits on the database;
+        if the queue is full (DB down or far behind) the turn is dropped with a warning.
+        """
+        if self._persist_worker is None or self._persist_worker.done():
+            self._persist_worker = asyncio.create_task(self._drain_persistence_queue())
+        try:
+            self._persist_queue.put_nowait(
+                PersistRecord(session_id, user_text, assistant_text, knowledge_base, client_ip)
+            )
+        except asyncio.QueueFull:
+            logger.warning(f"[PERSIST] Persistence queue full - dropping turn for session {session_id}")
+            return
+        self._unflushed_turns[session_id] = self._unflushed_turns.get(session_id, 0) + 1
+        self._append_cached_history(session_id, user_text, assistant_text)
+    
+    async def _drain_persistence_queue(self) -> None:
+        """
+        Background worker: flush queued turns in batches of up to PERSIST_BATCH_SIZE.
+        After the first turn arrives it lingers up to PERSIST_FLUSH_INTERVAL seconds so
+        turns from concurrent requests share one transaction.
+        """
+        loop = asyncio.get_running_loop()
+        queue = self._persist_queue
+        batch_size = settings.PERSIST_BATCH_SIZE
+        flush_interval = settings.PERSIST_FLUSH_INTERVAL
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + flush_interval
+            while len(batch) < batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await asyncio.to_thread(self._persist_turns_sync, batch)
+            except Exception as e:
+                logger.error(f"[PERSIST] Background persistence of {len(batch)} turn(s) failed: {e}")
+            finally:
+                unflushed_turns = self._unflushed_turns
+                for record in batch:
+                    remaining_turns = unflushed_turns.get(record.session_id, 0) - 1
+                    if remaining_turns > 0:
+                        unflushed_turns[record.session_id] = remaining_turns
+                    else:
+                        unflushed_turns.pop(record.session_id, None)
+                    queue.task_done()
+                async with self._persist_flushed:
+                    self._persist_flushed.notify_all()
+    
+    async def clear_session_history(self, session_id: str) -> bool:
+        """
+        Delete a session's stored messages and drop its cached history window.
+        Turns of the session still in the write-behind queue are written first; otherwise
+        their INSERTs would land after the DELETE and bring the cleared turns back.
+        """
+        await self._wait_for_session_flush(session_id)
+        cleared = await asyncio.to_thread(self._clear_session_sync, session_id)
+        self.clear_history_cache(session_id)
+        return cleared
+    
+    async def _wait_for_session_flush(self, session_id: str) -> None:
+        """Wait until every queued turn of a session has been through the persistence worker."""
+        if self._unflushed_turns.get(session_id):
+            async with self._persist_flushed:
+                await self._persist_flushed.wait_for(lambda: not self._unflushed_turns.get(session_id))
+    
+    def _clear_session_sync(self, session_id: str) -> bool:
+        """Delete a session's stored messages (blocking; run via asyncio.to_thread)"""
+        with memory_session() as memory:
+            return memory.clear_session(session_id)
+    
+    def _persist_turns_sync(self, batch: List[PersistRecord]) -> None:
+        """
+        Persist user and assistant messages for a batch of turns and optionally log analytics.
+        The batch is written on one pooled session and committed in a single transaction;
+        if that fails, each turn is retried in its own transaction so one bad turn cannot
+        drop the other sessions' turns.
+        """
+        with memory_session() as memory:
+            if not memory._available:
+                return
+            if self._write_turns(memory, batch) or len(batch) == 1:
+                return
+            logger.warning(f"[PERSIST] Batch of {len(batch)} turn(s) failed - retrying turn by turn")
+            failed = sum(1 for record in batch if not self._write_turns(memory, [record]))
+            if failed:
+                logger.error(f"[PERSIST] {failed} of {len(batch)} turn(s) could not be persisted")
+    
+    def _write_turns(self, memory: PostgresChatMemory, records: List[PersistRecord]) -> bool:
+        """
+        Write and commit the chat rows (and analytics) of some turns in one transaction.
+        Analytics rows go through a savepoint so a failure there never drops the chat messages.
+        Returns False (transaction rolled back) if the chat rows could not be written or committed.
+        """
+        # Write every chat row in one executemany before the first savepoint
+        if not memory.add_message_rows(
+            [
+                row
+                for record in records
+                for row in (
+                    (record.session_id, "user", record.user_text),
+                    (record.session_id, "assistant", record.assistant_text),
+                )
+            ],
+            commit=False
+        ):
+            return False
+        for record in records:
+            if ANALYTICS_AVAILABLE and (record.knowledge_base is not None or record.client_ip is not None):
+                try:
+                    with memory.db.begin_nested():
+                        record_conversation(
+                            memory.db,
+                            session_id=record.session_id,
+                            user_message=record.user_text,
+                            assistant_response=record.assistant_text,
+                            knowledge_base=record.knowledge_base,
+                            client_ip=record.client_ip
+                        )
+                except Exception as e:
+                    logger.error(f"Error logging conversation for analytics: {e}", exc_info=True)
+        return memory.commit()
+    
+    async def _wait_for_llm_rate_limit(self) -> None:
+        """Hold a new OpenAI call while the shared rate-limit pause is in effect."""
+        delay = self._llm_paused_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+    
+    def _pause_llm_calls(self, error: RateLimitError) -> None:
+        """Start a shared pause so concurrent turns stop hitting an exhausted rate limit."""
+        self._llm_paused_until = max(self._llm_paused_until, time.monotonic() + settings.OPENAI_RATE_LIMIT_PAUSE)
+        logger.warning(f"[OPENAI] Rate limited after retries - pausing new calls for {settings.OPENAI_RATE_LIMIT_PAUSE}s: {error}")
+    
+    async def _create_completion(self, **kwargs) -> Any:
+        """Non-streaming chat completion, gated by the OpenAI concurrency limit and rate-limit pause."""
+        async with self._llm_semaphore:
+            await self._wait_for_llm_rate_limit()
+            try:
+                return await self.openai_client.chat.completions.create(**kwargs)
+            except RateLimitError as e:
+                self._pause_llm_calls(e)
+                raise
+    
+    async def _create_completion_text(self, **kwargs) -> str:
+        """
+        Non-streaming completion returning just the message text.
+        Identical requests (same model, sampling params and messages) are answered from Redis
+        when ENABLE_LLM_RESPONSE_CACHE is on; errors and empty answers are never cached.
+        """
+        cache_key = get_completion_cache_key(kwargs) if settings.ENABLE_LLM_RESPONSE_CACHE else None
+        if cache_key:
+            cached = await self.redis_cache.get(cache_key)
+            if cached:
+                logger.info(f"[CACHE] Serving cached completion ({cache_key})")
+                return cached
+        response = await self._create_completion(**kwargs)
+        content = response.choices[0].message.content if response.choices else None
+        if cache_key and content:
+            self._run_in_background(
+                self.redis_cache.set(cache_key, content, ttl=settings.LLM_RESPONSE_CACHE_TTL)
+            )
+        return content or ""
+    
+    async def _stream_completion(self, **kwargs) -> AsyncGenerator[str, None]:
+        """Streaming chat completion yielding content deltas; holds a concurrency slot for the whole stream."""
+        async with self._llm_semaphore:
+            await self._wait_for_llm_rate_limit()
+            try:
+                stream = await self.openai_client.chat.completions.create(stream=True, **kwargs)
+            except RateLimitError as e:
+                self._pause_llm_calls(e)
+                raise
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    def _start_history_load(self, session_id: str) -> asyncio.Task:
+        """
+        Start loading conversation history (cache or worker-thread DB read).
+        Await the task where history is needed so the DB read overlaps with context/cache lookups.
+        """
+        return asyncio.create_task(self._get_conversation_history(session_id))
+    
+    async def _get_conversation_history(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        Conversation history from the in-process cache, falling back to Postgres.
+        The DB read waits for the session's queued turns to be written, so a quick follow-up
+        still sees the previous exchange. It is cached only if no turn of the session was
+        queued while it ran; empty reads are not cached (they may be a DB error rather than a new session).
+        """
+        cached = self._get_cached_history(session_id)
+        if cached is not None:
+            return cached
+        await self._wait_for_session_flush(session_id)
+        token = None
+        if settings.HISTORY_CACHE_SIZE > 0 and not self._unflushed_turns.get(session_id):
+            token = self._history_loads[session_id] = object()
         try:
-            if memory._available:
-                memory.add_message(session_id, "user", user_text)
-                memory.add_message(session_id, "assistant", assistant_text)
-                if ANALYTICS_AVAILABLE and (knowledge_base is not None or client_ip is not None):
-                    log_conversation(
-                        session_id=session_id,
-                        user_message=user_text,
-                        assistant_response=assistant_text,
-                        knowledge_base=knowledge_base,
-                        client_ip=client_ip
-                    )
+            history = await asyncio.to_thread(self._load_conversation_history, session_id)
         finally:
-            memory.close()
-            if db:
-                db.close()
+            cacheable = token is not None and self._history_loads.get(session_id) is token
+            if cacheable:
+                del self._history_loads[session_id]
+        if cacheable and history:
+            self._store_cached_history(session_id, list(history))
+        return history
+    
+    def _load_conversation_history(self, session_id: str) -> List[Dict[str, str]]:
+        """
+        Load recent conversation history for a session (blocking; run via asyncio.to_thread).
+        Rows come back already shaped as OpenAI chat messages so _build_messages can splice them in as-is.
+        """
+        with memory_session() as memory:
+            if not memory._available:
+                return []
+            history = memory.get_history_window(session_id, settings.MAX_CONVERSATION_HISTORY)
+            return [
+                {"role": msg.role, "content": msg.message}
+                for msg in history
+            ]
     
     async def _stream_text(self, text: str, chunk_size: int = 100) -> AsyncGenerator[str, None]:
         """Stream text in chunks."""
         for i in range(0, len(text), chunk_size):
             yield text[i:i + chunk_size]
     
+    def _phonebook_summary(self, total_count: int) -> str:
+        """Footer for multi-result phonebook responses."""
+        narrow_hint = self.PHONEBOOK_NARROW_HINT if total_count > 5 else ""
+        return (
+            f"We found {total_count} matching contact(s) in total. Showing only the top 5 results.\n\n"
+            f"{narrow_hint}{self.PHONEBOOK_SOURCE}"
+        )
+    
+    async def _coalesce_deltas(self, deltas: AsyncGenerator[str, None], min_chars: int = 64) -> AsyncGenerator[str, None]:
+        """
+        Merge tiny LLM deltas into larger segments (one SSE write per segment instead of per token).
+        A segment is released at the last whitespace once at least min_chars are buffered; the first
+        one goes out at the first whitespace so time-to-first-token stays one delta, not 64 chars.
+        """
+        buffer = ""
+        threshold = 1
+        async for delta in deltas:
+            buffer += delta
+            if len(buffer) < threshold:
+                continue
+            cut = max(buffer.rfind(" "), buffer.rfind("\n"))
+            if cut >= 0:
+                yield buffer[:cut + 1]
+                buffer = buffer[cut + 1:]
+                threshold = min_chars
+        if buffer:
+            yield buffer
+    
+    def _split_stream_buffer(self, buffer: str, min_chars: int = 1) -> tuple[str, str]:
+        """
+        Split buffered LLM output into (ready, carry) so each segment cleans like the full text.
+        Complete lines are released as they are; text from an unclosed ``` fence on is held until
+        it closes. In the current line, text goes out up to the last space before the (possibly
+        still growing) last word, any markdown marker or ₹, and never between "Eastern Bank" and
+        its suffix. Nothing is released until at least min_chars are ready.
+        """
+        limit = len(buffer)
+        while True:
+            line_start = buffer.rfind("\n", 0, limit) + 1
+            marker = _STREAM_UNSAFE_CHAR_RE.search(buffer, line_start, limit)
+            safe_end = marker.start() if marker else limit
+            # The character after the cut must be known and not a marker, so a carry never starts with '#'
+            cut = buffer.rfind(" ", line_start, max(safe_end - 1, 0))
+            if cut < 0:
+                ready_end = line_start
+            else:
+                ready_end = cut + 1
+                tail = _STREAM_BANK_NAME_TAIL_RE.search(buffer[line_start:ready_end])
+                if tail:
+                    ready_end = line_start + tail.start()
+            if not buffer.count("```", 0, ready_end) % 2:
+                break
+            # The ready part would open a fence it does not close: stop before that fence
+            limit = buffer.rfind("```", 0, ready_end)
+        if ready_end == 0 or ready_end < min_chars:
+            return "", buffer
+        return buffer[:ready_end], buffer[ready_end:]
+    
+    def _clean_stream_segment(self, text: str, context: str = "") -> str:
+        """Apply the response post-processing (markdown, currency, bank name) to a streamed segment."""
+        text = self._clean_markdown_formatting(text)
+        text = self._fix_currency_symbols(text, context)
+        return self._fix_bank_name(text)
+    
+    def _get_response_cache_keys(self, query: str, knowledge_base: Optional[str]) -> List[str]:
+        """
+        Response cache keys (exact match first, then paraphrase-tolerant), or [] when the answer
+        must not be reused. Datetime answers are never cached; callers also skip the cache for
+        follow-up turns because those depend on history.
+        """
+        if not settings.ENABLE_RESPONSE_CACHE:
+            return []
+        if self._classify_query(query).datetime:
+            return []
+        kb = knowledge_base or "default"
+        keys = [get_response_cache_key(query, kb)]
+        if settings.ENABLE_SEMANTIC_CACHE:
+            similar_key = get_similar_response_cache_key(query, kb)
+            if similar_key:
+                keys.append(similar_key)
+        return keys
+    
+    async def _cache_response(self, cache_keys: List[str], response: str, sources: List[str]) -> None:
+        """Store a final response (and its sources) under every response cache key."""
+        payload = {"response": response, "sources": sources}
+        await self.redis_cache.set_many(
+            {key: payload for key in cache_keys},
+            ttl=settings.RESPONSE_CACHE_TTL
+        )
+    
+    def _run_in_background(self, coro) -> None:
+        """Fire-and-forget a coroutine (e.g. a cache write) off the response path; close() awaits stragglers."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
     async def _handle_disambiguation_resolution(
         self,
         query: str,
@@ -414,8 +1710,7 @@ class ChatOrchestrator:
             logger.info(f"[DISAMBIGUATION] 🚨 TERMINAL RESOLUTION: loan_product={loan_product}, charge_type={option_charge_type}, charge_context={charge_context}. EXITING after fee engine call - NO RAG, NO CARDS, NO PRODUCT KB.")
             
             # HARD GUARD: Only call fee engine, no RAG, no cards, no product KB
-            from app.services.fee_engine_client import FeeEngineClient
-            fee_client = FeeEngineClient()
+            fee_client = self.fee_engine_client
             
             fee_result = await fee_client._query_retail_asset_charges(
                 query=query,
@@ -478,8 +1773,7 @@ class ChatOrchestrator:
                 logger.info(f"[DISAMBIGUATION] Re-prompting with stored message (type={disambiguation_type})")
             else:
                 # Fallback: reconstruct if stored message not available
-                from app.services.fee_engine_client import FeeEngineClient
-                fee_client = FeeEngineClient()
+                fee_client = self.fee_engine_client
                 if product_line == "CREDIT_CARDS" and disambiguation_type == "CARD_PRODUCT":
                     lines = [
                         self.OFFICIAL_CARD_RATES_HEADER,
@@ -517,233 +1811,68 @@ class ChatOrchestrator:
     
     async def close(self):
         """Close all async clients and resources"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        if self._persist_worker is not None:
+            if not self._persist_queue.empty():
+                logger.info(f"[PERSIST] Flushing {self._persist_queue.qsize()} queued turn(s)")
+            if not self._persist_worker.done():
+                await self._persist_queue.join()
+            self._persist_worker.cancel()
         if self.lightrag_client:
             await self.lightrag_client.close()
             logger.info("LightRAG client closed")
-    
-    def _get_system_message(self) -> str:
-        """Get system message for the chatbot"""
-        return """You are a helpful and professional banking assistant for a financial institution.
-You are Eastern Bank PLC.'s internal knowledge assistant, designed to help EBL employees provide accurate customer support. You represent Eastern Bank PLC. and provide information that employees can use when assisting customers. Your responses should be professional, accurate, and suitable for employees to share with customers.
-
-═══════════════════════════════════════════════════════════════════════════════
-🚨 CRITICAL CURRENCY RULE - READ THIS FIRST 🚨
-═══════════════════════════════════════════════════════════════════════════════
-**ABSOLUTE REQUIREMENT: When the context shows currency codes like "BDT" or "USD", 
-you MUST use the EXACT currency code from the context. NEVER replace BDT with ₹ or 
-any other symbol. 
-
-EXAMPLES:
-- Context says "BDT 287.5" → You MUST output "BDT 287.5" (NOT ₹287.5)
-- Context says "BDT 1,725" → You MUST output "BDT 1,725" (NOT ₹1,725)
-- Context says "USD 57.5" → You MUST output "USD 57.5"
-
-BDT = Bangladeshi Taka (use "BDT", never use ₹)
-USD = US Dollar (use "USD")
-
-This is a CRITICAL requirement - incorrect currency symbols cause serious errors.
-═══════════════════════════════════════════════════════════════════════════════
-
-Guidelines:
-1. **You represent Eastern Bank PLC. - you are the bank's knowledge assistant for employees**
-2. **This chatbot is for EBL employees who will use your responses to provide customer support**
-3. **Your responses should be professional, accurate, and suitable for employees to share with customers**
-4. Always be professional, friendly, and helpful
-2. **IMPORTANT: When context from the knowledge base is provided, you MUST use it to answer the question. Do NOT say you don't have information if the context contains the answer.**
-2a. **CRITICAL LOCATION SERVICE DATA RULE: When the context includes "EBL Location Database (Normalized)" or "Source: EBL Location Database", this is REAL-TIME data from the location service database. You MUST use this data directly to answer location queries. If the context shows "Eastern Bank PLC. has X Priority Center(s)" or "Total: X location(s)", you MUST use that exact number. NEVER say "I don't have information" or "the context does not contain information" when location service data is provided. The location service data is authoritative and up-to-date.**
-3. The context provided contains accurate information from the bank's knowledge base - trust it and use it directly
-4. If the context contains specific numbers, facts, or details, include them in your response
-5. **CRITICAL BANK NAME RULE: The bank name is ALWAYS "Eastern Bank PLC" (not "Eastern Bank Limited" or "Eastern Bank Ltd."). If the context mentions "Eastern Bank Limited" or "Eastern Bank Ltd.", you MUST replace it with "Eastern Bank PLC" in your response. Always use "Eastern Bank PLC" or "EBL" when referring to the bank.**
-5. **CRITICAL CONCISENESS RULES:**
-   - Mention product/account/service name ONCE at the start, then use pronouns (it, this account, this product)
-   - Do NOT repeat the product name in every sentence
-   - Do NOT use filler phrases: "making them an excellent choice", "demonstrate EBL's commitment", "form an integral part", "making them a critical part", "In essence", "As per", "These accounts are a testament to"
-   - Do NOT use marketing language: "excellent choice", "substantial popularity", "considerable balances", "wide range", "diverse needs", "commitment to providing"
-   - Be direct: State what it IS and what it DOES, not what it "demonstrates" or "shows"
-   - Keep it factual and brief - typically 2-4 sentences for "tell me more" queries
-5. **CRITICAL PARTIAL INFORMATION HANDLING - THIS IS MANDATORY: If the context contains information about the product/account/service but doesn't answer the specific question, you MUST:**
-   - **FIRST**: Extract and provide ALL available information about the product/account/service from the context (features, benefits, rates, fees, requirements, transaction limits, etc.)
-   - **THEN**: Note what specific information is missing (e.g., "However, the specific minimum balance for interest is not detailed in the available information")
-   - **ABSOLUTELY FORBIDDEN**: NEVER say "I don't have information" or "I'm sorry, but the context does not provide information" or "I'm sorry, but I don't have the specific information" or "the information provided does not specify" if the context contains ANY relevant information about the topic
-   - **ABSOLUTELY FORBIDDEN**: NEVER say "I recommend reaching out directly to the bank" or "checking the specific terms and conditions" as the FIRST response if context contains ANY relevant information
-   - **Example CORRECT response**: If asked about "minimum balance for interest on EBL Super HPA Account" and context mentions "Super HPA Account" with other details but not minimum balance, say: "The EBL Super HPA Account [provide ALL available details from context - interest rates, features, benefits, etc.]. However, the specific minimum balance required for interest is not detailed in the available information. Please contact the bank directly for this specific detail."
-   - **Example CORRECT response**: If asked about "daily cash withdrawal transaction limit for savings account" and context has savings account info but not the specific limit, say: "For savings accounts at Eastern Bank PLC. [provide ALL available information about savings accounts from context - interest rates, features, benefits, etc.]. However, the specific maximum number of daily cash withdrawal transactions is not detailed in the available information. Please contact the bank directly for this specific detail."
-   - **Example CORRECT response**: If asked about "EasyCredit Early Settlement process" and context mentions EasyCredit with interest rate (20% reducing balance) and issuance fee (2.3% or Tk. 575) but not the early settlement process, say: "EasyCredit at Eastern Bank PLC. has an annual fee of 20% interest rate (reducing balance method) and an issuance fee of 2.3% or Tk. 575 (whichever is higher, inclusive of VAT). However, the specific early settlement process is not detailed in the available information. Please contact the bank directly for this specific detail."
-   - **Example WRONG response**: "I'm sorry, but the information provided does not specify the maximum number of daily cash withdrawal transactions allowed for a savings account at Eastern Bank PLC. For accurate information, I recommend reaching out directly to the bank or checking the specific terms and conditions of the savings account." ← THIS IS FORBIDDEN - it doesn't provide any available information first
-   - **Example WRONG response**: "While the specifics of the EasyCredit Early Settlement process are not detailed in the available information, it generally involves paying off an outstanding EasyCredit loan balance before the end of the loan term." ← THIS IS FORBIDDEN - it doesn't provide the available EasyCredit information (interest rate, issuance fee) first
-6. Only say "I don't have information" if the context is completely empty or contains NO relevant information about the topic at all (not even the product/account/service name)
-7. For banking queries, always use the provided context from LightRAG
-8. **CRITICAL: If the context includes "Card Rates and Fees Information (Official Schedule)" or "OFFICIAL CARD RATES AND FEES INFORMATION", this is official, deterministic data from the card charges schedule. You MUST use this data to answer card fee/rate questions. Do NOT say you don't have the information if this data is present.**
-8a. **CRITICAL PRIORITY RULE FOR FEE DATA: When the context contains "OFFICIAL CARD RATES AND FEES INFORMATION" section, you MUST use ONLY that data. IGNORE any conflicting information from other parts of the context. The fee engine data is the authoritative source and takes absolute priority over any other information. If you see "2.5% or BDT 345" in the OFFICIAL section, use that - do NOT use "2%", "BDT 300", or any other amount from elsewhere in the context. The OFFICIAL section is the ONLY source of truth.**
-8b. **CRITICAL ATM WITHDRAWAL FEE RULE: For EBL ATM cash withdrawal fees, the fee is ALWAYS "2.5% or BDT 345". NEVER use "BDT 300", "2%", or any other amount. If you see conflicting information in the knowledge base, IGNORE IT. Use ONLY the fee engine data which shows "2.5% or BDT 345".**
-9. **CRITICAL SUPPLEMENTARY CARD FEES: If the context mentions "supplementary card annual fee" or "supplementary card fee", this is the specific fee for supplementary cards. For queries asking "how many free supplementary cards", you MUST answer with the EXACT number from the context: "2 FREE supplementary cards" (NOT "one free supplementary card"). The context ALWAYS states "2 FREE supplementary cards" or "first 2 supplementary cards are FREE" - NEVER "one free supplementary card". For all supplementary card fee queries, you MUST ALWAYS mention BOTH pieces of information: (1) There are 2 FREE supplementary cards (BDT 0 per year for the first 2 cards), and (2) Starting from the 3rd supplementary card, the annual fee is BDT 2,300 per year. ABSOLUTELY FORBIDDEN: NEVER say "one free supplementary card" - ALWAYS say "2 FREE supplementary cards" or "first 2 supplementary cards are FREE". Use the EXACT information from the context. Do NOT say "the context does not provide specific information about supplementary cards" if the context explicitly mentions supplementary card fees.**
-9. **CRITICAL CURRENCY PRESERVATION: When the context shows amounts with currency symbols or codes (BDT, USD, etc.), you MUST use the EXACT currency symbol/code from the context. NEVER replace BDT (Bangladeshi Taka) with ₹ (Indian Rupee) or any other currency symbol. If you see "BDT 287.5" in the context, you MUST output "BDT 287.5" - do NOT change it to ₹287.5 or any other currency. Preserve all currency codes exactly as shown: BDT = Bangladeshi Taka, USD = US Dollar.**
-10. Never make up specific numbers, rates, or product details
-11. If asked about products, services, or policies, refer to the knowledge base context
-12. For general greetings or small talk, respond naturally without requiring context
-13. When asked about the current date or time, use the provided current date and time information to answer accurately
-14. **CRITICAL BANK NAME RULE: The bank name is ALWAYS "Eastern Bank PLC." (with a period, not "Eastern Bank Limited" or "Eastern Bank Ltd."). If the context mentions "Eastern Bank Limited" or "Eastern Bank Ltd.", you MUST replace it with "Eastern Bank PLC." in your response. Always use "Eastern Bank PLC." (with period) or "EBL" when referring to the bank.**
-15. **For policy-related questions: If the query is missing required entities (like policy name, account type, or customer type), ask a clarification question instead of guessing or providing incomplete information. The system will handle this automatically, but if you receive a query that seems incomplete, ask for the missing information.**
-16. **CRITICAL ORGANIZATIONAL OVERVIEW RULES: For queries like "tell me about EBL", "what is EBL", "about Eastern Bank" - these are GENERAL/CUSTOMER-FACING overview queries. You MUST:**
-    - **INCLUDE ONLY**: Establishment year, country of operation, core banking services (accounts, loans, cards, etc.), major customer-facing platforms (e.g., EBLConnect)
-    - **EXCLUDE**: Annual report details, accounting/valuation/fair value discussions, subsidiaries' financial treatments, management/board-level analysis, investor/audit/regulatory document content
-    - **IF MIXED CONTENT**: Prefer customer-facing content, discard investor/financial-statement-only information
-    - **TONE**: Neutral, concise, informational (NOT marketing, NOT investor-focused)
-
-When responding:
-- **Remember: You are Eastern Bank PLC.'s knowledge assistant for employees. Your responses will be used by EBL employees to assist customers.**
-- **Be concise and non-repetitive - do NOT restate the same information in different sentences**
-- **Do NOT repeat product/account/service names unnecessarily - mention the name ONCE at the beginning, then use "it", "this account", "this product", or "the account"**
-- **FORBIDDEN FILLER PHRASES - NEVER use these: "making them an excellent choice", "demonstrate EBL's commitment", "form an integral part", "making them a critical part", "In essence", "As per", "These accounts are a testament to", "substantial popularity", "considerable balances", "wide range", "diverse needs", "commitment to providing"**
-- **FORBIDDEN MARKETING LANGUAGE - NEVER use: "excellent choice", "substantial popularity", "considerable", "wide range", "diverse needs", "commitment", "demonstrate", "testament to"**
-- **Be direct and factual - State what it IS and what it DOES, not what it "demonstrates" or "shows"**
-- **Keep responses focused - if the user asks "tell me more", provide key features and details in 2-4 sentences, not marketing language or general statements**
-- **Use clear, professional language suitable for employees to share with customers**
-- Structure product information clearly
-- Always prioritize accuracy over speed
-- For date/time queries, provide the exact current date and time as provided in the context
-- **When context is provided, use it - don't ignore it or say you don't have the information**
-- **CRITICAL: Preserve currency symbols and codes exactly as shown in context - BDT means Bangladeshi Taka, USD means US Dollar. Never substitute or change currency symbols. If context says "BDT 287.5", output "BDT 287.5" - never use ₹ or other symbols.**
-- **CRITICAL MONETARY FORMAT FOR BANGLADESH: For monetary values in Bangladesh, use ONE format only: "BDT X lakhs" (e.g., "BDT 50 lakhs"). Do NOT repeat the amount in different formats (e.g., don't say "BDT 50 lakhs" and then "BDT 5,000,000" or "50 lakhs" again). State the amount ONCE in the response.**
-- **For policy queries missing required information, ask for clarification rather than guessing**
-
-═══════════════════════════════════════════════════════════════════════════════
-🚨 CRITICAL: FOLLOW-UP QUESTIONS & SEMANTIC MATCHING 🚨
-═══════════════════════════════════════════════════════════════════════════════
-**FOLLOW-UP QUESTION HANDLING:**
-- When the user asks a follow-up question (e.g., "After how many days..."), 
-  you MUST check the conversation history to understand the context
-- If the previous conversation mentioned a product/account/service, treat the 
-  current question as related to that same topic
-- Example: If previous question was about "Super HPA Account" and current 
-  question is "After how many days interest is credited", understand this is 
-  about Super HPA Account interest crediting
-
-**SEMANTIC EQUIVALENCE RECOGNITION:**
-- Recognize that different words can mean the same thing in banking context
-- "credited" = "paid" = "deposited" = "added" (all mean interest is added to account)
-- "fee" = "charge" = "cost" (all mean the same thing)
-- "rate" = "interest rate" = "percentage" (all mean the same thing)
-- "frequency" = "schedule" = "how often" = "when" (all ask about timing)
-- When the context uses one term (e.g., "paid") but the user asks with another 
-  term (e.g., "credited"), recognize they are asking the same thing and use 
-  the information from context
-- Example: User asks "After how many days interest is credited" but context 
-  says "interest is paid semi-annually" - recognize "credited" and "paid" 
-  mean the same thing and answer: "Interest is paid (credited) semi-annually, 
-  which means every six months"
-═══════════════════════════════════════════════════════════════════════════════"""
+        if self.openai_client:
+            await self.openai_client.close()
+            logger.info("OpenAI client closed")
+        await self.fee_engine_client.close()
+        await self.location_client.close()
     
     def _is_small_talk(self, query: str) -> bool:
         """Detect if query is small talk (greetings, thanks, etc.)"""
-        query_lower = query.lower().strip()
+        query_lower = _normalize_query(query)
         
         # CRITICAL: Contact/phonebook keywords override - never treat as small talk
         # If it's a contact query, it should check phonebook, not be treated as small talk
-        contact_keywords = [
-            'phone', 'telephone', 'tel', 'call', 'contact', 'number', 'phone number',
-            'mobile', 'cell', 'email', 'address', 'extension', 'ext', 'pabx', 'ip phone',
-            'employee', 'staff', 'emp id', 'who is', 'who are', 'who works',
-            'designation', 'department', 'manager', 'director', 'head of'
-        ]
-        
-        if any(keyword in query_lower for keyword in contact_keywords):
+        if _SMALL_TALK_CONTACT_RE.search(query_lower):
             return False  # Force it into phonebook check (not small talk)
         
         # Banking keywords override - never treat as small talk
-        banking_keywords = [
-            "loan", "card", "account", "balance", "deposit", "withdrawal",
-            "interest", "rate", "fee", "service", "product", "banking",
-            "credit", "debit", "transaction", "statement", "minimum", "maximum"
-        ]
-        
-        if any(keyword in query_lower for keyword in banking_keywords):
+        if _SMALL_TALK_BANKING_RE.search(query_lower):
             return False
         
         # Small talk patterns
-        small_talk_patterns = [
-            "hi", "hello", "hey", "good morning", "good afternoon", "good evening",
-            "how are you", "how's it going", "what's up",
-            "thanks", "thank you", "appreciate it",
-            "bye", "goodbye", "see you", "farewell",
-            "what are you", "who are you", "what can you do"
-        ]
-        
-        return any(pattern in query_lower for pattern in small_talk_patterns)
+        return _SMALL_TALK_PATTERNS_RE.search(query_lower) is not None
+    
+    def _canned_small_talk_reply(self, query: str) -> Optional[str]:
+        """Fixed reply for a bare greeting/thanks/goodbye, or None when the turn needs the LLM"""
+        if not settings.ENABLE_CANNED_SMALL_TALK:
+            return None
+        return _SMALL_TALK_REPLIES.get(_WHITESPACE_RE.sub(' ', query.lower().strip(_SMALL_TALK_TRIM_CHARS)))
     
     def _is_datetime_query(self, query: str) -> bool:
         """Detect if query is asking about date or time"""
-        query_lower = query.lower().strip()
-        
-        datetime_keywords = [
-            "date", "time", "what time", "what date", "current time", "current date",
-            "today", "now", "what day", "what is the time", "what is the date",
-            "tell me the time", "tell me the date", "time now", "date today"
-        ]
-        
-        return any(keyword in query_lower for keyword in datetime_keywords)
+        return _DATETIME_RE.search(_normalize_query(query)) is not None
     
     def _is_contact_info_query(self, query: str) -> bool:
         """Detect if query is about contact information (ONLY phone number or email)
         This should ALWAYS check phonebook first, never LightRAG
         VERY RESTRICTIVE - only phone and email, nothing else"""
-        import re
-        query_lower = query.lower().strip()
-        
-        # Exclude queries about email processes/policies/requirements
-        # These should go to LightRAG, not phonebook
-        email_process_keywords = [
-            'email confirmation', 'email verification', 'email requirement',
-            'email required', 'email process', 'email policy', 'email procedure',
-            'email workflow', 'email approval', 'email notification',
-            'send email', 'email sent', 'email received', 'email delivery',
-            'email template', 'email format', 'email content',
-            'prior email confirmation', 'prior confirmation', 'subject to prior',
-            'subject to email', 'processing subject to', 'confirmation required',
-            'prior email', 'email prior'
-        ]
+        query_lower = _normalize_query(query)
         
         # If query is about email processes/policies, NOT a contact query
-        if any(keyword in query_lower for keyword in email_process_keywords):
+        if _EMAIL_PROCESS_RE.search(query_lower):
             return False
         
         # VERY SPECIFIC: Only phone number and email keywords for CONTACT lookup
-        # Everything else goes to LightRAG
-        # Use word boundaries to avoid false matches (e.g., "call" in "cancelled")
-        contact_patterns = [
-            # Phone/Telephone - with word boundaries
-            r'\bphone number\b', r'\btelephone number\b', r'\bcontact number\b',
-            r'\bmobile number\b', r'\bcell number\b', r'\bphone\b', r'\btelephone\b',
-            r'\bmobile\b', r'\bcell\b', r'\bcellphone\b', r'\btel\b', r'\bcall\b',
-            r'\bpabx\b', r'\bextension\b', r'\bext\b', r'\bip phone\b', r'\bip phone number\b',
-            r'\bdirect line\b', r'\bdirect number\b', r'\blandline\b',
-            
-            # Email - ONLY for contact lookup (not processes)
-            # Must be in context of asking for someone's email
-            r'\bemail address of\b', r'\bemail of\b', r'\bemail for\b', r'\bemail id of\b',
-            r'\bemail id for\b', r'\bmail address of\b', r'\bmail address for\b',
-            r'\bwhat is the email\b', r'\bwhat is email\b', r'\bget email\b',
-            r'\bfind email\b', r'\bcontact email\b', r'\bemail contact\b'
-        ]
-        
-        # Check if query contains phone number or email keywords for contact lookup
-        # Use regex with word boundaries to avoid false matches
         # If yes, ALWAYS check phonebook first (never LightRAG)
-        return any(re.search(pattern, query_lower) for pattern in contact_patterns)
+        return _CONTACT_LOOKUP_RE.search(query_lower) is not None
     
     def _is_phonebook_query(self, query: str) -> bool:
         """Detect if query is about phone book directory
         VERY RESTRICTIVE - only explicit phonebook/directory queries"""
-        query_lower = query.lower().strip()
-        
         # VERY SPECIFIC: Only explicit phonebook/directory keywords
-        phonebook_keywords = [
-            'phonebook', 'phone book', 'employee directory', 'staff directory',
-            'contact list', 'employee list', 'staff list', 'directory'
-        ]
-        
-        # Check if query explicitly mentions phonebook/directory
-        return any(keyword in query_lower for keyword in phonebook_keywords)
+        return _PHONEBOOK_RE.search(_normalize_query(query)) is not None
     
     def _is_employee_query(self, query: str) -> bool:
         """
@@ -751,29 +1880,15 @@ When responding:
         Includes role-based queries like "branch manager", "who is the manager", etc.
         Also detects queries with "find" or "search" followed by what looks like an employee ID or name.
         """
-        query_lower = query.lower().strip()
-        import re
+        query_lower = _normalize_query(query)
 
         # Guardrail: Staffing/manpower requirement questions are NOT phonebook lookups.
         # Example: "How many staff are required for customer service and cash transactions from the Agent's side..."
-        staffing_intent_keywords = [
-            "required", "requirement", "requirements", "needed", "need", "minimum",
-            "manpower", "headcount", "personnel",
-        ]
-        staffing_count_keywords = [
-            "how many", "number of", "count of",
-        ]
-        outlet_context_keywords = [
-            "agent", "agent outlet", "outlet", "booth", "counter", "branch", "service point"
-        ]
-        ops_context_keywords = [
-            "customer service", "cash transaction", "cash transactions", "cash withdrawal", "cash deposit"
-        ]
         if (
-            ("staff" in query_lower or any(k in query_lower for k in ["manpower", "headcount", "personnel"]))
-            and any(k in query_lower for k in staffing_count_keywords)
-            and any(k in query_lower for k in staffing_intent_keywords)
-            and (any(k in query_lower for k in outlet_context_keywords) or any(k in query_lower for k in ops_context_keywords))
+            ("staff" in query_lower or _STAFFING_HEADCOUNT_RE.search(query_lower))
+            and _STAFFING_COUNT_RE.search(query_lower)
+            and _STAFFING_INTENT_RE.search(query_lower)
+            and _STAFFING_CONTEXT_RE.search(query_lower)
         ):
             logger.info(f"[ROUTING] Staffing requirement query detected - NOT routing to phonebook: '{query}'")
             return False
@@ -781,90 +1896,45 @@ When responding:
         # Pattern 0: "find" or "search" followed by employee ID pattern (e.g., "find cr_app3_test", "search abc123")
         # Employee IDs often contain underscores, letters, and numbers
         # Match patterns like: "find X", "search X", "lookup X", "who is X", "contact X", "info about X"
-        find_search_patterns = [
-            r'\b(find|search|lookup|contact|info about)\s+([a-z0-9_]+)',  # "find cr_app3_test" or "find abc123"
-            r'\b(who is)\s+([a-z0-9_]+)',  # "who is cr_app3_test"
-        ]
-        for pattern in find_search_patterns:
-            match = re.search(pattern, query_lower)
+        for pattern in _PB_FIND_SEARCH_PATTERNS:
+            match = pattern.search(query_lower)
             if match:
                 # Check if the matched term looks like an employee ID or name
                 search_term = match.group(2) if len(match.groups()) >= 2 else ""
                 # Employee IDs typically: contain underscores, or are alphanumeric with at least 3 chars
                 if search_term and len(search_term) >= 3:
                     # If it contains underscore or looks like an ID pattern, route to phonebook
-                    if '_' in search_term or re.match(r'^[a-z0-9]+$', search_term):
+                    if '_' in search_term or _PB_ALNUM_TERM_RE.match(search_term):
                         logger.info(f"[ROUTING] Detected find/search query with employee ID/name pattern '{search_term}' → phonebook")
                         return True
         
         # Pattern 1: "who is" + role/designation queries (e.g., "who is the branch manager")
         # This catches queries asking about specific people in specific roles
-        who_is_patterns = [
-            r'who\s+is\s+(the\s+)?(branch\s+)?manager',
-            r'who\s+is\s+(the\s+)?(.*\s+)?manager\s+of',
-            r'who\s+is\s+the\s+(.*\s+)?manager',
-            r'who\s+is\s+(the\s+)?(head|director|officer|executive)\s+of',
-            r'who\s+is\s+(the\s+)?(.*\s+)?(head|director|officer|executive)',
-        ]
-        if any(re.search(pattern, query_lower) for pattern in who_is_patterns):
+        if _PB_WHO_IS_RE.search(query_lower):
             logger.info(f"[ROUTING] Detected 'who is' role query → phonebook")
             return True
         
         # Pattern 2: Role + "of" + location/branch (e.g., "branch manager of Gulshan")
-        role_location_patterns = [
-            r'(branch\s+)?manager\s+of',
-            r'manager\s+of\s+(.*\s+)?branch',
-            r'(head|director|officer)\s+of\s+(.*\s+)?branch',
-            r'(.*\s+)?manager\s+at\s+(.*\s+)?branch',
-        ]
-        if any(re.search(pattern, query_lower) for pattern in role_location_patterns):
+        if _PB_ROLE_LOCATION_ROUTE_RE.search(query_lower):
             logger.info(f"[ROUTING] Detected role + location query → phonebook")
             return True
         
-        # Pattern 3: VERY SPECIFIC employee search/lookup keywords
-        employee_keywords = [
-            'employee id', 'employee number', 'emp id', 'emp_id',
-            'employee phone', 'employee email', 'employee contact',
-            'staff phone', 'staff email', 'staff contact',
-            'who is employee', 'who are employees', 'find employee',
-            'search employee', 'lookup employee', 'employee directory',
-            'staff directory', 'employee list', 'staff list'
-        ]
-        
         # Pattern 4: "employee" or "staff" combined with contact-related terms
         if 'employee' in query_lower or 'staff' in query_lower:
             # Only if combined with contact/search terms
-            contact_terms = ['phone', 'email', 'contact', 'number', 'id', 'search', 'find', 'lookup', 'who']
-            if any(term in query_lower for term in contact_terms):
+            if _EMPLOYEE_CONTACT_TERMS_RE.search(query_lower):
                 return True
         
-        return any(keyword in query_lower for keyword in employee_keywords)
+        # Pattern 3: VERY SPECIFIC employee search/lookup keywords
+        return _EMPLOYEE_KEYWORDS_RE.search(query_lower) is not None
     
     def _is_financial_report_query(self, query: str) -> bool:
         """Detect if query is about financial reports"""
-        query_lower = query.lower().strip()
-        
-        financial_keywords = [
-            'financial report', 'annual report', 'quarterly report', 'financial statement',
-            'revenue', 'profit', 'loss', 'income statement', 'balance sheet',
-            'cash flow', 'earnings', 'dividend', 'financial year', 'fiscal year',
-            'audit', 'auditor', 'financial performance', 'financial results',
-            'quarterly results', 'annual results', 'financial data', 'financial metrics'
-        ]
-        
-        return any(keyword in query_lower for keyword in financial_keywords)
+        return _FINANCIAL_REPORT_RE.search(_normalize_query(query)) is not None
     
     def _is_user_document_query(self, query: str) -> bool:
         """Detect if query is about user-uploaded documents"""
-        query_lower = query.lower().strip()
-        
-        user_doc_keywords = [
-            'user document', 'uploaded document', 'custom document', 'my document',
-            'document i uploaded', 'document i provided', 'my file', 'uploaded file',
-            'custom file', 'user file', 'personal document', 'my upload'
-        ]
-        
-        return any(keyword in query_lower for keyword in user_doc_keywords)
+        return _USER_DOCUMENT_RE.search(_normalize_query(query)) is not None
     
     def _is_organizational_overview_query(self, query: str) -> bool:
         """
@@ -877,24 +1947,10 @@ When responding:
         - "about Eastern Bank"
         - "tell me about Eastern Bank PLC"
         """
-        query_lower = query.lower().strip()
-        
-        # Patterns that indicate organizational overview queries
-        overview_patterns = [
-            # "tell me about" + bank name
-            (r'tell\s+me\s+about\s+(ebl|eastern\s+bank)', 'tell me about EBL/Eastern Bank'),
-            # "what is" + bank name
-            (r'what\s+is\s+(ebl|eastern\s+bank)', 'what is EBL/Eastern Bank'),
-            # "about" + bank name (at start or after "tell me")
-            (r'^about\s+(ebl|eastern\s+bank)', 'about EBL/Eastern Bank'),
-            # "who is" + bank name
-            (r'who\s+is\s+(ebl|eastern\s+bank)', 'who is EBL/Eastern Bank'),
-            # "describe" + bank name
-            (r'describe\s+(ebl|eastern\s+bank)', 'describe EBL/Eastern Bank'),
-        ]
+        query_lower = _normalize_query(query)
         
-        for pattern, description in overview_patterns:
-            if re.search(pattern, query_lower):
+        for pattern, description in _ORG_OVERVIEW_PATTERNS:
+            if pattern.search(query_lower):
                 logger.info(f"[ROUTING] Detected organizational overview query: '{description}'")
                 return True
         
@@ -902,48 +1958,24 @@ When responding:
     
     def _is_management_query(self, query: str) -> bool:
         """Detect if query is about EBL management/management committee"""
-        query_lower = query.lower().strip()
-        
-        management_keywords = [
-            'management', 'management committee', 'mancom', 'managing director',
-            'md and ceo', 'deputy managing director', 'chief financial officer', 'cfo',
-            'chief technology officer', 'cto', 'chief risk officer', 'cro',
-            'head of', 'unit head', 'executive committee', 'management team',
-            'who is the managing director', 'who is the cfo', 'who is the cto',
-            'management structure', 'organizational structure', 'management hierarchy',
-            'ebl management', 'ebl executives', 'bank management', 'leadership team'
-        ]
-        
-        return any(keyword in query_lower for keyword in management_keywords)
+        return _MANAGEMENT_RE.search(_normalize_query(query)) is not None
     
     def _is_milestone_query(self, query: str) -> bool:
         """
         Detect if query is about EBL milestones/history/achievements.
         NOT greedy - only matches explicit milestone/history queries, NOT general "about ebl" queries.
         """
-        query_lower = query.lower().strip()
-        
-        # Normalize "mile stone" to "milestone" for matching
-        query_normalized = query_lower.replace('mile stone', 'milestone').replace('mile-stone', 'milestone')
-        
         # CRITICAL: Check if this is an organizational overview query FIRST
         # If it is, it should NOT be treated as a milestone query
         if self._is_organizational_overview_query(query):
             return False
         
+        return self._mentions_milestone(query)
+    
+    def _mentions_milestone(self, query: str) -> bool:
+        """Milestone/history keyword check without the organizational-overview exclusion"""
         # Only match if query EXPLICITLY mentions milestone/history keywords
-        # Remove "about ebl" and "ebl background" from keywords - these are too generic
-        milestone_keywords = [
-            'milestone', 'milestones', 'history', 'historical', 'achievement', 'achievements',
-            'timeline', 'journey', 'evolution', 'development', 'growth', 'progress',
-            'founded', 'establishment', 'established', 'inception', 'origin', 'beginnings',
-            'ebl milestone', 'ebl milestones', 'ebl history', 'bank milestone', 'bank milestones',
-            'what are the milestones', 'ebl achievements',
-            'bank achievements', 'company history', 'bank history', 'corporate history'
-            # REMOVED: 'about ebl', 'ebl background', 'ebl information' - too generic, caught by org overview
-        ]
-        
-        return any(keyword in query_normalized for keyword in milestone_keywords)
+        return _MILESTONE_RE.search(_normalize_query(query)) is not None
     
     def _is_fee_schedule_query(self, query: str) -> bool:
         """
@@ -956,25 +1988,13 @@ When responding:
         
         EXCLUDES: Retail asset charges (fast cash, loans, etc.) - these are handled separately.
         """
-        query_lower = query.lower().strip()
-        
-        # Guardrail: Transaction-limit / allowed-count queries should NOT route to fee engine.
-        # Examples:
-        # - "maximum number of daily Cash Withdrawal transactions allowed for a Savings Account"
-        # - "how many cash transactions are allowed per day"
-        limit_intent_keywords = [
-            "maximum number", "max number", "how many", "number of",
-            "limit", "limits", "allowed", "permit", "per day", "daily", "in a day",
-        ]
-        transaction_words = ["transaction", "transactions", "cash withdrawal", "withdrawal", "deposit"]
-        account_words = ["savings account", "current account", "account"]
-        fee_intent_words = ["fee", "fees", "charge", "charges", "rate", "pricing", "price", "cost", "commission"]
-
+        query_lower = _normalize_query(query)
+        
         if (
-            any(k in query_lower for k in limit_intent_keywords)
-            and any(w in query_lower for w in transaction_words)
-            and any(w in query_lower for w in account_words)
-            and not any(w in query_lower for w in fee_intent_words)
+            _FEE_LIMIT_INTENT_KEYWORDS_RE.search(query_lower) is not None
+            and _FEE_LIMIT_TRANSACTION_WORDS_RE.search(query_lower) is not None
+            and _FEE_LIMIT_ACCOUNT_WORDS_RE.search(query_lower) is not None
+            and _FEE_INTENT_WORDS_RE.search(query_lower) is None
         ):
             logger.info(f"[ROUTING] Transaction-limit query detected - NOT routing to fee engine: '{query}'")
             return False
@@ -983,99 +2003,29 @@ When responding:
         # and can collide with card-fee keywords (e.g., "debit card issuance fee").
         # Route these to LightRAG instead of Fee Engine.
         if ("payroll" in query_lower and "category" in query_lower) or "payroll banking" in query_lower:
-            if any(k in query_lower for k in ["issuance fee", "debit card issuance", "debit card", "coverage", "eligibility", "criteria"]):
+            if _PAYROLL_CARD_COLLISION_RE.search(query_lower):
                 logger.info(f"[ROUTING] Payroll banking query detected - NOT routing to card fee engine: '{query}'")
                 return False
         
-        # EXCLUDE retail asset/loan queries - these should NOT route to card fees
-        retail_asset_keywords = [
-            "fast cash", "fast loan", "education loan", "edu loan",
-            "personal loan", "home loan", "car loan", "auto loan",
-            "business loan", "executive loan", "assure loan", "women's loan",
-            "retail asset", "loan processing", "loan fee", "loan charge",
-            "overdraft", "od", "emi loan", "secured loan", "unsecured loan"
-        ]
-        
         # If query contains retail asset keywords, it's NOT a card fee query
-        if any(kw in query_lower for kw in retail_asset_keywords):
+        if _CARD_FEE_EXCLUDED_RETAIL_KEYWORDS_RE.search(query_lower) is not None:
             logger.info(f"[ROUTING] Query contains retail asset keywords - NOT routing to card fees: '{query}'")
             return False
         
-        # Card-related context keywords (required for generic terms)
-        card_context_keywords = [
-            "card", "atm", "lounge", "supplementary", "pin", "rfcd",
-            "visa", "mastercard", "diners", "unionpay", "taka pay",
-            "credit card", "debit card", "prepaid card",
-            "classic", "gold", "platinum", "infinite", "signature", "titanium", "world"
-        ]
-        
-        # Specific fee types (always route - these are card-specific)
-        specific_fee_keywords = [
-            "annual fee", "yearly fee", "renewal fee", "issuance fee", "issuance charge", 
-            "joining fee", "replacement fee", "card replacement", "pin replacement", 
-            "pin fee", "late payment fee", "late fee", "overlimit fee", "over-limit fee",
-            
-            # Transaction fees (card-specific)
-            "cash advance fee", "cash withdrawal fee", "atm withdrawal fee", 
-            "withdrawal fee", "transaction fee",
-            
-            # Service fees (card-specific)
-            "duplicate statement fee", "duplicate estatement", "certificate fee",
-            "chequebook fee", "customer verification fee", "cib fee", 
-            "transaction alert fee", "sms alert", "transaction alert",
-            "sales voucher fee", "sales voucher", "return cheque fee",
-            "undelivered card fee", "atm receipt fee", "cctv footage fee",
-            "cctv", "fund transfer fee", "wallet transfer fee",
-            "want2buy fee", "easycredit fee", "risk assurance fee",
-            "balance maintenance fee",
-            
-            # Interest rates (card-specific)
-            "interest rate", "rate of interest", "apr", "annual percentage rate",
-            "card interest", "credit card rate",
-            
-            # Lounge access (card-specific)
-            "lounge", "lounge access", "sky lounge", "airport lounge", "lounge visit",
-            "skylounge", "international lounge", "domestic lounge", "global lounge",
-            "lounge free visit", "lounge fee", "priority pass",
-            
-            # Supplementary card fee queries (avoid overly-broad "how many")
-            "supplementary fee", "supplementary charge", "supplementary annual fee",
-            "free supplementary", "supplementary card free",
-            
-            # Schedule/document references
-            "fee schedule", "charges schedule", "card charges", "card fees",
-            "fee information", "charge information",
-            
-            # Core fee terms (when used with card context or in card-specific phrases)
-            "fee", "fees", "charge", "charges"
-        ]
-        
-        # Generic terms that require card context
-        generic_terms = ["cost", "pricing", "price"]
-        
         # Check for specific card-fee phrases (always route)
-        if any(kw in query_lower for kw in specific_fee_keywords):
+        if _CARD_SPECIFIC_FEE_KEYWORDS_RE.search(query_lower) is not None:
             # But avoid routing generic "fee/charge" unless we have card context or schedule reference
-            has_card_context = any(ctx in query_lower for ctx in card_context_keywords)
-            has_schedule_ref = any(ref in query_lower for ref in ["fee schedule", "charges schedule", "card charges", "card fees"])
-            has_specific_phrase = any(
-                kw in query_lower
-                for kw in [
-                    "annual fee", "issuance fee", "replacement fee", "late payment fee",
-                    "overlimit fee", "cash withdrawal fee", "atm withdrawal fee", "cash advance fee",
-                    "sales voucher fee", "transaction alert fee", "lounge fee", "lounge free visit",
-                    "supplementary fee", "supplementary annual fee",
-                ]
-            )
-            if has_specific_phrase:
+            has_card_context = _CARD_CONTEXT_KEYWORDS_RE.search(query_lower) is not None
+            has_schedule_ref = _CARD_SCHEDULE_REFERENCE_RE.search(query_lower) is not None
+            if _CARD_NAMED_FEE_RE.search(query_lower):
                 return True
             return has_card_context or has_schedule_ref
         
         # Check for generic terms - require card context
-        has_generic_term = any(term in query_lower for term in generic_terms)
+        has_generic_term = _CARD_GENERIC_FEE_TERMS_RE.search(query_lower) is not None
         if has_generic_term:
             # Generic term found - require card context
-            has_card_context = any(ctx in query_lower for ctx in card_context_keywords)
+            has_card_context = _CARD_CONTEXT_KEYWORDS_RE.search(query_lower) is not None
             return has_card_context
         
         # No match
@@ -1086,57 +2036,25 @@ When responding:
         Detect if query is about retail asset charges (loans, fast cash, etc.).
         Returns True if query contains retail asset keywords with fee/charge context.
         """
-        query_lower = query.lower().strip()
+        query_lower = _normalize_query(query)
 
         # Guardrail: process/procedure/how-to questions are not fee queries.
         # Example: "EasyCredit Early Settlement process"
-        has_process_intent = any(k in query_lower for k in ["process", "procedure", "how to", "steps", "method"])
-        has_fee_intent = any(k in query_lower for k in ["fee", "fees", "charge", "charges", "cost", "pricing", "price"])
-        if has_process_intent and not has_fee_intent:
+        if _PROCESS_INTENT_RE.search(query_lower) and not _RETAIL_ASSET_FEE_INTENT_RE.search(query_lower):
             return False
         
         # FIX #5: Retail-asset-exclusive fee terms (these fees only exist for retail assets)
         # Check these FIRST - if present and NOT a card query, route to RETAIL_ASSETS
-        retail_asset_exclusive_fees = [
-            'partial payment fee', 'partial payment',
-            'early settlement fee', 'early settlement', 'early_settlement',
-            # Stamp duty/charge is a retail-asset charge in our v2 schedule
-            'stamp charge', 'stamp duty',
-            # Reschedule / restructure fees (retail assets v2)
-            'reschedule & restructure fee', 'reschedule and restructure fee',
-            'reschedule & restructure exit fee', 'reschedule and restructure exit fee',
-            'reschedule fee', 'rescheduling fee',
-            'restructure fee', 'restructuring fee',
-            # Common retail-asset charge terms that users ask without saying "loan"
-            'notarization fee',
-            'noc fee', 'loan repayment certificate', 'loan repayment certificate (noc)',
-            'loan outstanding certificate', 'loan outstanding certificate fee',
-        ]
-        has_exclusive_fee = any(fee_term in query_lower for fee_term in retail_asset_exclusive_fees)
-        has_card_keyword = any(card_kw in query_lower for card_kw in ['card', 'credit card', 'debit card', 'visa', 'mastercard'])
+        has_exclusive_fee = _RETAIL_ASSET_EXCLUSIVE_FEES_RE.search(query_lower) is not None
+        has_card_keyword = _RETAIL_ASSET_CARD_RE.search(query_lower) is not None
         
         if has_exclusive_fee and not has_card_keyword:
             logger.info(f"[ROUTING] Retail asset exclusive fee query detected (no product keyword required): '{query}'")
             return True
         
-        # Retail asset product keywords
-        retail_asset_keywords = [
-            "fast cash", "fast loan", "education loan", "edu loan",
-            "personal loan", "home loan", "car loan", "auto loan",
-            "business loan", "executive loan", "assure loan", "women's loan",
-            "retail asset", "loan processing", "overdraft", "od", "emi loan"
-        ]
-        
-        # Fee/charge keywords
-        fee_keywords = [
-            "fee", "fees", "charge", "charges", "cost", "pricing", "price",
-            "processing fee", "enhancement fee", "reduction fee", "cancellation fee",
-            "renewal fee", "settlement fee", "early_settlement_fee", "settlement"
-        ]
-        
         # Check if query contains both retail asset keywords AND fee keywords
-        has_retail_asset = any(kw in query_lower for kw in retail_asset_keywords)
-        has_fee_keyword = any(kw in query_lower for kw in fee_keywords)
+        has_retail_asset = _RETAIL_ASSET_KEYWORDS_RE.search(query_lower) is not None
+        has_fee_keyword = _RETAIL_ASSET_FEE_KEYWORDS_RE.search(query_lower) is not None
         
         if has_retail_asset and has_fee_keyword:
             logger.info(f"[ROUTING] Retail asset fee query detected: '{query}'")
@@ -1149,25 +2067,11 @@ When responding:
         Detect if query is about Skybanking fees/charges.
         Returns True if query contains Skybanking keywords with fee/charge context.
         """
-        query_lower = query.lower().strip()
-        
-        # Skybanking product keywords
-        skybanking_keywords = [
-            "skybanking", "sky banking", "ebl skybanking",
-            "digital banking", "mobile banking", "online banking",
-            "skybanking app", "ebl app", "mobile app"
-        ]
-        
-        # Fee/charge keywords
-        fee_keywords = [
-            "fee", "fees", "charge", "charges", "cost", "pricing", "price",
-            "certificate fee", "account certificate", "fund transfer fee",
-            "transfer fee", "transaction fee"
-        ]
+        query_lower = _normalize_query(query)
         
         # Check if query contains both Skybanking keywords AND fee keywords
-        has_skybanking = any(kw in query_lower for kw in skybanking_keywords)
-        has_fee_keyword = any(kw in query_lower for kw in fee_keywords)
+        has_skybanking = _SKYBANKING_KEYWORDS_RE.search(query_lower) is not None
+        has_fee_keyword = _SKYBANKING_FEE_KEYWORDS_RE.search(query_lower) is not None
         
         if has_skybanking and has_fee_keyword:
             logger.info(f"[ROUTING] Skybanking fee query detected: '{query}'")
@@ -1190,62 +2094,21 @@ When responding:
         """
         query_lower = query.lower()
         
-        # Location keywords - check for explicit location-related terms
-        location_keywords = [
-            # Branches
-            'branch', 'branches', 'bank branch', 'ebl branch',
-            # Head office
-            'head office', 'headoffice', 'headquarter', 'headquarters', 'corporate office', 'main office',
-            # ATMs
-            'atm', 'atms', 'automated teller machine', 'cash machine', 'cashpoint',
-            # CRMs
-            'crm', 'customer relationship machine', 'customer service machine',
-            # RTDMs
-            'rtdm', 'retail transaction deposit machine', 'deposit machine',
-            # Priority centers - CRITICAL: All priority center queries must go to location service
-            'priority center', 'priority centre', 'priority centers', 'priority centres',
-            'priority banking center', 'priority banking centre', 'priority banking centers', 'priority banking centres',
-            # General location queries - expanded patterns
-            'where is', 'where are', 'where can i find', 'where can i locate',
-            'find branch', 'find atm', 'locate', 'location', 'address', 'address of',
-            'location of', 'tell me location', 'what is the location', 'what is the address',
-            'nearest branch', 'nearest atm', 'near me', 
-            'in dhaka', 'in chittagong', 'in sylhet', 'in khulna', 'in rajshahi',
-            'dhaka branch', 'chittagong branch', 'sylhet branch'
-        ]
-        
-        # Check for location-related patterns
-        import re
-        location_patterns = [
-            r'\blocation\s+of\b',  # "location of X"
-            r'\baddress\s+of\b',   # "address of X"
-            r'\bwhere\s+is\b',     # "where is X"
-            r'\bwhere\s+are\b',    # "where are X"
-            r'\btell\s+me\s+(the\s+)?(location|address)',  # "tell me location/address"
-            r'\bwhat\s+is\s+the\s+(location|address)',     # "what is the location/address"
-            # Count queries for priority centers - CRITICAL: These must go to location service
-            r'\bhow\s+many\s+priority\s+(center|centre)',  # "how many priority center"
-            r'\bhow\s+many\s+priority\s+(center|centre)s',  # "how many priority centers"
-            r'\bnumber\s+of\s+priority\s+(center|centre)',  # "number of priority center"
-            r'\bcount\s+of\s+priority\s+(center|centre)',  # "count of priority center"
-            r'\bpriority\s+(center|centre).*\b(how many|number|count|total)',  # "priority center how many"
-        ]
-        
         # Check if query contains location keywords
-        has_location_keyword = any(kw in query_lower for kw in location_keywords)
+        has_location_keyword = _LOCATION_KEYWORDS_RE.search(query_lower) is not None
         
         # Check for location patterns using regex
-        has_location_pattern = any(re.search(pattern, query_lower) for pattern in location_patterns)
+        has_location_pattern = any(pattern.search(query_lower) for pattern in _LOCATION_PATTERNS)
         
         # Also check if query mentions a branch name pattern (e.g., "AGRABAD BRANCH", "Dhanmondi branch")
         # This catches queries like "location of AGRABAD BRANCH" even if "branch" comes after
-        has_branch_name_pattern = bool(re.search(r'\b(branch|atm|crm|rtdm|priority\s+center|priority\s+centre)\b', query_lower, re.IGNORECASE))
+        has_branch_name_pattern = bool(_BRANCH_NAME_RE.search(query_lower))
         
         # CRITICAL: Special check for priority center count queries
         # These queries MUST go to location service, not LightRAG
         has_priority_center_count_query = bool(
-            re.search(r'\b(how many|number|count|total).*priority\s+(center|centre)', query_lower, re.IGNORECASE) or
-            re.search(r'\bpriority\s+(center|centre).*\b(how many|number|count|total|does.*have|has)', query_lower, re.IGNORECASE)
+            _PRIORITY_CENTER_COUNT_RE.search(query_lower) or
+            _PRIORITY_CENTER_COUNT_AFTER_RE.search(query_lower)
         )
         
         # Return True if any location indicator is found
@@ -1284,76 +2147,20 @@ When responding:
     
     def _is_compliance_query(self, query: str) -> bool:
         """Detect if query is about compliance, AML, regulatory, or policy matters"""
-        query_lower = query.lower().strip()
-        
-        compliance_keywords = [
-            # AML (Anti-Money Laundering)
-            'aml', 'anti money laundering', 'anti-money laundering', 'money laundering',
-            'aml policy', 'aml compliance', 'aml regulation', 'aml requirements',
-            'aml customer', 'aml customers', 'aml sensitive', 'aml risk',
-            
-            # Compliance & Regulatory
-            'compliance', 'regulatory', 'regulation', 'regulations', 'regulatory compliance',
-            'compliance policy', 'compliance requirement', 'compliance requirements',
-            'regulatory policy', 'regulatory requirement', 'regulatory requirements',
-            
-            # Policy & Procedures
-            'policy', 'policies', 'procedure', 'procedures', 'guideline', 'guidelines',
-            'bank policy', 'banking policy', 'bank policies', 'banking policies',
-            'internal policy', 'internal policies', 'operational policy',
-            
-            # KYC (Know Your Customer)
-            'kyc', 'know your customer', 'kyc policy', 'kyc compliance', 'kyc requirement',
-            'kyc requirements', 'customer due diligence', 'cdd',
-            
-            # Risk & Fraud
-            'risk management', 'fraud prevention', 'fraud detection', 'suspicious activity',
-            'suspicious transaction', 'transaction monitoring', 'sanctions',
-            'sanctions screening', 'ofac', 'pep', 'politically exposed person',
-            
-            # Sensitive Customers
-            'sensitive customer', 'sensitive customers', 'high risk customer',
-            'high risk customers', 'risk customer', 'risk customers',
-            
-            # Regulatory Bodies
-            'bangladesh bank', 'central bank', 'bb guideline', 'bb guidelines',
-            'regulatory authority', 'regulatory authorities'
-        ]
+        query_lower = _normalize_query(query)
         
-        return any(keyword in query_lower for keyword in compliance_keywords)
+        return _COMPLIANCE_KEYWORDS_RE.search(query_lower) is not None
     
     def _check_policy_entities(self, query: str) -> tuple[bool, Optional[str]]:
         """
         Check if a policy query has required entities.
         Returns: (has_required_entities, clarification_question_if_missing)
         """
-        import re
-        query_lower = query.lower().strip()
-        
-        # Common policy names/identifiers that might be mentioned
-        policy_identifiers = [
-            'aml', 'kyc', 'cdd', 'ofac', 'pep', 'sanctions',
-            'anti money laundering', 'know your customer', 'customer due diligence',
-            'money laundering', 'politically exposed person',
-            'credit policy', 'lending policy', 'loan policy', 'card policy',
-            'account policy', 'deposit policy', 'withdrawal policy',
-            'transaction policy', 'compliance policy', 'risk policy',
-            'fraud policy', 'operational policy', 'internal policy',
-            'gap policy', 'code of conduct', 'dress code', 'employee policy'
-        ]
+        query_lower = _normalize_query(query)
         
-        # Account types that might be relevant
-        account_types = [
-            'savings', 'current', 'fixed deposit', 'fd', 'rd', 'recurring deposit',
-            'corporate', 'commercial', 'retail', 'personal', 'business',
-            'super saver', 'stellar', 'platinum', 'gold', 'silver'
-        ]
-        
-        # Customer types
-        customer_types = [
-            'corporate', 'commercial', 'retail', 'personal', 'individual',
-            'business', 'sme', 'small medium enterprise', 'enterprise'
-        ]
+        # Every clarification below needs the word "policy"; without it the answer is always "complete"
+        if 'policy' not in query_lower:
+            return (True, None)
         
         # Check if query mentions a specific policy name using patterns:
         # - "X policy" (e.g., "GAP policy", "AML policy")
@@ -1362,99 +2169,87 @@ When responding:
         has_policy_name = False
         
         # Pattern 1: Check known policy identifiers first (most reliable)
-        if any(identifier in query_lower for identifier in policy_identifiers):
+        if _POLICY_IDENTIFIERS_RE.search(query_lower) is not None:
             has_policy_name = True
         
         # Pattern 2: "X policy" - look for any word/phrase before "policy" that's not generic
         # This handles: "GAP policy", "the GAP policy", "AML policy", "what does the GAP policy say"
-        generic_words = {'the', 'a', 'an', 'this', 'that', 'what', 'which', 'some', 'any', 'does', 'say', 'is', 'are', 'was', 'were'}
-        
         # Find all instances of "X policy" pattern
-        policy_before_pattern = r'\b([a-z]+(?:\s+[a-z]+)?)\s+policy\b'
-        matches = re.findall(policy_before_pattern, query_lower)
+        matches = _POLICY_NAME_BEFORE_RE.findall(query_lower)
         if matches:
             for match in matches:
                 match_clean = match.strip().lower()
                 # If it's not a generic word, consider it a policy name
-                if match_clean and match_clean not in generic_words:
+                if match_clean and match_clean not in _POLICY_GENERIC_WORDS:
                     has_policy_name = True
                     break
         
         # Pattern 3: "policy regarding/about/for X" - indicates a specific policy is being discussed
-        if re.search(r'\bpolicy\s+(?:regarding|about|for|on|concerning|in|of|say|state|mention|specify|require|allow|prohibit)', query_lower):
+        if _POLICY_QUALIFIER_RE.search(query_lower):
             has_policy_name = True
         
         # Pattern 4: If query has "policy" and asks about a specific topic, assume policy name is present
         # e.g., "what does the GAP policy say about socks" - has "policy" and "socks" (specific topic)
         # e.g., "what does the policy say about X" - has "policy" and topic X
-        if 'policy' in query_lower:
-            # Check if there's a specific topic/subject mentioned (not just "policy" alone)
-            # Look for words after "policy" that suggest a specific question
-            has_specific_topic = re.search(
-                r'policy\s+(?:say|state|mention|specify|require|allow|prohibit|regarding|about|for|on|concerning|in|of)\s+[a-z]+',
-                query_lower
-            )
-            if has_specific_topic:
-                has_policy_name = True
+        # Look for words after "policy" that suggest a specific question
+        if _POLICY_TOPIC_RE.search(query_lower):
+            has_policy_name = True
         
         # If a specific policy is mentioned, allow it to proceed (don't ask for clarification)
         if has_policy_name:
             return (True, None)
         
-        # Safety check: If query has "policy" and mentions a specific topic/subject, allow it through
+        # Safety check: If query mentions a specific topic/subject, allow it through
         # This catches cases like "what does the GAP policy say about socks" where the policy name
         # might not have been detected but there's clearly a specific question being asked
-        if 'policy' in query_lower:
-            # Check if there's substantive content beyond just "what is the policy?"
-            # Look for: specific topics, action verbs, or content after "policy"
-            has_substantive_content = (
-                # Has a topic/subject mentioned (more than just "policy")
-                len(query_lower.split()) > 4 or
-                # Has action verbs that suggest a specific question
-                any(word in query_lower for word in ['say', 'state', 'mention', 'specify', 'require', 'allow', 'prohibit', 'regarding', 'about', 'for', 'on', 'concerning']) or
-                # Has "does" or "do" which suggests asking about something specific
-                'does' in query_lower or 'do ' in query_lower
-            )
-            
-            # Only ask for clarification if it's truly vague (like "what is the policy?")
-            is_truly_vague = (
-                query_lower in ['what is the policy?', 'what is policy?', 'tell me about policy', 'explain policy'] or
-                (len(query_lower.split()) <= 4 and 'policy' in query_lower and not has_substantive_content)
-            )
-            
-            if not is_truly_vague:
-                # Has enough context, allow it through
-                return (True, None)
+        # Check if there's substantive content beyond just "what is the policy?"
+        # Look for: specific topics, action verbs, or content after "policy"
+        has_substantive_content = (
+            # Has a topic/subject mentioned (more than just "policy")
+            len(query_lower.split()) > 4 or
+            # Has action verbs that suggest a specific question
+            _POLICY_ACTION_WORDS_RE.search(query_lower) is not None or
+            # Has "does" or "do" which suggests asking about something specific
+            'does' in query_lower or 'do ' in query_lower
+        )
         
+        # Only ask for clarification if it's truly vague (like "what is the policy?")
+        is_truly_vague = (
+            query_lower in _POLICY_VAGUE_QUERIES or
+            (len(query_lower.split()) <= 4 and not has_substantive_content)
+        )
+        
+        if not is_truly_vague:
+            # Has enough context, allow it through
+            return (True, None)
+        
+        # From here on no specific policy name was found (that case returned above)
         # Check if query is asking about policy in general (e.g., "what is the policy?")
-        # Only trigger if it's truly general without any specific policy mentioned
         is_general_policy_query = (
-            ('what' in query_lower and 'policy' in query_lower and not has_policy_name) or
-            ('tell me' in query_lower and 'policy' in query_lower and not has_policy_name) or
-            ('explain' in query_lower and 'policy' in query_lower and not has_policy_name)
+            'what' in query_lower or
+            'tell me' in query_lower or
+            'explain' in query_lower
         )
         
         # If it's a general policy query without context, we need clarification
         if is_general_policy_query:
             # Check if account type or customer type is mentioned
-            has_account_type = any(acc_type in query_lower for acc_type in account_types)
-            has_customer_type = any(cust_type in query_lower for cust_type in customer_types)
+            has_account_type = _POLICY_ACCOUNT_TYPES_RE.search(query_lower) is not None
+            has_customer_type = _POLICY_CUSTOMER_TYPES_RE.search(query_lower) is not None
             
             if not has_account_type and not has_customer_type:
                 return (False, "I'd be happy to help you with policy information. Could you please specify which policy you're asking about? For example:\n- AML (Anti-Money Laundering) policy\n- KYC (Know Your Customer) policy\n- Credit/Lending policy\n- GAP policy\n- Code of Conduct policy\n- Or any other specific policy name")
         
         # Check for queries that need account type context
         # e.g., "what is the policy for account?" - needs account type
-        # But only if no specific policy is mentioned
-        if 'policy' in query_lower and ('account' in query_lower or 'deposit' in query_lower) and not has_policy_name:
-            if not any(acc_type in query_lower for acc_type in account_types):
+        if 'account' in query_lower or 'deposit' in query_lower:
+            if _POLICY_ACCOUNT_TYPES_RE.search(query_lower) is None:
                 return (False, "To provide accurate policy information, could you please specify the account type? For example:\n- Savings account\n- Current account\n- Fixed Deposit (FD)\n- Recurring Deposit (RD)\n- Corporate account\n- Or any other specific account type")
         
         # Check for queries that need customer type context
         # e.g., "what is the policy for customer?" - needs customer type
-        # But only if no specific policy is mentioned
-        if 'policy' in query_lower and ('customer' in query_lower or 'client' in query_lower) and not has_policy_name:
-            if not any(cust_type in query_lower for cust_type in customer_types):
+        if 'customer' in query_lower or 'client' in query_lower:
+            if _POLICY_CUSTOMER_TYPES_RE.search(query_lower) is None:
                 return (False, "To provide accurate policy information, could you please specify the customer type? For example:\n- Corporate customer\n- Retail/Personal customer\n- Business/SME customer\n- Or any other specific customer category")
         
         # All required entities are present
@@ -1462,182 +2257,65 @@ When responding:
     
     def _is_banking_product_query(self, query: str) -> bool:
         """Detect if query is about banking products/services (should use LightRAG, not phonebook)"""
-        query_lower = query.lower().strip()
-        
-        # Card product names that indicate a card query (even without the word "card")
-        card_products = [
-            "classic", "gold", "platinum", "infinite", "signature", "titanium", 
-            "world", "visa", "mastercard", "diners club", "unionpay", "taka pay",
-            "prepaid", "debit", "credit", "rfcd", "global"
-        ]
+        query_lower = _normalize_query(query)
         
         # Check if query mentions card products (even without "card" word)
-        has_card_product = any(product in query_lower for product in card_products)
+        has_card_product = _CARD_PRODUCT_NAMES_RE.search(query_lower) is not None
         has_card_keyword = "card" in query_lower
         
         # If query mentions card products + fee/rate keywords, it's a banking product query
-        card_fee_rate_keywords = ['fee', 'fees', 'charge', 'charges', 'rate', 'rates', 'annual', 'yearly', 'interest', 'supplementary', 'supplement']
         if has_card_product or has_card_keyword:
-            if any(kw in query_lower for kw in card_fee_rate_keywords):
-                logger.info(f"[ROUTING] Detected card product query: has_card_product={has_card_product}, has_card_keyword={has_card_keyword}, fee_rate_keywords={[kw for kw in card_fee_rate_keywords if kw in query_lower]}")
+            if _CARD_FEE_RATE_RE.search(query_lower):
+                logger.info(f"[ROUTING] Detected card product query: has_card_product={has_card_product}, has_card_keyword={has_card_keyword}, fee_rate_keywords={_CARD_FEE_RATE_RE.findall(query_lower)}")
                 return True
         
-        # Banking product/service keywords - these should go to LightRAG, NOT phonebook
-        banking_product_keywords = [
-            # Credit/Debit Cards
-            'credit card', 'debit card', 'card limit', 'card conversion', 'card upgrade',
-            'card feature', 'card benefit', 'card reward', 'card fee', 'card charge',
-            'card application', 'card activation', 'card statement', 'card transaction',
-            
-            # Loans
-            'loan', 'personal loan', 'home loan', 'car loan', 'business loan',
-            'loan interest', 'loan rate', 'loan term', 'loan eligibility', 'loan application',
-            'loan approval', 'loan repayment', 'loan emi', 'loan processing',
-            
-            # Accounts
-            'account', 'accounts',  # Standalone account keyword to catch all account types
-            'savings account', 'current account', 'fixed deposit', 'fd', 'rd', 'recurring deposit',
-            'rfcd', 'rfd', 'recurring fixed', 'recurring fixed deposit',  # RFCD account types
-            'account opening', 'account balance', 'account statement', 'account fee',
-            'account interest', 'account rate', 'account minimum balance',
-            'account type', 'account types', 'types of account', 'kinds of account',
-            
-            # Corporate/Commercial Banking
-            'corporate customer', 'corporate customers', 'corporate account', 'corporate accounts',
-            'corporate banking', 'commercial customer', 'commercial customers',
-            'corporate service', 'corporate process', 'corporate procedure',
-            'corporate requirement', 'corporate requirements', 'corporate policy',
-            'corporate confirmation', 'email confirmation', 'email verification',
-            'processing requirement', 'processing requirements', 'before processing',
-            'whose email confirmation', 'email confirmation required', 'confirmation required',
-            'prior email confirmation', 'prior confirmation', 'subject to prior',
-            'subject to email', 'processing subject to', 'subject to confirmation',
-            'in case of corporate', 'case of corporate', 'corporate processing',
-            'in the case of', 'in case of', 'case of', 'subject to',
-            
-            # Banking Services
-            'online banking', 'mobile banking', 'internet banking', 'atm', 'cash withdrawal',
-            'fund transfer', 'remittance', 'foreign exchange', 'forex', 'currency exchange',
-            'locker', 'safe deposit', 'cheque', 'draft', 'demand draft',
-            'standing instruction', 'standing instructions', 'si', 'si setup', 'si cancellation',
-            'si cancel', 'cancel si', 'cancel standing instruction', 'recurring payment',
-            'recurring transfer', 'automatic payment', 'automatic transfer', 'auto debit',
-            'auto credit', 'scheduled payment', 'scheduled transfer', 'recurring debit',
-            'recurring credit', 'auto payment', 'auto transfer',
-
-            # Installment products / card-linked loan features
-            'easycredit', 'easy credit', 'want2buy', 'want 2 buy',
-            
-            # Branch/Center Locations
-            'priority center', 'priority centre', 'priority centers', 'priority centres',
-            'branch', 'branches', 'branch location', 'branch locations',
-            'center', 'centre', 'centers', 'centres', 'service center', 'service centre',
-            'how many', 'number of', 'count of', 'list of', 'where is', 'where are',
-            'sylhet', 'dhaka', 'chittagong', 'city', 'location', 'locations',
-            
-            # Products & Services
-            'banking product', 'financial product', 'service', 'banking service',
-            'product feature', 'product benefit', 'product eligibility', 'product requirement',
-            'interest rate', 'exchange rate', 'service charge', 'fee structure',
-            'conversion', 'upgrade', 'downgrade', 'limit', 'limit increase', 'limit decrease',
-
-            # Specific products (for eligibility queries without "card" keyword)
-            'islamic priority',
-            
-            # Company Information & History
-            'milestone', 'milestones', 'history', 'about ebl', 'ebl history', 'ebl background',
-            'company history', 'bank history', 'establishment', 'founded', 'founding',
-            'achievement', 'achievements', 'award', 'awards', 'recognition', 'recognition',
-            'timeline', 'journey', 'evolution', 'growth', 'development', 'progress'
-        ]
-        
         # Check for banking product patterns
-        return any(keyword in query_lower for keyword in banking_product_keywords)
+        return _BANKING_PRODUCT_KEYWORDS_RE.search(query_lower) is not None
     
-    def _detect_lead_intent(self, query: str) -> Optional[LeadType]:
+    def _detect_lead_intent(self, query: str) -> Optional["LeadType"]:
         """Detect if user wants to apply for credit card or loan"""
-        query_lower = query.lower().strip()
-        
-        # Credit card intent keywords
-        credit_card_keywords = [
-            'apply for credit card', 'want credit card', 'need credit card',
-            'get credit card', 'credit card application', 'apply credit card',
-            'interested in credit card', 'credit card interest', 'new credit card',
-            'generate a lead for credit card', 'lead for credit card', 'create lead credit card'
-        ]
+        query_lower = _normalize_query(query)
         
-        # Loan intent keywords
-        loan_keywords = [
-            'apply for loan', 'want loan', 'need loan', 'get loan',
-            'loan application', 'apply loan', 'interested in loan',
-            'loan interest', 'personal loan', 'home loan', 'car loan',
-            'business loan', 'new loan', 'generate a lead for loan',
-            'lead for loan', 'create lead loan', 'generate lead'
-        ]
-        
-        if any(keyword in query_lower for keyword in credit_card_keywords):
+        if _CREDIT_CARD_LEAD_KEYWORDS_RE.search(query_lower) is not None:
             return LeadType.CREDIT_CARD
-        elif any(keyword in query_lower for keyword in loan_keywords):
+        elif _LOAN_LEAD_KEYWORDS_RE.search(query_lower) is not None:
             return LeadType.LOAN
         
         return None
     
-    def _get_lead_questions(self, lead_type: LeadType) -> List[Dict[str, str]]:
-        """Get questions for lead collection based on type"""
+    def _get_lead_questions(self, lead_type: "LeadType") -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Get the (fields, questions) for lead collection based on type"""
         if lead_type == LeadType.CREDIT_CARD:
-            return [
-                {"field": "full_name", "question": "Great! I'd be happy to help you apply for a credit card. May I have your full name?"},
-                {"field": "phone", "question": "Thank you! What's your phone number?"},
-                {"field": "email", "question": "And your email address?"},
-                {"field": "date_of_birth", "question": "What's your date of birth? (DD/MM/YYYY)"},
-                {"field": "employment_status", "question": "What's your employment status? (Employed/Self-employed/Student/Retired)"},
-                {"field": "monthly_income", "question": "What's your approximate monthly income? (BDT)"},
-            ]
+            return _CREDIT_CARD_LEAD_FIELDS, _CREDIT_CARD_LEAD_QUESTIONS
         elif lead_type == LeadType.LOAN:
-            return [
-                {"field": "full_name", "question": "Great! I'd be happy to help you with a loan application. May I have your full name?"},
-                {"field": "phone", "question": "Thank you! What's your phone number?"},
-                {"field": "email", "question": "And your email address?"},
-                {"field": "loan_type", "question": "What type of loan are you interested in? (Personal/Home/Car/Business)"},
-                {"field": "loan_amount", "question": "What loan amount are you looking for? (BDT)"},
-                {"field": "employment_status", "question": "What's your employment status? (Employed/Self-employed/Student/Retired)"},
-                {"field": "monthly_income", "question": "What's your approximate monthly income? (BDT)"},
-            ]
-        return []
+            return _LOAN_LEAD_FIELDS, _LOAN_LEAD_QUESTIONS
+        return (), ()
     
     def _extract_answer(self, query: str, field: str) -> Optional[str]:
         """Extract answer from user query based on field type"""
-        query_lower = query.lower().strip()
-        
         # For email
         if field == "email":
-            import re
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            match = re.search(email_pattern, query)
+            match = _LEAD_EMAIL_RE.search(query)
             if match:
                 return match.group(0)
         
         # For phone
         elif field == "phone":
-            import re
             # Extract digits
-            digits = re.sub(r'\D', '', query)
+            digits = _NON_DIGIT_RE.sub('', query)
             if len(digits) >= 10:
                 return digits
         
         # For date of birth
         elif field == "date_of_birth":
-            import re
-            date_pattern = r'\d{1,2}[/-]\d{1,2}[/-]\d{2,4}'
-            match = re.search(date_pattern, query)
+            match = _LEAD_DATE_RE.search(query)
             if match:
                 return match.group(0)
         
         # For amounts
         elif field in ["loan_amount", "monthly_income"]:
-            import re
             # Extract numbers
-            numbers = re.findall(r'\d+', query.replace(',', ''))
+            numbers = _DIGITS_RE.findall(query.replace(',', ''))
             if numbers:
                 return numbers[0]
         
@@ -1647,26 +2325,22 @@ When responding:
     def _process_lead_collection(
         self,
         session_id: str,
-        query: str
+        query: str,
+        flow: "LeadFlowState"
     ) -> tuple[str, bool]:
         """
-        Process lead collection flow
+        Process lead collection flow (blocking: saves the lead on the last answer; run via asyncio.to_thread)
+        The caller looks the flow up on the event loop, so lead_flows is never touched from a worker thread.
         Returns: (response_message, is_complete)
         """
-        if session_id not in self.lead_flows:
-            self.lead_flows[session_id] = LeadFlowState()
-        
-        flow = self.lead_flows[session_id]
-        
         # Check if user wants to cancel
-        if any(word in query.lower() for word in ['cancel', 'stop', 'nevermind', 'no thanks', 'no thank you']):
+        if _LEAD_CANCEL_RE.search(query.lower()):
             flow.reset()
             return "No problem! I've cancelled the application. How else can I help you today?", True
         
         # Get current question
-        if flow.current_question_index < len(flow.questions):
-            current_q = flow.questions[flow.current_question_index]
-            field = current_q["field"]
+        if flow.current_question_index < len(flow.fields):
+            field = flow.fields[flow.current_question_index]
             
             # Extract answer
             answer = self._extract_answer(query, field)
@@ -1677,23 +2351,26 @@ When responding:
                 flow.current_question_index += 1
                 
                 # Check if we have more questions
-                if flow.current_question_index < len(flow.questions):
-                    next_q = flow.questions[flow.current_question_index]
-                    return next_q["question"], False
+                if flow.current_question_index < len(flow.fields):
+                    return flow.questions[flow.current_question_index], False
                 else:
                     # All questions answered - save lead
                     if LEADS_AVAILABLE:
                         lead_manager = LeadManager()
-                        lead = lead_manager.create_lead(
-                            session_id=session_id,
-                            lead_type=flow.lead_type,
-                            full_name=flow.collected_data.get("full_name"),
-                            email=flow.collected_data.get("email"),
-                            phone=flow.collected_data.get("phone"),
-                            date_of_birth=flow.collected_data.get("date_of_birth"),
-                            additional_info={k: v for k, v in flow.collected_data.items() 
-                                           if k not in ["full_name", "email", "phone", "date_of_birth"]}
-                        )
+                        try:
+                            lead = lead_manager.create_lead(
+                                session_id=session_id,
+                                lead_type=flow.lead_type,
+                                full_name=flow.collected_data.get("full_name"),
+                                email=flow.collected_data.get("email"),
+                                phone=flow.collected_data.get("phone"),
+                                date_of_birth=flow.collected_data.get("date_of_birth"),
+                                additional_info={k: v for k, v in flow.collected_data.items() 
+                                               if k not in ["full_name", "email", "phone", "date_of_birth"]}
+                            )
+                        finally:
+                            # Return the pooled connection (the manager opened its own session)
+                            lead_manager.close()
                         
                         if lead:
                             flow.reset()
@@ -1707,7 +2384,7 @@ When responding:
                         return "I apologize, but the lead generation system is currently unavailable. Please contact our support team directly.", True
             else:
                 # Couldn't extract answer - ask again
-                return f"I didn't quite catch that. {current_q['question']}", False
+                return f"I didn't quite catch that. {flow.questions[flow.current_question_index]}", False
         else:
             # No more questions - should not happen
             flow.reset()
@@ -1727,19 +2404,30 @@ When responding:
         
         Note: This method should NOT be called when disambiguation state exists (handled at process_chat level).
         Disambiguation resolution is a TERMINAL conversational state - once resolved, orchestrator exits immediately.
+        
+        Results are memoized on the lowercased/stripped query (see _route_knowledge_base).
         """
+        knowledge_base = self._route_knowledge_base(_normalize_query(user_input))
+        logger.info(f"[ROUTING] Knowledge base for query: '{knowledge_base}'")
+        return knowledge_base
+    
+    def _route_knowledge_base_uncached(self, user_input: str) -> str:
+        """Routing rules behind _get_knowledge_base (uncached)."""
+        # Reuses the request's classifier pass (memoized on the same normalized query)
+        query_signals = self._classify_query(user_input)
+        
         # Priority order (most specific first):
         
         # 0. CRITICAL: Organizational overview queries FIRST (before financial reports)
         # These need customer-facing content, NOT investor/financial content
         # Route to ebl_website with explicit filtering
-        if self._is_organizational_overview_query(user_input):
+        if query_signals.org_overview:
             logger.info(f"[ROUTING] Query detected as organizational overview → using 'ebl_website' with customer-facing filter")
             return "ebl_website"  # Will be filtered by prompt instructions + post-retrieval filtering
         
         # 1. Banking product queries → ebl_products knowledge base (if exists)
         # Fallback to ebl_website if ebl_products doesn't exist
-        if self._is_banking_product_query(user_input):
+        if query_signals.banking_product:
             # Check if ebl_products KB exists (could be enhanced with KB existence check)
             # For now, route to ebl_products - LightRAG will handle if it doesn't exist
             logger.info(f"[ROUTING] Query detected as banking product → using 'ebl_products'")
@@ -1747,33 +2435,33 @@ When responding:
         
         # 2. Compliance/Policy queries → ebl_policies knowledge base (if exists)
         # Fallback to ebl_website if ebl_policies doesn't exist
-        if self._is_compliance_query(user_input):
+        if query_signals.compliance:
             logger.info(f"[ROUTING] Query detected as compliance/policy → using 'ebl_policies'")
             return "ebl_policies"  # Dedicated policies KB
         
         # 3. Financial reports/investor queries → ebl_financial_reports knowledge base
         # This is the investor-tier KB
-        if self._is_financial_report_query(user_input):
+        if query_signals.financial_report:
             logger.info(f"[ROUTING] Query detected as financial report/investor → using 'ebl_financial_reports'")
             return "ebl_financial_reports"  # Investor content KB
         
         # 4. Management queries → ebl_website (contains management info)
-        if self._is_management_query(user_input):
+        if query_signals.management:
             logger.info(f"[ROUTING] Query detected as management → using 'ebl_website'")
             return "ebl_website"  # Management info is in ebl_website knowledge base
         
         # 5. Milestone queries → ebl_milestones knowledge base
-        if self._is_milestone_query(user_input):
+        if query_signals.milestone:
             logger.info(f"[ROUTING] Query detected as milestone → using 'ebl_milestones'")
             return "ebl_milestones"
         
         # 6. User document queries → user documents knowledge base
-        if self._is_user_document_query(user_input):
+        if query_signals.user_document:
             logger.info(f"[ROUTING] Query detected as user document → using 'ebl_user_documents'")
             return "ebl_user_documents"
         
         # 7. Employee queries → employees knowledge base (if exists)
-        if self._is_employee_query(user_input):
+        if query_signals.employee:
             logger.info(f"[ROUTING] Query detected as employee → using 'ebl_employees'")
             return "ebl_employees"
         
@@ -1803,15 +2491,16 @@ When responding:
         pending_disambiguation = await self._get_disambiguation_state_any(conversation_key)
 
         # Signals
-        is_location_query = self._is_location_query(query)
-        is_retail_asset_fee_query = self._is_retail_asset_fee_query(query)
-        is_skybanking_fee_query = self._is_skybanking_fee_query(query)
-        is_fee_schedule_query = self._is_fee_schedule_query(query)
+        is_location_query = self._gate("location", query)
+        is_retail_asset_fee_query = self._gate("retail_asset_fee", query)
+        is_skybanking_fee_query = self._gate("skybanking_fee", query)
+        is_fee_schedule_query = self._gate("fee_schedule", query)
 
-        is_small_talk = self._is_small_talk(query)
-        is_contact_query = self._is_contact_info_query(query)
-        is_phonebook_query = self._is_phonebook_query(query)
-        is_employee_query = self._is_employee_query(query)
+        query_signals = self._classify_query(query)
+        is_small_talk = query_signals.small_talk
+        is_contact_query = query_signals.contact
+        is_phonebook_query = query_signals.phonebook
+        is_employee_query = query_signals.employee
 
         # If knowledge_base not explicitly provided, match runtime behavior
         chosen_kb = knowledge_base or self._get_knowledge_base(query)
@@ -1827,7 +2516,7 @@ When responding:
             target = "FEE_ENGINE_SKYBANKING"
         elif is_fee_schedule_query:
             target = "FEE_ENGINE_CARDS"
-        elif (is_phonebook_query or is_contact_query or is_employee_query) and not is_small_talk:
+        elif query_signals.directory_lookup:
             target = "PHONEBOOK"
         elif is_small_talk:
             target = "OPENAI_SMALL_TALK"
@@ -1854,31 +2543,67 @@ When responding:
             },
         }
     
-    def _get_current_datetime(self) -> str:
-        """Get current date and time in a formatted string"""
+    def _classify_query(self, query: str) -> QuerySignals:
+        """
+        Run the keyword classifiers once for a query.
+        
+        The predicates only look at the lowercased/stripped query, so results are memoized on it.
+        """
+        return self._classify_normalized_query(_normalize_query(query))
+    
+    def _gate(self, name: str, query: str) -> bool:
+        """Memoized pre-routing gate ("location", "retail_asset_fee", "skybanking_fee", "fee_schedule")"""
+        return self._gate_predicates[name](_normalize_query(query))
+    
+    def _classify_query_uncached(self, query_lower: str) -> QuerySignals:
+        """Classifier pass behind _classify_query (uncached)."""
+        # Evaluated once and reused for the combined verdicts below
+        small_talk = self._is_small_talk(query_lower)
+        contact = self._is_contact_info_query(query_lower)
+        phonebook = self._is_phonebook_query(query_lower)
+        employee = self._is_employee_query(query_lower)
+        org_overview = self._is_organizational_overview_query(query_lower)
+        return QuerySignals(
+            small_talk=small_talk,
+            datetime=self._is_datetime_query(query_lower),
+            contact=contact,
+            phonebook=phonebook,
+            employee=employee,
+            directory_lookup=(contact or phonebook or employee) and not small_talk,
+            org_overview=org_overview,
+            banking_product=self._is_banking_product_query(query_lower),
+            compliance=self._is_compliance_query(query_lower),
+            management=self._is_management_query(query_lower),
+            financial_report=self._is_financial_report_query(query_lower),
+            milestone=not org_overview and self._mentions_milestone(query_lower),
+            user_document=self._is_user_document_query(query_lower),
+        )
+    
+    def _resolve_timezone(self) -> Optional[tzinfo]:
+        """Timezone for datetime answers (None means system local time)"""
         try:
             # Try to get timezone from settings, default to UTC
             timezone_str = getattr(settings, 'TIMEZONE', 'UTC')
-            tz = pytz.timezone(timezone_str)
+            return ZoneInfo(timezone_str)
         except Exception:
             # Fallback to system local time if timezone is invalid
-            tz = None
-        
+            return None
+    
+    def _get_current_datetime(self) -> str:
+        """Get current date and time in a formatted string (memoized per wall-clock second)"""
+        return self._format_datetime_at(int(time.time()))
+    
+    def _format_datetime_uncached(self, epoch_seconds: int) -> str:
+        """Format a unix timestamp for _get_current_datetime (uncached)."""
+        tz = self._datetime_tz
         if tz:
-            now = datetime.now(tz)
+            now = datetime.fromtimestamp(epoch_seconds, tz)
         else:
             # Use system local time
-            now = datetime.now()
+            now = datetime.fromtimestamp(epoch_seconds)
         
         # Format: "Monday, December 9, 2025 at 2:45:30 PM UTC"
-        date_str = now.strftime("%A, %B %d, %Y")
-        time_str = now.strftime("%I:%M:%S %p")
-        
-        if tz:
-            timezone_str = now.strftime("%Z")
-            return f"{date_str} at {time_str} {timezone_str}"
-        else:
-            return f"{date_str} at {time_str}"
+        return now.strftime(_DATETIME_FORMAT_TZ if tz else _DATETIME_FORMAT)
     
     def _clean_markdown_formatting(self, text: str) -> str:
         """
@@ -1888,18 +2613,24 @@ When responding:
         if not text:
             return text
         
-        import re
-        # Remove markdown bold (**text**)
-        text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
-        # Remove markdown italic (*text* or _text_)
-        text = re.sub(r'\*(.*?)\*', r'\1', text)
-        text = re.sub(r'_(.*?)_', r'\1', text)
-        # Remove markdown code blocks (```code```)
-        text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
-        # Remove markdown inline code (`code`)
-        text = re.sub(r'`([^`]+)`', r'\1', text)
-        # Remove markdown headers (# Header)
-        text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
+        # Each pass is skipped when its marker character is absent (a memchr scan instead of a
+        # regex pass); most streamed segments carry no markdown at all. Order is unchanged.
+        if '*' in text:
+            # Remove markdown bold (**text**)
+            text = _MD_BOLD_RE.sub(r'\1', text)
+            # Remove markdown italic (*text*)
+            text = _MD_ITALIC_STAR_RE.sub(r'\1', text)
+        if '_' in text:
+            # Remove markdown italic (_text_)
+            text = _MD_ITALIC_UNDERSCORE_RE.sub(r'\1', text)
+        if '`' in text:
+            # Remove markdown code blocks (```code```)
+            text = _MD_CODE_BLOCK_RE.sub('', text)
+            # Remove markdown inline code (`code`)
+            text = _MD_INLINE_CODE_RE.sub(r'\1', text)
+        if '#' in text:
+            # Remove markdown headers (# Header)
+            text = _MD_HEADER_RE.sub('', text)
         
         return text
     
@@ -1911,8 +2642,6 @@ When responding:
         if not text:
             return text
         
-        import re
-        
         # Check if context contains BDT amounts
         has_bdt_in_context = "BDT" in context if context else False
         
@@ -1920,9 +2649,9 @@ When responding:
         # Replace ₹ (Indian Rupee) with BDT if context has BDT
         if has_bdt_in_context:
             # Match ₹ followed by optional space and number
-            text = re.sub(r'₹\s*(\d+(?:[.,]\d+)?)', r'BDT \1', text)
+            text = _RUPEE_AMOUNT_RE.sub(r'BDT \1', text)
             # Also catch cases where ₹ might be used with commas
-            text = re.sub(r'₹\s*(\d{1,3}(?:,\d{3})*(?:\.\d+)?)', r'BDT \1', text)
+            text = _RUPEE_GROUPED_AMOUNT_RE.sub(r'BDT \1', text)
         
         return text
     
@@ -1935,21 +2664,19 @@ When responding:
         if not text:
             return text
         
-        import re
-        
         # Replace "Eastern Bank Limited" with "Eastern Bank PLC." (case-insensitive)
-        text = re.sub(r'Eastern Bank Limited', 'Eastern Bank PLC.', text, flags=re.IGNORECASE)
+        text = _BANK_NAME_LIMITED_RE.sub('Eastern Bank PLC.', text)
         # Replace "Eastern Bank Ltd." with "Eastern Bank PLC." (case-insensitive)
-        text = re.sub(r'Eastern Bank Ltd\.', 'Eastern Bank PLC.', text, flags=re.IGNORECASE)
+        text = _BANK_NAME_LTD_DOT_RE.sub('Eastern Bank PLC.', text)
         # Also catch "Eastern Bank Ltd" without period
-        text = re.sub(r'Eastern Bank Ltd\b', 'Eastern Bank PLC.', text, flags=re.IGNORECASE)
+        text = _BANK_NAME_LTD_RE.sub('Eastern Bank PLC.', text)
         
         # Ensure "Eastern Bank PLC" (without period) becomes "Eastern Bank PLC." (with period)
         # More aggressive: replace ALL instances of "Eastern Bank PLC" (without period) with "Eastern Bank PLC."
         # First, handle cases where it's already followed by a period (do nothing)
         # Then, replace all other instances
         # Match "Eastern Bank PLC" that is NOT followed by a period
-        text = re.sub(r'\bEastern Bank PLC\b(?!\.)', 'Eastern Bank PLC.', text, flags=re.IGNORECASE)
+        text = _BANK_NAME_PLC_NO_DOT_RE.sub('Eastern Bank PLC.', text)
         
         return text
     
@@ -1964,7 +2691,6 @@ When responding:
         Returns:
             Selected option dict or None if no match
         """
-        import re
         query_lower = query.strip().lower()
         
         # Stopwords that should not be used for matching (common words in answer_text)
@@ -1979,7 +2705,7 @@ When responding:
         
         # Fix A: Extract leading number with regex to handle "1.", "1)", "1. Fast Cash...", etc.
         # Match patterns like: "1", "1.", "1)", "1. Fast Cash", "1) Fast Cash", etc.
-        m = re.match(r"^\s*(\d+)\s*[\.\)]?\s*", query_lower)
+        m = _SELECTION_NUMBER_RE.match(query_lower)
         if m:
             try:
                 selection_num = int(m.group(1))
@@ -2078,8 +2804,7 @@ When responding:
         """
         # Import fee engine client
         try:
-            from app.services.fee_engine_client import FeeEngineClient
-            fee_client = FeeEngineClient()
+            fee_client = self.fee_engine_client
             
             logger.info(f"[FEE_ENGINE] Attempting to calculate fee for query: '{query}'")
             # Try to calculate fee using fee engine
@@ -2507,6 +3232,7 @@ When responding:
         context_parts = []
         sources = []
         seen_sources = set()  # To avoid duplicates
+        seen_chunk_texts = set()  # Whitespace-normalized chunk texts already added
         excluded_count = 0  # Track how many chunks were excluded
         payload = lightrag_response.get("data") if isinstance(lightrag_response.get("data"), dict) else lightrag_response
 
@@ -2526,12 +3252,12 @@ When responding:
                     context_parts.append("Entities Data From Knowledge Graph(KG):")
                 else:
                     context_parts.append("\n\nEntities Data From Knowledge Graph(KG):")
-                for entity in entities[:5]:  # Limit to top 5
-                    if isinstance(entity, dict):
-                        name = entity.get("name", entity.get("entity_name", ""))
-                        desc = entity.get("description", "")
-                        if name or desc:
-                            context_parts.append(f"- {name}: {desc}")
+                entity_fields = (
+                    (entity.get("name", entity.get("entity_name", "")), entity.get("description", ""))
+                    for entity in entities[:5]  # Limit to top 5
+                    if isinstance(entity, dict)
+                )
+                context_parts.extend(f"- {name}: {desc}" for name, desc in entity_fields if name or desc)
         
         # Extract relationships
         if "relationships" in payload:
@@ -2541,13 +3267,20 @@ When responding:
                     context_parts.append("Relationships Data From Knowledge Graph(KG):")
                 else:
                     context_parts.append("\n\nRelationships Data From Knowledge Graph(KG):")
-                for rel in relationships[:5]:  # Limit to top 5
-                    if isinstance(rel, dict):
-                        source = rel.get("source", rel.get("entity_a", ""))
-                        relation = rel.get("relation", rel.get("relationship", ""))
-                        target = rel.get("target", rel.get("entity_b", ""))
-                        if source and relation and target:
-                            context_parts.append(f"- {source} → {relation} → {target}")
+                relationship_fields = (
+                    (
+                        rel.get("source", rel.get("entity_a", "")),
+                        rel.get("relation", rel.get("relationship", "")),
+                        rel.get("target", rel.get("entity_b", "")),
+                    )
+                    for rel in relationships[:5]  # Limit to top 5
+                    if isinstance(rel, dict)
+                )
+                context_parts.extend(
+                    f"- {source} → {relation} → {target}"
+                    for source, relation, target in relationship_fields
+                    if source and relation and target
+                )
         
         # Extract document chunks and their sources
         if "chunks" in payload:
@@ -2578,7 +3311,13 @@ When responding:
                         
                         text = chunk.get("text", chunk.get("content", ""))
                         if text:
-                            context_parts.append(f"- {text}")
+                            # Overlapping retrievals often return the same passage twice; send it once
+                            text_key = " ".join(text.split())
+                            if text_key in seen_chunk_texts:
+                                logger.info(f"[FILTER] Skipping duplicate chunk text from: {source or 'unknown'}")
+                            else:
+                                seen_chunk_texts.add(text_key)
+                                context_parts.append(f"- {text}")
                         
                         # Add source to sources list (only if not filtered)
                         if source and source not in seen_sources:
@@ -2633,10 +3372,9 @@ When responding:
         if not q:
             return []
         ql = q.lower()
-        import re
 
         # Tokenize into alphanumerics only
-        tokens = re.findall(r"[a-z0-9]+", ql)
+        tokens = _ALNUM_TOKEN_RE.findall(ql)
         if not tokens:
             return []
 
@@ -2720,18 +3458,46 @@ When responding:
         except Exception:
             return lightrag_response
     
+    def _compact_lightrag_response(self, lightrag_response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Keep only the parts of a LightRAG response that _format_lightrag_context reads
+        (top entities/relationships/chunks and their display fields, references, response).
+        Cached copies are several times smaller, which saves Redis memory and JSON work on every hit.
+        """
+        def _trim(items: Any, limit: Optional[int], fields: Tuple[str, ...]) -> Any:
+            if not isinstance(items, list):
+                return items
+            return [
+                {key: item[key] for key in fields if key in item} if isinstance(item, dict) else item
+                for item in items[:limit]
+            ]
+        
+        data = lightrag_response.get("data")
+        payload = data if isinstance(data, dict) else lightrag_response
+        compact_payload = {
+            section: _trim(payload[section], limit, fields)
+            for section, (limit, fields) in _LIGHTRAG_SECTION_FIELDS.items()
+            if section in payload
+        }
+        compact = {"data": compact_payload} if payload is data else compact_payload
+        if "references" in lightrag_response:
+            compact["references"] = _trim(lightrag_response["references"], None, _LIGHTRAG_REFERENCE_FIELDS)
+        if "response" in lightrag_response:
+            compact["response"] = lightrag_response["response"]
+        return compact
+    
     def _improve_query_for_lightrag(self, query: str, is_card_rates_query: bool = False) -> str:
         """
         Improve query phrasing for better LightRAG results
         Converts conversational queries into more specific, search-friendly formats
         Expands synonyms to improve semantic matching
         """
-        query_lower = query.lower().strip()
+        query_lower = _normalize_query(query)
         improved_query = query
         
         # CRITICAL: Organizational overview queries - enhance to retrieve customer-facing content
         # Add keywords that help LightRAG find customer-facing info, not financial/investor content
-        if self._is_organizational_overview_query(query):
+        if self._classify_query(query).org_overview:
             # Enhance query to bias retrieval toward customer-facing content
             # Add terms that are more likely in customer-facing docs vs annual reports
             customer_facing_keywords = "banking services accounts loans cards digital platforms EBLConnect customer"
@@ -2740,9 +3506,7 @@ When responding:
         
         # Note: LightRAG uses semantic search, so it should handle synonyms automatically
         # However, we log when we detect synonym-using queries for monitoring
-        import re
-        synonym_terms = ['credited', 'paid', 'deposited', 'fee', 'charge', 'rate', 'frequency', 'schedule']
-        if any(term in query_lower for term in synonym_terms):
+        if _SYNONYM_TERMS_RE.search(query_lower):
             logger.info(f"[QUERY_SYNONYM] Query contains synonym terms: '{query[:80]}' - LightRAG semantic search should handle this")
 
         # Improve Islamic Priority retrieval by adding the full card name
@@ -2774,22 +3538,213 @@ When responding:
         # Return improved query
         return improved_query
     
-    async def _get_lightrag_context(
+    def _search_phonebook(self, query: str) -> tuple[str, List[Dict[str, Any]], int]:
+        """
+        Extract the search term from a contact query and look it up in the phone book.
+        Blocking (runs DB queries); callers run it in a worker thread.
+        
+        Returns: (search_term, results, total_count)
+        """
+        phonebook_db = get_phonebook_db()
+        results: List[Dict[str, Any]] = []
+        
+        # Extract search term from query
+        # For role-based queries like "branch manager of X", preserve the full context
+        query_lower = query.lower()
+        
+        # Check if it's a role + location query (e.g., "branch manager of Gulshan")
+        match = _PB_ROLE_LOCATION_RE.search(query_lower)
+        if match:
+            # Extract location/branch name
+            location = match.group(3).strip()
+            role = match.group(1) + "manager" if match.group(1) else "manager"
+            search_term = f"{role} {location}"
+            logger.info(f"[PHONEBOOK] Extracted role+location query: '{search_term}' from '{query}'")
+            results = phonebook_db.smart_search(search_term, limit=_PB_FETCH_LIMIT)
+        else:
+            # First, check if query starts with "find", "search", "lookup", etc. and extract the term after it
+            match = _PB_FIND_PREFIX_RE.search(query_lower)
+            if match:
+                # Extract the search term after the prefix
+                search_term = match.group(2).strip()
+                logger.info(f"[PHONEBOOK] Extracted search term '{search_term}' from query '{query}' (removed prefix '{match.group(1)}')")
+            else:
+                # Handle patterns like "phone number of X", "contact info for X", "email of X"
+                # Extract employee ID/name after "of", "for", etc.
+                # Pattern: (contact word) (optional "number") (of/for/about) (employee ID/name)
+                match = None
+                for pattern in _PB_OF_FOR_RES:
+                    match = pattern.search(query_lower)
+                    if match:
+                        search_term = match.group(2).strip() if len(match.groups()) >= 2 else match.group(1).strip()
+                        logger.info(f"[PHONEBOOK] Extracted search term '{search_term}' from query '{query}' (removed contact info prefix)")
+                        break
+                if not match:
+                    # Standard extraction: remove common words but preserve role and location terms
+                    search_term = _PB_STRIP_WORDS_RE.sub('', query).strip()
+            # Clean up multiple spaces and remove leading/trailing "of", "for", "about"
+            search_term = _WHITESPACE_RE.sub(' ', search_term).strip()
+            search_term = _PB_LEADING_PREP_RE.sub('', search_term).strip()
+            search_term = _PB_TRAILING_PREP_RE.sub('', search_term).strip()
+        
+            # Remove bank name suffixes (e.g., "of EBL", "of Eastern Bank", "at EBL")
+            # This helps when queries include "head of Retail & SME Banking Division of EBL"
+            search_term = _PB_BANK_SUFFIX_RE.sub('', search_term).strip()
+        
+            # Remove "Division" if it appears anywhere (e.g., "Retail & SME Banking Division head" -> "Retail & SME Banking head")
+            # This helps match designations that don't include "Division"
+            # Remove "division" as a whole word (not part of other words)
+            original_search_term = search_term
+            search_term = _PB_DIVISION_RE.sub('', search_term).strip()
+            # Clean up multiple spaces that might result
+            search_term = _WHITESPACE_RE.sub(' ', search_term).strip()
+            if original_search_term != search_term:
+                logger.info(f"[PHONEBOOK] Removed 'division' from search term: '{original_search_term}' -> '{search_term}'")
+        
+            # If search term looks like a division/department name without a role, try adding "head"
+            # This handles queries like "Who is Retail & SME Banking Division?" -> "Retail & SME Banking head"
+            search_term_lower = search_term.lower()
+            has_division_keyword = _PB_DIVISION_KEYWORDS_RE.search(search_term_lower) is not None
+            has_role_keyword = _PB_ROLE_KEYWORDS_RE.search(search_term_lower) is not None
+        
+            # If it looks like a division/department name but no role mentioned, try with "head"
+            if has_division_keyword and not has_role_keyword:
+                search_term_with_head = f"{search_term} head"
+                logger.info(f"[PHONEBOOK] Query looks like division/department without role, trying with 'head': '{search_term_with_head}'")
+                # Try search with "head" added
+                results = phonebook_db.smart_search(search_term_with_head, limit=_PB_FETCH_LIMIT)
+                if results:
+                    logger.info(f"[OK] Found {len(results)} results with 'head' added")
+                else:
+                    # Also try department search as fallback
+                    logger.info(f"[PHONEBOOK] No results with 'head', trying department search for: '{search_term}'")
+                    dept_results = phonebook_db.search_by_department(search_term, limit=_PB_FETCH_LIMIT)
+                    if dept_results:
+                        results = dept_results
+                        logger.info(f"[OK] Found {len(dept_results)} results via department search")
+                    else:
+                        # Try original search term as fallback
+                        results = phonebook_db.smart_search(search_term, limit=_PB_FETCH_LIMIT)
+            else:
+                # Try multiple search strategies
+                results = phonebook_db.smart_search(search_term, limit=_PB_FETCH_LIMIT)
+        
+        # Final cleanup: Always remove "division" and bank name suffixes before searching
+        # This ensures cleanup happens regardless of which code path was taken
+        if search_term:
+            original_final = search_term
+            search_term = _PB_BANK_SUFFIX_RE.sub('', search_term).strip()
+            search_term = _PB_DIVISION_RE.sub('', search_term).strip()
+            search_term = _WHITESPACE_RE.sub(' ', search_term).strip()
+            if original_final != search_term:
+                logger.info(f"[PHONEBOOK] Final cleanup: '{original_final}' -> '{search_term}'")
+                # If we cleaned the term and haven't searched yet, try searching with cleaned term
+                if not results:
+                    results = phonebook_db.smart_search(search_term, limit=_PB_FETCH_LIMIT)
+        
+        # Searches fetch one row beyond what is shown, so the separate count query
+        # only runs when there really are more matches than fit in the answer
+        total_count = len(results)
+        if total_count > _PB_SHOWN_RESULTS:
+            total_count = phonebook_db.count_search_results(search_term)
+        return search_term, results[:_PB_SHOWN_RESULTS], total_count
+    
+    def _format_phonebook_entries(self, results: List[Dict[str, Any]]) -> List[str]:
+        """Format up to 5 phone book matches as list-style chunks (one chunk per entry)."""
+        chunks = []
+        for i, emp in enumerate(results[:_PB_SHOWN_RESULTS], 1):
+            lines = [f"{i}. {emp['full_name']}\n"]
+            if emp.get('designation'):
+                lines.append(f"   Designation: {emp['designation']}\n")
+            if emp.get('department'):
+                lines.append(f"   Department: {emp['department']}\n")
+            if emp.get('email'):
+                lines.append(f"   Email: {emp['email']}\n")
+            if emp.get('employee_id'):
+                lines.append(f"   Employee ID: {emp['employee_id']}\n")
+            if emp.get('mobile'):
+                lines.append(f"   Mobile: {emp['mobile']}\n")
+            if emp.get('ip_phone'):
+                lines.append(f"   IP Phone: {emp['ip_phone']}\n")
+            # Empty line between entries
+            lines.append("\n")
+            chunks.append("".join(lines))
+        return chunks
+    
+    async def _phonebook_response_chunks(self, query: str, streaming: bool = False) -> List[str]:
+        """
+        Look up a contact query in the phone book and render the answer as chunks.
+        Covers every outcome (results, no results, lookup error) so both handlers just emit and persist;
+        streaming single-contact cards drop blank lines and are sent as one chunk.
+        """
+        try:
+            search_term, results, total_count = await asyncio.to_thread(self._search_phonebook, query)
+            
+            if results:
+                logger.info(f"[OK] Found {len(results)} results in phonebook for: {search_term}")
+                if len(results) == 1:
+                    # Single result - detailed format
+                    contact_info = get_phonebook_db().format_contact_info(results[0])
+                    if streaming:
+                        return [
+                            "".join(sentence + '\n' for sentence in contact_info.split('\n') if sentence.strip()),
+                            "\n\n" + self.PHONEBOOK_SOURCE,
+                        ]
+                    return [f"{contact_info}\n\n{self.PHONEBOOK_SOURCE}"]
+                # Multiple results - list format followed by the summary
+                chunks = self._format_phonebook_entries(results)
+                chunks.append(self._phonebook_summary(total_count))
+                return chunks
+            
+            # No results in phonebook - return helpful message (DO NOT use LightRAG)
+            logger.info(f"[INFO] No results in phonebook for '{search_term}' (contact query - NOT using LightRAG)")
+            return [self.PHONEBOOK_NO_RESULTS_TEMPLATE.format(search_term=search_term)]
+        except Exception as e:
+            # For contact queries, even if phonebook has an error, don't use LightRAG
+            logger.error(f"[ERROR] Phonebook error for contact query (NOT using LightRAG): {e}")
+            return [self.PHONEBOOK_ERROR_RESPONSE]
+    
+    async def _handle_contact_query(
         self,
+        session_id: str,
         query: str,
-        knowledge_base: Optional[str] = None,
-        filter_financial_docs: bool = False
-    ) -> tuple[str, list[str]]:
+        client_ip: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
         """
-        Get context from LightRAG (with caching)
+        Answer a phonebook/contact/employee query from the phone book (streaming).
+        Contact queries never fall through to LightRAG, even when the lookup fails.
+        """
+        chunks = await self._phonebook_response_chunks(query, streaming=True)
+        for chunk in chunks:
+            yield chunk
         
-        Args:
-            query: The query string
-            knowledge_base: Knowledge base to query
-            filter_financial_docs: If True, exclude annual reports/financial statements from chunks
+        # Save to memory
+        await self._persist_turn(session_id, query, "".join(chunks), knowledge_base=None, client_ip=client_ip)
+    
+    async def _handle_contact_query_sync(
+        self,
+        session_id: str,
+        query: str,
+        client_ip: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Non-streaming counterpart of _handle_contact_query; returns the final response dict."""
+        response = "".join(await self._phonebook_response_chunks(query))
         
-        Returns: (context_string, sources_list)
-        """
+        # Save to memory
+        await self._persist_turn(session_id, query, response, knowledge_base=None, client_ip=client_ip)
+        
+        return {
+            "response": response,
+            "session_id": session_id
+        }
+    
+    def _lightrag_cache_keys(
+        self,
+        query: str,
+        knowledge_base: Optional[str] = None,
+        filter_financial_docs: bool = False
+    ) -> LightRAGCacheKeys:
+        """Improve the query for LightRAG and derive its Redis and in-process cache keys."""
         kb = knowledge_base or settings.LIGHTRAG_KNOWLEDGE_BASE
         
         # Improve query phrasing for better results
@@ -2801,15 +3756,66 @@ When responding:
         # Otherwise, changing only_need_context / rerank settings can reuse stale cached responses.
         cache_key_query = (
             f"{improved_query} || endpoint=query_data || mode=mix || top_k=8 || chunk_top_k=10 || "
-            f"include_references=1 || only_need_context=1 || enable_rerank=0"
+            f"include_references=1 || only_need_context=1 || enable_rerank=0 || "
+            f"version={settings.LIGHTRAG_CACHE_VERSION}"
         )
         cache_key = get_cache_key(cache_key_query, kb)
+        return LightRAGCacheKeys(improved_query, cache_key, f"{cache_key}|filter_financial={int(filter_financial_docs)}")
+    
+    async def _lookup_cached_answer(
+        self,
+        response_cache_keys: List[str],
+        lightrag_keys: LightRAGCacheKeys
+    ) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Read the response cache and the LightRAG retrieval cache in one round trip (MGET).
+        Returns (first cached response or None, cached retrieval for _get_lightrag_context); the retrieval
+        is not fetched (_NOT_FETCHED) when the in-process context cache already holds it.
+        """
+        fetch_retrieval = self._get_cached_context(lightrag_keys.local_key) is None
+        keys = response_cache_keys + [lightrag_keys.redis_key] if fetch_retrieval else response_cache_keys
+        values = await self.redis_cache.get_many(keys)
+        cached = next((value for value in values[:len(response_cache_keys)] if value), None)
+        return cached, (values[-1] if fetch_retrieval else _NOT_FETCHED)
+    
+    async def _get_lightrag_context(
+        self,
+        query: str,
+        knowledge_base: Optional[str] = None,
+        filter_financial_docs: bool = False,
+        cache_keys: Optional[LightRAGCacheKeys] = None,
+        cached_retrieval: Any = _NOT_FETCHED
+    ) -> tuple[str, list[str]]:
+        """
+        Get context from LightRAG (with caching)
+        
+        Args:
+            query: The query string
+            knowledge_base: Knowledge base to query
+            filter_financial_docs: If True, exclude annual reports/financial statements from chunks
+            cache_keys: Keys from _lightrag_cache_keys, when the caller already built them
+            cached_retrieval: Redis value already fetched for cache_keys.redis_key (see _lookup_cached_answer)
+        
+        Returns: (context_string, sources_list)
+        """
+        kb = knowledge_base or settings.LIGHTRAG_KNOWLEDGE_BASE
+        improved_query, cache_key, local_cache_key = cache_keys or self._lightrag_cache_keys(
+            query, knowledge_base, filter_financial_docs
+        )
         
-        # Check cache first
-        cached = await self.redis_cache.get(cache_key)
+        # Check the in-process cache (already formatted), then Redis (raw response)
+        formatted = self._get_cached_context(local_cache_key)
+        if formatted:
+            logger.info(f"Local cache HIT for query: {improved_query[:50]}... (key: {cache_key})")
+            context, sources = formatted
+            return context, list(sources)
+        if cached_retrieval is _NOT_FETCHED:
+            cached_retrieval = await self.redis_cache.get(cache_key)
+        cached = cached_retrieval
         if cached:
             logger.info(f"Cache HIT for query: {improved_query[:50]}... (key: {cache_key})")
             context, sources = self._format_lightrag_context(cached, filter_financial_docs=filter_financial_docs)
+            self._store_cached_context(local_cache_key, (context, tuple(sources)))
             return context, sources
         
         logger.info(f"Cache MISS for query: {improved_query[:50]}... (key: {cache_key})")
@@ -2837,10 +3843,11 @@ When responding:
             # Filter chunks to reduce irrelevant context bleed-through
             response = self._filter_lightrag_chunks_for_query(response, improved_query)
 
-            # Cache the response (using parameter-aware cache key)
-            await self.redis_cache.set(cache_key, response)
+            # Cache the response (using parameter-aware cache key) without holding up the answer
+            self._run_in_background(self.redis_cache.set(cache_key, self._compact_lightrag_response(response)))
             
             context, sources = self._format_lightrag_context(response, filter_financial_docs=filter_financial_docs)
+            self._store_cached_context(local_cache_key, (context, tuple(sources)))
             
             # Low-confidence check: if context is too short, it might not be reliable
             # For banking, it's better to return empty and let the chatbot handle gracefully
@@ -2867,36 +3874,52 @@ When responding:
         conversation_history: List[Dict[str, str]]
     ) -> List[Dict[str, str]]:
         """Build messages for OpenAI API"""
-        messages = [
-            {"role": "system", "content": self.system_message}
-        ]
+        messages = [self._system_prompt_message]
         
-        # Add conversation history
-        for msg in conversation_history:
-            messages.append({
-                "role": msg.get("role", "user"),
-                "content": msg.get("message", "")
-            })
+        # Add conversation history (already in chat-message shape; see _load_conversation_history)
+        messages.extend(conversation_history)
         
-        # Add current date/time information if query is about date/time
-        datetime_info = ""
-        if self._is_datetime_query(query):
-            current_datetime = self._get_current_datetime()
-            datetime_info = f"\n\nCurrent Date and Time: {current_datetime}"
         # Add current query with context (+ prompt add-ons)
         if context:
             prompt_addons = self._build_prompt_addons(query, context, conversation_history)
-            user_message = f"Context from knowledge base:\n{context}\n\nUser query: {query}{datetime_info}{prompt_addons}"
+            user_message = f"Context from knowledge base:\n{context}\n\nUser query: {query}{prompt_addons}"
         else:
-            user_message = f"{query}{datetime_info}"
+            user_message = query
         
         messages.append({
             "role": "user",
             "content": user_message
         })
+        messages = self._trim_to_budget(messages)
+        
+        # Current date/time (changes every second) goes in a trailing system note, not the user turn,
+        # so everything up to and including the user message stays byte-identical for prompt caching
+        if self._classify_query(query).datetime:
+            messages.append({
+                "role": "system",
+                "content": f"Current Date and Time: {self._get_current_datetime()}"
+            })
         
         return messages
     
+    def _trim_to_budget(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Drop the oldest history turns until the estimated prompt size fits OPENAI_PROMPT_BUDGET_TOKENS.
+        The system message and the current user turn are always kept.
+        """
+        max_chars = settings.OPENAI_PROMPT_BUDGET_TOKENS * self.CHARS_PER_TOKEN
+        total_chars = sum(len(msg["content"]) for msg in messages)
+        if total_chars <= max_chars:
+            return messages
+        
+        dropped = 0
+        while len(messages) > 2 and total_chars > max_chars:
+            total_chars -= len(messages.pop(1)["content"])
+            dropped += 1
+        if dropped:
+            logger.warning(f"[PROMPT] Dropped {dropped} oldest history message(s) to fit the prompt budget (~{total_chars // self.CHARS_PER_TOKEN} tokens)")
+        return messages
+    
     def _get_conversation_key(self, session_id: Optional[str], client_ip: Optional[str] = None, channel: Optional[str] = None, sender_id: Optional[str] = None) -> str:
         """
         Derive stable conversation key for Redis disambiguation state.
@@ -2991,10 +4014,12 @@ When responding:
         # DISABLED: Lead generation is disabled via ENABLE_LEAD_GENERATION setting
         # Code preserved for future use - set ENABLE_LEAD_GENERATION=True in .env to re-enable
         if settings.ENABLE_LEAD_GENERATION and LEADS_AVAILABLE:
-            if session_id in self.lead_flows and self.lead_flows[session_id].state == ConversationState.LEAD_COLLECTING:
-                response, is_complete = self._process_lead_collection(session_id, query)
+            flow = self._get_lead_flow(session_id)
+            if flow is not None and flow.state == ConversationState.LEAD_COLLECTING:
+                # Blocking when the last answer saves the lead; keep the DB insert off the event loop
+                response, is_complete = await asyncio.to_thread(self._process_lead_collection, session_id, query, flow)
                 if is_complete:
-                    self.lead_flows[session_id].state = ConversationState.NORMAL
+                    flow.state = ConversationState.NORMAL
                 # Save to memory
                 await self._persist_turn(session_id, query, response)
                 yield response
@@ -3008,41 +4033,19 @@ When responding:
             
             # If new lead intent detected, start lead collection
             if lead_intent:
-                if session_id not in self.lead_flows:
-                    self.lead_flows[session_id] = LeadFlowState()
-                
-                flow = self.lead_flows[session_id]
+                flow = self._get_lead_flow(session_id, create=True)
                 flow.state = ConversationState.LEAD_COLLECTING
                 flow.lead_type = lead_intent
-                flow.questions = self._get_lead_questions(lead_intent)
+                flow.fields, flow.questions = self._get_lead_questions(lead_intent)
                 flow.current_question_index = 0
                 
                 # Start with first question
-                first_question = flow.questions[0]["question"]
+                first_question = flow.questions[0]
                 # Save to memory
                 await self._persist_turn(session_id, query, first_question)
                 yield first_question
                 return
         
-        # Get conversation history
-        db = get_db()
-        memory = PostgresChatMemory(db=db)
-        conversation_history = []
-        try:
-            if memory._available:
-                history = memory.get_conversation_history(
-                    session_id=session_id,
-                    limit=settings.MAX_CONVERSATION_HISTORY
-                )
-                conversation_history = [
-                    {"role": msg.role, "message": msg.message}
-                    for msg in history
-                ]
-        finally:
-            memory.close()
-            if db:
-                db.close()
-        
         # ===== ROUTING DECISION LOGGING =====
         logger.info(f"[ROUTING] ===== Processing Query (STREAMING): '{query}' =====")
         logger.info(f"[ROUTING] CODE VERSION: Corporate customer routing fix v2.0 - includes 'in the case of' pattern")
@@ -3050,9 +4053,10 @@ When responding:
         # ===== LOCATION QUERIES - ROUTE TO LOCATION SERVICE (HIGHEST PRIORITY) =====
         # Route location queries (branches, ATMs, CRMs, RTDMs, priority centers, head office) to location service
         # This MUST be checked BEFORE fee schedule queries to avoid misrouting priority center queries
-        is_location_query = self._is_location_query(query)
+        is_location_query = self._gate("location", query)
         if is_location_query:
             logger.info(f"[LOCATION_SERVICE] ✓✓✓ LOCATION QUERY DETECTED: '{query}' → ROUTING TO LOCATION SERVICE (NO LightRAG, NO KB)")
+            history_task = self._start_history_load(session_id)
             location_context = await self._get_location_context(query)
             sources = ["EBL Location Database (Normalized)"]
             
@@ -3061,25 +4065,18 @@ When responding:
             logger.info(f"[LOCATION_SERVICE] Using EXCLUSIVE location service context: {len(location_context)} chars (LightRAG/KB explicitly skipped)")
             
             # Build messages with location context only
+            conversation_history = await history_task
             messages = self._build_messages(query, combined_context, conversation_history)
             
             # Stream response from OpenAI with location data only
-            full_response = ""
+            response_parts: List[str] = []
             try:
-                max_response_tokens = min(settings.OPENAI_MAX_TOKENS, 2000)
-                stream = await self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL,
-                    messages=messages,
-                    temperature=settings.OPENAI_TEMPERATURE,
-                    max_tokens=max_response_tokens,
-                    stream=True
-                )
-                
-                async for chunk in stream:
-                    if chunk.choices and chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        full_response += content
-                        yield content
+                async for content in self._coalesce_deltas(self._stream_completion(
+                    messages=messages, **self._location_completion_kwargs
+                )):
+                    response_parts.append(content)
+                    yield content
+                full_response = "".join(response_parts)
             except Exception as e:
                 logger.error(f"[LOCATION_SERVICE] Error generating response: {e}")
                 error_msg = "I apologize, but I encountered an error while processing your location inquiry. Please try again."
@@ -3093,7 +4090,7 @@ When responding:
         
         # ===== CRITICAL: RETAIL ASSET FEE QUERIES - EXCLUSIVE FEE ENGINE ROUTING (HIGH PRIORITY) =====
         # Check for retail asset fee queries BEFORE card fee queries
-        is_retail_asset_fee_query = self._is_retail_asset_fee_query(query)
+        is_retail_asset_fee_query = self._gate("retail_asset_fee", query)
         if is_retail_asset_fee_query:
             logger.info(f"[FEE_ENGINE] ✓✓✓ RETAIL ASSET FEE QUERY DETECTED: '{query}' → EXCLUSIVE ROUTING TO FEE ENGINE")
             fee_context = await self._get_card_rates_context(query, session_id=effective_session_id, conversation_key=conversation_key)  # FIX #1: Pass conversation_key for stable disambiguation state
@@ -3120,7 +4117,7 @@ When responding:
         
         # ===== CRITICAL: SKYBANKING FEE QUERIES - EXCLUSIVE FEE ENGINE ROUTING (HIGH PRIORITY) =====
         # Check for Skybanking fee queries BEFORE card fee queries
-        is_skybanking_fee_query = self._is_skybanking_fee_query(query)
+        is_skybanking_fee_query = self._gate("skybanking_fee", query)
         if is_skybanking_fee_query:
             logger.info(f"[FEE_ENGINE] ✓✓✓ SKYBANKING FEE QUERY DETECTED: '{query}' → EXCLUSIVE ROUTING TO FEE ENGINE")
             fee_context = await self._get_card_rates_context(query, session_id=session_id)  # Pass session_id for disambiguation state storage
@@ -3151,7 +4148,7 @@ When responding:
         # MANDATORY: Fee queries MUST route to Fee Engine ONLY (authoritative source)
         # NO LightRAG fallback, NO knowledge base lookup, NO LLM guessing
         # This check happens AFTER location queries, retail asset queries, and Skybanking queries to avoid misrouting
-        is_fee_schedule_query = self._is_fee_schedule_query(query)
+        is_fee_schedule_query = self._gate("fee_schedule", query)
         if is_fee_schedule_query:
             logger.info(f"[FEE_ENGINE] ✓✓✓ FEE SCHEDULE QUERY DETECTED (HIGHEST PRIORITY): '{query}' → EXCLUSIVE ROUTING TO FEE ENGINE (NO LightRAG, NO KB)")
             fee_context = await self._get_card_rates_context(query, session_id=session_id)
@@ -3188,27 +4185,25 @@ When responding:
         
         # CRITICAL: Check for phonebook/employee/contact queries FIRST (before other routing)
         # These should ALWAYS go to phonebook, never LightRAG
-        is_small_talk = self._is_small_talk(query)
-        is_contact_query = self._is_contact_info_query(query)
-        is_phonebook_query = self._is_phonebook_query(query)
-        is_employee_query = self._is_employee_query(query)
+        query_signals = self._classify_query(query)
+        is_small_talk = query_signals.small_talk
         
         # If it's a phonebook/employee/contact query, route to phonebook immediately
-        if (is_phonebook_query or is_contact_query or is_employee_query) and not is_small_talk and PHONEBOOK_DB_AVAILABLE:
+        if query_signals.directory_lookup and PHONEBOOK_DB_AVAILABLE:
             logger.info(f"[ROUTING] ✓ Query detected as phonebook/contact/employee → ROUTING TO PHONEBOOK (NOT LightRAG)")
             should_check_phonebook = True
         else:
             # CRITICAL: Check for organizational overview queries (these need special filtering)
-            is_org_overview_query = self._is_organizational_overview_query(query)
+            is_org_overview_query = query_signals.org_overview
             
             # CRITICAL: Check for banking product/compliance/management/financial/milestone/user document queries
             # These should go to LightRAG, NOT phonebook
-            is_banking_product_query = self._is_banking_product_query(query)
-            is_compliance_query = self._is_compliance_query(query)
-            is_management_query = self._is_management_query(query)
-            is_financial_query = self._is_financial_report_query(query)
-            is_milestone_query = self._is_milestone_query(query)
-            is_user_doc_query = self._is_user_document_query(query)
+            is_banking_product_query = query_signals.banking_product
+            is_compliance_query = query_signals.compliance
+            is_management_query = query_signals.management
+            is_financial_query = query_signals.financial_report
+            is_milestone_query = query_signals.milestone
+            is_user_doc_query = query_signals.user_document
             
             # Log all routing checks
             logger.info(f"[ROUTING] Routing checks - org_overview={is_org_overview_query}, banking_product={is_banking_product_query}, compliance={is_compliance_query}, management={is_management_query}, financial={is_financial_query}, milestone={is_milestone_query}, user_doc={is_user_doc_query}")
@@ -3244,259 +4239,43 @@ When responding:
         
         # Check phonebook FIRST for contact queries (before LightRAG)
         if should_check_phonebook:
-            try:
-                phonebook_db = get_phonebook_db()
-                
-                # Extract search term from query
-                # For role-based queries like "branch manager of X", preserve the full context
-                import re
-                query_lower = query.lower()
-                
-                # Check if it's a role + location query (e.g., "branch manager of Gulshan")
-                role_location_pattern = r'(branch\s+)?manager\s+(of|at)\s+(.+?)(?:\s+branch)?$'
-                match = re.search(role_location_pattern, query_lower)
-                if match:
-                    # Extract location/branch name
-                    location = match.group(3).strip()
-                    role = match.group(1) + "manager" if match.group(1) else "manager"
-                    search_term = f"{role} {location}"
-                    logger.info(f"[PHONEBOOK] Extracted role+location query: '{search_term}' from '{query}'")
-                else:
-                    # First, check if query starts with "find", "search", "lookup", etc. and extract the term after it
-                    find_search_pattern = r'^(find|search|lookup|who is|contact|info about|get)\s+(.+)$'
-                    match = re.search(find_search_pattern, query_lower, re.IGNORECASE)
-                    if match:
-                        # Extract the search term after the prefix
-                        search_term = match.group(2).strip()
-                        logger.info(f"[PHONEBOOK] Extracted search term '{search_term}' from query '{query}' (removed prefix '{match.group(1)}')")
-                    else:
-                        # Handle patterns like "phone number of X", "contact info for X", "email of X"
-                        # Extract employee ID/name after "of", "for", etc.
-                        # Pattern: (contact word) (optional "number") (of/for/about) (employee ID/name)
-                        of_for_patterns = [
-                            r'\b(phone|contact|email|mobile|telephone)\s+number\s+(?:of|for|about)\s+(.+)$',  # "phone number of X"
-                            r'\b(phone|contact|email|mobile|telephone)\s+(?:of|for|about)\s+(.+)$',  # "phone of X"
-                            r'\b(contact|info|information|details?)\s+(?:info|information|details?)?\s+(?:of|for|about)\s+(.+)$',  # "contact info for X"
-                        ]
-                        match = None
-                        for pattern in of_for_patterns:
-                            match = re.search(pattern, query_lower, re.IGNORECASE)
-                            if match:
-                                search_term = match.group(2).strip() if len(match.groups()) >= 2 else match.group(1).strip()
-                                logger.info(f"[PHONEBOOK] Extracted search term '{search_term}' from query '{query}' (removed contact info prefix)")
-                                break
-                        if not match:
-                            # Standard extraction: remove common words but preserve role and location terms
-                            search_term = re.sub(
-                                r'\b(phone|contact|number|email|address|mobile|telephone|who\s+is|what\s+is|tell\s+me|the|is|are|was|were|of|for|about)\b', 
-                                '', 
-                                query, 
-                                flags=re.IGNORECASE
-                            ).strip()
-                    # Clean up multiple spaces and remove leading/trailing "of", "for", "about"
-                    search_term = re.sub(r'\s+', ' ', search_term).strip()
-                    search_term = re.sub(r'^(of|for|about)\s+', '', search_term, flags=re.IGNORECASE).strip()
-                    search_term = re.sub(r'\s+(of|for|about)$', '', search_term, flags=re.IGNORECASE).strip()
-                    
-                    # Remove bank name suffixes (e.g., "of EBL", "of Eastern Bank", "at EBL")
-                    # This helps when queries include "head of Retail & SME Banking Division of EBL"
-                    search_term = re.sub(r'\s+(of|at|in)\s+(ebl|eastern\s+bank|eastern\s+bank\s+plc)[\s.]*$', '', search_term, flags=re.IGNORECASE).strip()
-                    
-                    # Remove "Division" if it appears anywhere (e.g., "Retail & SME Banking Division head" -> "Retail & SME Banking head")
-                    # This helps match designations that don't include "Division"
-                    # Remove "division" as a whole word (not part of other words)
-                    original_search_term = search_term
-                    search_term = re.sub(r'\bdivision\b', '', search_term, flags=re.IGNORECASE).strip()
-                    # Clean up multiple spaces that might result
-                    search_term = re.sub(r'\s+', ' ', search_term).strip()
-                    if original_search_term != search_term:
-                        logger.info(f"[PHONEBOOK] Removed 'division' from search term: '{original_search_term}' -> '{search_term}'")
-                    
-                    # If search term looks like a division/department name without a role, try adding "head"
-                    # This handles queries like "Who is Retail & SME Banking Division?" -> "Retail & SME Banking head"
-                    division_dept_keywords = ['banking', 'division', 'department', 'unit', 'section', 'retail', 'sme', 'corporate', 'operations', 'finance', 'hr', 'ict', 'it']
-                    role_keywords = ['head', 'manager', 'director', 'officer', 'executive', 'president', 'ceo', 'cfo', 'chief', 'senior', 'assistant']
-                    search_term_lower = search_term.lower()
-                    has_division_keyword = any(keyword in search_term_lower for keyword in division_dept_keywords)
-                    has_role_keyword = any(keyword in search_term_lower for keyword in role_keywords)
-                    
-                    # If it looks like a division/department name but no role mentioned, try with "head"
-                    if has_division_keyword and not has_role_keyword:
-                        search_term_with_head = f"{search_term} head"
-                        logger.info(f"[PHONEBOOK] Query looks like division/department without role, trying with 'head': '{search_term_with_head}'")
-                        # Try search with "head" added
-                        results = phonebook_db.smart_search(search_term_with_head, limit=5)
-                        if results:
-                            logger.info(f"[OK] Found {len(results)} results with 'head' added")
-                        else:
-                            # Also try department search as fallback
-                            logger.info(f"[PHONEBOOK] No results with 'head', trying department search for: '{search_term}'")
-                            dept_results = phonebook_db.search_by_department(search_term, limit=5)
-                            if dept_results:
-                                results = dept_results
-                                logger.info(f"[OK] Found {len(dept_results)} results via department search")
-                            else:
-                                # Try original search term as fallback
-                                results = phonebook_db.smart_search(search_term, limit=5)
-                    else:
-                        # Try multiple search strategies
-                        results = phonebook_db.smart_search(search_term, limit=5)
-                
-                # Final cleanup: Always remove "division" and bank name suffixes before searching
-                # This ensures cleanup happens regardless of which code path was taken
-                if search_term:
-                    original_final = search_term
-                    search_term = re.sub(r'\s+(of|at|in)\s+(ebl|eastern\s+bank|eastern\s+bank\s+plc)[\s.]*$', '', search_term, flags=re.IGNORECASE).strip()
-                    search_term = re.sub(r'\bdivision\b', '', search_term, flags=re.IGNORECASE).strip()
-                    search_term = re.sub(r'\s+', ' ', search_term).strip()
-                    if original_final != search_term:
-                        logger.info(f"[PHONEBOOK] Final cleanup: '{original_final}' -> '{search_term}'")
-                        # If we cleaned the term and haven't searched yet, try searching with cleaned term
-                        if not results:
-                            results = phonebook_db.smart_search(search_term, limit=5)
-                
-                if results:
-                    logger.info(f"[OK] Found {len(results)} results in phonebook for: {search_term}")
-                    
-                    # Stream response in chunks for better performance
-                    full_response = ""
-                    
-                    if len(results) == 1:
-                        # Single result - detailed format (stream in chunks)
-                        contact_info = phonebook_db.format_contact_info(results[0])
-                        # Stream in sentence chunks
-                        sentences = contact_info.split('\n')
-                        for sentence in sentences:
-                            if sentence.strip():
-                                chunk = sentence + '\n'
-                                full_response += chunk
-                                yield chunk
-                        # Add source
-                        source_chunk = "\n\n(Source: Phone Book Database)"
-                        full_response += source_chunk
-                        yield source_chunk
-                    else:
-                        # Multiple results - list format (stream each result as it's formatted)
-                        for i, emp in enumerate(results[:5], 1):
-                            # Stream each employee entry as a chunk
-                            entry_chunk = f"{i}. {emp['full_name']}\n"
-                            full_response += entry_chunk
-                            yield entry_chunk
-                            
-                            if emp.get('designation'):
-                                chunk = f"   Designation: {emp['designation']}\n"
-                                full_response += chunk
-                                yield chunk
-                            if emp.get('department'):
-                                chunk = f"   Department: {emp['department']}\n"
-                                full_response += chunk
-                                yield chunk
-                            if emp.get('email'):
-                                chunk = f"   Email: {emp['email']}\n"
-                                full_response += chunk
-                                yield chunk
-                            if emp.get('employee_id'):
-                                chunk = f"   Employee ID: {emp['employee_id']}\n"
-                                full_response += chunk
-                                yield chunk
-                            if emp.get('mobile'):
-                                chunk = f"   Mobile: {emp['mobile']}\n"
-                                full_response += chunk
-                                yield chunk
-                            if emp.get('ip_phone'):
-                                chunk = f"   IP Phone: {emp['ip_phone']}\n"
-                                full_response += chunk
-                                yield chunk
-                            
-                            # Empty line between entries
-                            full_response += "\n"
-                            yield "\n"
-                        
-                        # Stream summary
-                        total_count = phonebook_db.count_search_results(search_term)
-                        summary_chunk = f"We found {total_count} matching contact(s) in total. Showing only the top 5 results.\n\n"
-                        full_response += summary_chunk
-                        yield summary_chunk
-                        
-                        if total_count > 5:
-                            narrow_chunk = "Please provide more details to narrow down the search.\n\n"
-                            full_response += narrow_chunk
-                            yield narrow_chunk
-                        
-                        source_chunk = "(Source: Phone Book Database)"
-                        full_response += source_chunk
-                        yield source_chunk
-                    
-                    # Save to memory
-                    await self._persist_turn(session_id, query, full_response, knowledge_base=None, client_ip=client_ip)
-                    
-                    return  # DO NOT query LightRAG for contact queries
-                    
-                else:
-                    # No results in phonebook - return helpful message (DO NOT use LightRAG)
-                    logger.info(f"[INFO] No results in phonebook for '{search_term}' (contact query - NOT using LightRAG)")
-                    
-                    # Stream response in chunks
-                    chunks = [
-                        f"I couldn't find any contact information for '{search_term}' in the employee directory. ",
-                        "Please try:\n",
-                        "- Providing the full name\n",
-                        "- Using the employee ID\n",
-                        "- Specifying the department or designation\n",
-                        "\n(Source: Phone Book Database)"
-                    ]
-                    
-                    full_response = ""
-                    for chunk in chunks:
-                        full_response += chunk
-                        yield chunk
-                    
-                    # Save to memory
-                    await self._persist_turn(session_id, query, full_response, knowledge_base=None, client_ip=client_ip)
-                    
-                    return  # DO NOT query LightRAG for contact queries
-                    
-            except Exception as e:
-                # For contact queries, even if phonebook has an error, don't use LightRAG
-                logger.error(f"[ERROR] Phonebook error for contact query (NOT using LightRAG): {e}")
-                
-                # Stream error response in chunks
-                chunks = [
-                    "I'm having trouble accessing the employee directory right now. ",
-                    "Please try again in a moment, or contact support for assistance.",
-                    "\n\n(Source: Phone Book Database)"
-                ]
-                
-                full_response = ""
-                for chunk in chunks:
-                    full_response += chunk
-                    yield chunk
-                
+            async for chunk in self._handle_contact_query(session_id, query, client_ip):
+                yield chunk
+            return  # DO NOT query LightRAG for contact queries
+        
+        # Policy queries missing required entities get a clarification question (no history needed)
+        if is_compliance_query and not is_small_talk:
+            has_entities, clarification = self._check_policy_entities(query)
+            if not has_entities and clarification:
+                logger.info(f"[POLICY] Policy query missing required entities, asking for clarification")
                 # Save to memory
-                await self._persist_turn(session_id, query, full_response, knowledge_base=None)
+                await self._persist_turn(session_id, query, clarification, knowledge_base=None, client_ip=client_ip)
                 
-                return  # DO NOT query LightRAG for contact queries
+                # Stream clarification question
+                async for chunk in self._stream_text(clarification):
+                    yield chunk
+                return  # Don't query LightRAG if entities are missing
+        
+        # Bare greetings/thanks/goodbyes get a fixed reply: no history read, no OpenAI call
+        canned_reply = self._canned_small_talk_reply(query) if is_small_talk else None
+        if canned_reply:
+            logger.info(f"[ROUTING] Bare small talk - serving canned reply (no history, no OpenAI)")
+            await self._persist_turn(session_id, query, canned_reply, knowledge_base=None, client_ip=client_ip)
+            async for chunk in self._stream_text(canned_reply):
+                yield chunk
+            return
+        
+        # Only the LLM-backed paths below use history; fee engine, phonebook and clarification answers never read it
+        history_task = self._start_history_load(session_id)
         
         # Determine if we need LightRAG context (only for non-contact queries)
         context = ""
         sources = []
         card_rates_context = ""
         is_card_rates_query = False  # Initialize to avoid UnboundLocalError
+        response_cache_keys: List[str] = []
         
         if not is_small_talk:
-            # Check for policy queries and validate required entities
-            if is_compliance_query:
-                has_entities, clarification = self._check_policy_entities(query)
-                if not has_entities and clarification:
-                    logger.info(f"[POLICY] Policy query missing required entities, asking for clarification")
-                    # Save to memory
-                    await self._persist_turn(session_id, query, clarification, knowledge_base=None, client_ip=client_ip)
-                    
-                    # Stream clarification question
-                    for char in clarification:
-                        yield char
-                    return  # Don't query LightRAG if entities are missing
-            
             # REMOVED: Old fallback path for fee queries - fee queries are now handled at the top of the function
             # Fee schedule queries are handled at the top of process_chat() and process_chat_sync()
             # and exit immediately, so this code path should never be reached for fee queries
@@ -3510,10 +4289,33 @@ When responding:
             if knowledge_base is None:
                 knowledge_base = self._get_knowledge_base(query)
             
-            logger.info(f"[ROUTING] Calling LightRAG with knowledge_base='{knowledge_base}' for query: '{query[:100]}'")
+            # Exact-match response cache: skip LightRAG and OpenAI for repeat first-turn queries
+            # Only first turns are cached; the cache read (which also prefetches the LightRAG retrieval)
+            # runs while the history load is still in flight
             # CRITICAL: Filter financial documents for organizational overview queries
-            filter_financial = self._is_organizational_overview_query(query)
-            context, lightrag_sources = await self._get_lightrag_context(query, knowledge_base, filter_financial_docs=filter_financial)
+            filter_financial = query_signals.org_overview
+            response_cache_keys = self._get_response_cache_keys(query, knowledge_base)
+            lightrag_keys = self._lightrag_cache_keys(query, knowledge_base, filter_financial)
+            cached, cached_retrieval = await self._lookup_cached_answer(response_cache_keys, lightrag_keys)
+            if cached and cached.get("response") and not await history_task:
+                logger.info(f"[CACHE] Serving cached response for query: '{query[:100]}'")
+                async for chunk in self._stream_text(cached["response"]):
+                    yield chunk
+                marker = self._format_sources_marker(cached.get("sources") or [])
+                if marker:
+                    yield marker
+                await self._persist_turn(session_id, query, cached["response"], knowledge_base=knowledge_base, client_ip=client_ip)
+                return
+            
+            logger.info(f"[ROUTING] Calling LightRAG with knowledge_base='{knowledge_base}' for query: '{query[:100]}'")
+            # Retrieval overlaps with the remainder of the history load
+            context_task = asyncio.create_task(self._get_lightrag_context(
+                query, knowledge_base, filter_financial_docs=filter_financial,
+                cache_keys=lightrag_keys, cached_retrieval=cached_retrieval
+            ))
+            if await history_task:
+                response_cache_keys = []
+            context, lightrag_sources = await context_task
             sources.extend(lightrag_sources)  # Add LightRAG sources
             if context:
                 logger.info(f"[ROUTING] LightRAG returned context (length: {len(context)} chars, sources: {len(lightrag_sources)}, filtered_financial={filter_financial})")
@@ -3557,48 +4359,49 @@ When responding:
             combined_context = context
         
         # Build messages
+        conversation_history = await history_task
         messages = self._build_messages(query, combined_context, conversation_history)
 
         # Stream response from OpenAI
-        full_response = ""
+        response_parts: List[str] = []
+        pending = ""
+        # First segment goes out as soon as it is safe, later ones in >= 64-char pieces (as _coalesce_deltas)
+        min_chars = 1
+        # Bound once: both run for every streamed delta
+        split_stream_buffer = self._split_stream_buffer
+        clean_stream_segment = self._clean_stream_segment
         try:
-            # Calculate max_tokens dynamically to avoid context length errors
-            # Reserve tokens for response, but cap at model limit
-            # For gpt-4 models, max context is 8192 tokens
-            # Estimate: system message ~2000 tokens, context ~4000 tokens, user query ~100 tokens
-            # Reserve ~1500 tokens for response to be safe
-            max_response_tokens = min(settings.OPENAI_MAX_TOKENS, 1500)
-            
-            stream = await self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=messages,
-                temperature=settings.OPENAI_TEMPERATURE,
-                max_tokens=max_response_tokens,
-                stream=True
-            )
-            
-            async for chunk in stream:
+            async for content in self._stream_completion(messages=messages, **self._answer_completion_kwargs):
                 try:
-                    if chunk.choices and len(chunk.choices) > 0 and chunk.choices[0].delta and chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        full_response += content
-                        # Clean markdown formatting from content before yielding
-                        cleaned_content = self._clean_markdown_formatting(content)
-                        # Fix currency symbols if needed (use combined_context if available)
-                        if hasattr(self, '_last_combined_context'):
-                            cleaned_content = self._fix_currency_symbols(cleaned_content, self._last_combined_context)
-                        # Fix bank name (replace "Eastern Bank Limited" with "Eastern Bank PLC.")
-                        cleaned_content = self._fix_bank_name(cleaned_content)
-                        yield cleaned_content
+                    response_parts.append(content)
+                    # Carry unsafe tails over so markdown/currency/bank-name fixes see whole tokens
+                    ready, pending = split_stream_buffer(pending + content, min_chars)
+                    if ready:
+                        yield clean_stream_segment(ready, combined_context)
+                        min_chars = 64
                 except Exception as chunk_error:
                     logger.error(f"Error processing chunk: {chunk_error}", exc_info=True)
                     # Continue processing other chunks instead of breaking
                     continue
+            if pending:
+                yield self._clean_stream_segment(pending, combined_context)
+            full_response = "".join(response_parts)
+        except (GeneratorExit, asyncio.CancelledError):
+            # Client went away mid-stream: the write-behind queue still records what was generated
+            partial_response = "".join(response_parts)
+            if partial_response:
+                logger.info(f"[PERSIST] Stream closed early - persisting partial response ({len(partial_response)} chars)")
+                await self._persist_turn(
+                    session_id, query, self._clean_stream_segment(partial_response, combined_context),
+                    knowledge_base=knowledge_base, client_ip=client_ip
+                )
+            raise
         except Exception as e:
             logger.error(f"OpenAI API error: {e}", exc_info=True)
             error_message = "I apologize, but I'm experiencing technical difficulties. Please try again later."
             yield error_message
             full_response = error_message
+            response_cache_keys = []  # Never cache error responses
         
         # Clean markdown formatting from full response before saving
         full_response = self._clean_markdown_formatting(full_response)
@@ -3617,6 +4420,10 @@ When responding:
         else:
             logger.info(f"[SOURCES] No sources to send for query: '{query[:50]}...'")
         
+        if response_cache_keys and full_response:
+            # Off the response path: the stream closes without waiting for the Redis write
+            self._run_in_background(self._cache_response(response_cache_keys, full_response, sources))
+        
         # Save to memory
         await self._persist_turn(session_id, query, full_response, knowledge_base=knowledge_base, client_ip=client_ip)
     
@@ -3630,6 +4437,9 @@ When responding:
         """
         Process a chat query and return complete response (non-streaming)
         
+        Identical queries already in flight for the same session (double submits, client
+        retries) share one pipeline run and therefore one OpenAI call and one persisted turn.
+        
         Args:
             query: User's query
             session_id: Session ID for conversation history
@@ -3639,6 +4449,30 @@ When responding:
         Returns:
             Dictionary with response and session_id
         """
+        if not session_id:
+            return await self._process_chat_sync(query, session_id, knowledge_base, client_ip)
+        
+        inflight_key = (session_id, knowledge_base, query.strip().lower())
+        task = self._inflight_sync.get(inflight_key)
+        if task is None:
+            task = asyncio.create_task(self._process_chat_sync(query, session_id, knowledge_base, client_ip))
+            self._inflight_sync[inflight_key] = task
+            task.add_done_callback(
+                lambda t: self._inflight_sync.pop(inflight_key, None) if self._inflight_sync.get(inflight_key) is t else None
+            )
+        else:
+            logger.info(f"[COALESCE] Joining in-flight request for session {session_id}: {query[:50]}")
+        # Shield so one caller disconnecting does not cancel the run the others are waiting on
+        return dict(await asyncio.shield(task))
+    
+    async def _process_chat_sync(
+        self,
+        query: str,
+        session_id: Optional[str] = None,
+        knowledge_base: Optional[str] = None,
+        client_ip: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Non-streaming chat pipeline behind process_chat_sync (see its docstring for arguments)."""
         # Derive stable conversation key (FIX #1: Session continuity)
         conversation_key = self._get_conversation_key(session_id, client_ip)
         # Use conversation_key for all disambiguation state operations
@@ -3665,31 +4499,12 @@ When responding:
                     "sources": result.get("sources", []),
                 }
         
-        # Get conversation history
-        db = get_db()
-        memory = PostgresChatMemory(db=db)
-        conversation_history = []
-        try:
-            if memory._available:
-                history = memory.get_conversation_history(
-                    session_id=session_id,
-                    limit=settings.MAX_CONVERSATION_HISTORY
-                )
-                conversation_history = [
-                    {"role": msg.role, "message": msg.message}
-                    for msg in history
-                ]
-        finally:
-            memory.close()
-            if db:
-                db.close()
-        
         # ===== ROUTING DECISION LOGGING =====
         logger.info(f"[ROUTING] ===== Processing Query (SYNC): '{query}' =====")
         
         # ===== CRITICAL: RETAIL ASSET FEE QUERIES - EXCLUSIVE FEE ENGINE ROUTING (HIGH PRIORITY) =====
         # Check for retail asset fee queries BEFORE card fee queries
-        is_retail_asset_fee_query = self._is_retail_asset_fee_query(query)
+        is_retail_asset_fee_query = self._gate("retail_asset_fee", query)
         if is_retail_asset_fee_query:
             logger.info(f"[FEE_ENGINE] ✓✓✓ RETAIL ASSET FEE QUERY DETECTED: '{query}' → EXCLUSIVE ROUTING TO FEE ENGINE")
             fee_context = await self._get_card_rates_context(query, session_id=effective_session_id, conversation_key=conversation_key)  # FIX #1: Pass conversation_key for stable disambiguation state
@@ -3719,7 +4534,7 @@ When responding:
         
         # ===== CRITICAL: SKYBANKING FEE QUERIES - EXCLUSIVE FEE ENGINE ROUTING (HIGH PRIORITY) =====
         # Check for Skybanking fee queries BEFORE card fee queries
-        is_skybanking_fee_query = self._is_skybanking_fee_query(query)
+        is_skybanking_fee_query = self._gate("skybanking_fee", query)
         if is_skybanking_fee_query:
             logger.info(f"[FEE_ENGINE] ✓✓✓ SKYBANKING FEE QUERY DETECTED: '{query}' → EXCLUSIVE ROUTING TO FEE ENGINE")
             fee_context = await self._get_card_rates_context(query, session_id=effective_session_id, conversation_key=conversation_key)  # FIX #1: Pass conversation_key for stable disambiguation state
@@ -3753,7 +4568,7 @@ When responding:
         # MANDATORY: Fee queries MUST route to Fee Engine ONLY (authoritative source)
         # NO LightRAG fallback, NO knowledge base lookup, NO LLM guessing
         # This check happens AFTER location queries, retail asset queries, and Skybanking queries to avoid misrouting
-        is_fee_schedule_query = self._is_fee_schedule_query(query)
+        is_fee_schedule_query = self._gate("fee_schedule", query)
         if is_fee_schedule_query:
             logger.info(f"[FEE_ENGINE] ✓✓✓ FEE SCHEDULE QUERY DETECTED (HIGHEST PRIORITY): '{query}' → EXCLUSIVE ROUTING TO FEE ENGINE (NO LightRAG, NO KB)")
             fee_context = await self._get_card_rates_context(query, session_id=session_id)
@@ -3792,9 +4607,10 @@ When responding:
         
         # ===== LOCATION QUERIES - ROUTE TO LOCATION SERVICE (HIGH PRIORITY) =====
         # Route location queries (branches, ATMs, CRMs, RTDMs, priority centers, head office) to location service
-        is_location_query = self._is_location_query(query)
+        is_location_query = self._gate("location", query)
         if is_location_query:
             logger.info(f"[LOCATION_SERVICE] ✓✓✓ LOCATION QUERY DETECTED: '{query}' → ROUTING TO LOCATION SERVICE (NO LightRAG, NO KB)")
+            history_task = self._start_history_load(session_id)
             location_context = await self._get_location_context(query)
             sources = ["EBL Location Database (Normalized)"]
             
@@ -3803,21 +4619,15 @@ When responding:
             logger.info(f"[LOCATION_SERVICE] Using EXCLUSIVE location service context: {len(location_context)} chars (LightRAG/KB explicitly skipped)")
             
             # Build messages with location context only
+            conversation_history = await history_task
             messages = self._build_messages(query, combined_context, conversation_history)
 
             # Generate response from OpenAI with location data only
             full_response = ""
             try:
-                max_response_tokens = min(settings.OPENAI_MAX_TOKENS, 2000)
-                response = await self.openai_client.chat.completions.create(
-                    model=settings.OPENAI_MODEL,
-                    messages=messages,
-                    temperature=settings.OPENAI_TEMPERATURE,
-                    max_tokens=max_response_tokens
+                full_response = await self._create_completion_text(
+                    messages=messages, **self._location_completion_kwargs
                 )
-                
-                if response.choices and response.choices[0].message.content:
-                    full_response = response.choices[0].message.content
             except Exception as e:
                 logger.error(f"[LOCATION_SERVICE] Error generating response: {e}")
                 full_response = "I apologize, but I encountered an error while processing your location inquiry. Please try again."
@@ -3833,27 +4643,25 @@ When responding:
         
         # CRITICAL: Check for phonebook/employee/contact queries FIRST (before other routing)
         # These should ALWAYS go to phonebook, never LightRAG
-        is_small_talk = self._is_small_talk(query)
-        is_contact_query = self._is_contact_info_query(query)
-        is_phonebook_query = self._is_phonebook_query(query)
-        is_employee_query = self._is_employee_query(query)
+        query_signals = self._classify_query(query)
+        is_small_talk = query_signals.small_talk
         
         # If it's a phonebook/employee/contact query, route to phonebook immediately
-        if (is_phonebook_query or is_contact_query or is_employee_query) and not is_small_talk and PHONEBOOK_DB_AVAILABLE:
+        if query_signals.directory_lookup and PHONEBOOK_DB_AVAILABLE:
             logger.info(f"[ROUTING] ✓ Query detected as phonebook/contact/employee → ROUTING TO PHONEBOOK (NOT LightRAG)")
             should_check_phonebook = True
         else:
             # CRITICAL: Check for organizational overview queries (these need special filtering)
-            is_org_overview_query = self._is_organizational_overview_query(query)
+            is_org_overview_query = query_signals.org_overview
             
             # CRITICAL: Check for banking product/compliance/management/financial/milestone/user document queries
             # These should go to LightRAG, NOT phonebook
-            is_banking_product_query = self._is_banking_product_query(query)
-            is_compliance_query = self._is_compliance_query(query)
-            is_management_query = self._is_management_query(query)
-            is_financial_query = self._is_financial_report_query(query)
-            is_milestone_query = self._is_milestone_query(query)
-            is_user_doc_query = self._is_user_document_query(query)
+            is_banking_product_query = query_signals.banking_product
+            is_compliance_query = query_signals.compliance
+            is_management_query = query_signals.management
+            is_financial_query = query_signals.financial_report
+            is_milestone_query = query_signals.milestone
+            is_user_doc_query = query_signals.user_document
             
             # Log all routing checks
             logger.info(f"[ROUTING] Routing checks - org_overview={is_org_overview_query}, banking_product={is_banking_product_query}, compliance={is_compliance_query}, management={is_management_query}, financial={is_financial_query}, milestone={is_milestone_query}, user_doc={is_user_doc_query}")
@@ -3889,215 +4697,46 @@ When responding:
         
         # Check phonebook FIRST for contact queries (before LightRAG)
         if should_check_phonebook:
-            try:
-                phonebook_db = get_phonebook_db()
-                
-                # Extract search term from query
-                # For role-based queries like "branch manager of X", preserve the full context
-                import re
-                query_lower = query.lower()
-                
-                # Check if it's a role + location query (e.g., "branch manager of Gulshan")
-                role_location_pattern = r'(branch\s+)?manager\s+(of|at)\s+(.+?)(?:\s+branch)?$'
-                match = re.search(role_location_pattern, query_lower)
-                if match:
-                    # Extract location/branch name
-                    location = match.group(3).strip()
-                    role = match.group(1) + "manager" if match.group(1) else "manager"
-                    search_term = f"{role} {location}"
-                    logger.info(f"[PHONEBOOK] Extracted role+location query: '{search_term}' from '{query}'")
-                else:
-                    # First, check if query starts with "find", "search", "lookup", etc. and extract the term after it
-                    find_search_pattern = r'^(find|search|lookup|who is|contact|info about|get)\s+(.+)$'
-                    match = re.search(find_search_pattern, query_lower, re.IGNORECASE)
-                    if match:
-                        # Extract the search term after the prefix
-                        search_term = match.group(2).strip()
-                        logger.info(f"[PHONEBOOK] Extracted search term '{search_term}' from query '{query}' (removed prefix '{match.group(1)}')")
-                    else:
-                        # Handle patterns like "phone number of X", "contact info for X", "email of X"
-                        # Extract employee ID/name after "of", "for", etc.
-                        # Pattern: (contact word) (optional "number") (of/for/about) (employee ID/name)
-                        of_for_patterns = [
-                            r'\b(phone|contact|email|mobile|telephone)\s+number\s+(?:of|for|about)\s+(.+)$',  # "phone number of X"
-                            r'\b(phone|contact|email|mobile|telephone)\s+(?:of|for|about)\s+(.+)$',  # "phone of X"
-                            r'\b(contact|info|information|details?)\s+(?:info|information|details?)?\s+(?:of|for|about)\s+(.+)$',  # "contact info for X"
-                        ]
-                        match = None
-                        for pattern in of_for_patterns:
-                            match = re.search(pattern, query_lower, re.IGNORECASE)
-                            if match:
-                                search_term = match.group(2).strip() if len(match.groups()) >= 2 else match.group(1).strip()
-                                logger.info(f"[PHONEBOOK] Extracted search term '{search_term}' from query '{query}' (removed contact info prefix)")
-                                break
-                        if not match:
-                            # Standard extraction: remove common words but preserve role and location terms
-                            search_term = re.sub(
-                                r'\b(phone|contact|number|email|address|mobile|telephone|who\s+is|what\s+is|tell\s+me|the|is|are|was|were|of|for|about)\b', 
-                                '', 
-                                query, 
-                                flags=re.IGNORECASE
-                            ).strip()
-                    # Clean up multiple spaces and remove leading/trailing "of", "for", "about"
-                    search_term = re.sub(r'\s+', ' ', search_term).strip()
-                    search_term = re.sub(r'^(of|for|about)\s+', '', search_term, flags=re.IGNORECASE).strip()
-                    search_term = re.sub(r'\s+(of|for|about)$', '', search_term, flags=re.IGNORECASE).strip()
-                    
-                    # Remove bank name suffixes (e.g., "of EBL", "of Eastern Bank", "at EBL")
-                    # This helps when queries include "head of Retail & SME Banking Division of EBL"
-                    search_term = re.sub(r'\s+(of|at|in)\s+(ebl|eastern\s+bank|eastern\s+bank\s+plc)[\s.]*$', '', search_term, flags=re.IGNORECASE).strip()
-                    
-                    # Remove "Division" if it appears anywhere (e.g., "Retail & SME Banking Division head" -> "Retail & SME Banking head")
-                    # This helps match designations that don't include "Division"
-                    # Remove "division" as a whole word (not part of other words)
-                    original_search_term = search_term
-                    search_term = re.sub(r'\bdivision\b', '', search_term, flags=re.IGNORECASE).strip()
-                    # Clean up multiple spaces that might result
-                    search_term = re.sub(r'\s+', ' ', search_term).strip()
-                    if original_search_term != search_term:
-                        logger.info(f"[PHONEBOOK] Removed 'division' from search term: '{original_search_term}' -> '{search_term}'")
-                    
-                    # If search term looks like a division/department name without a role, try adding "head"
-                    # This handles queries like "Who is Retail & SME Banking Division?" -> "Retail & SME Banking head"
-                    division_dept_keywords = ['banking', 'division', 'department', 'unit', 'section', 'retail', 'sme', 'corporate', 'operations', 'finance', 'hr', 'ict', 'it']
-                    role_keywords = ['head', 'manager', 'director', 'officer', 'executive', 'president', 'ceo', 'cfo', 'chief', 'senior', 'assistant']
-                    search_term_lower = search_term.lower()
-                    has_division_keyword = any(keyword in search_term_lower for keyword in division_dept_keywords)
-                    has_role_keyword = any(keyword in search_term_lower for keyword in role_keywords)
-                    
-                    # If it looks like a division/department name but no role mentioned, try with "head"
-                    if has_division_keyword and not has_role_keyword:
-                        search_term_with_head = f"{search_term} head"
-                        logger.info(f"[PHONEBOOK] Query looks like division/department without role, trying with 'head': '{search_term_with_head}'")
-                        # Try search with "head" added
-                        results = phonebook_db.smart_search(search_term_with_head, limit=5)
-                        if results:
-                            logger.info(f"[OK] Found {len(results)} results with 'head' added")
-                        else:
-                            # Also try department search as fallback
-                            logger.info(f"[PHONEBOOK] No results with 'head', trying department search for: '{search_term}'")
-                            dept_results = phonebook_db.search_by_department(search_term, limit=5)
-                            if dept_results:
-                                results = dept_results
-                                logger.info(f"[OK] Found {len(dept_results)} results via department search")
-                            else:
-                                # Try original search term as fallback
-                                results = phonebook_db.smart_search(search_term, limit=5)
-                    else:
-                        # Try multiple search strategies
-                        results = phonebook_db.smart_search(search_term, limit=5)
-                
-                # Final cleanup: Always remove "division" and bank name suffixes before searching
-                # This ensures cleanup happens regardless of which code path was taken
-                if search_term:
-                    original_final = search_term
-                    search_term = re.sub(r'\s+(of|at|in)\s+(ebl|eastern\s+bank|eastern\s+bank\s+plc)[\s.]*$', '', search_term, flags=re.IGNORECASE).strip()
-                    search_term = re.sub(r'\bdivision\b', '', search_term, flags=re.IGNORECASE).strip()
-                    search_term = re.sub(r'\s+', ' ', search_term).strip()
-                    if original_final != search_term:
-                        logger.info(f"[PHONEBOOK] Final cleanup: '{original_final}' -> '{search_term}'")
-                        # If we cleaned the term and haven't searched yet, try searching with cleaned term
-                        if not results:
-                            results = phonebook_db.smart_search(search_term, limit=5)
-                
-                if results:
-                    logger.info(f"[OK] Found {len(results)} results in phonebook for: {search_term}")
-                    
-                    # Format and return results
-                    if len(results) == 1:
-                        # Single result - detailed format
-                        response = phonebook_db.format_contact_info(results[0])
-                        response += "\n\n(Source: Phone Book Database)"
-                    else:
-                        # Multiple results - list format
-                        response = ""
-                        for i, emp in enumerate(results[:5], 1):
-                            response += f"{i}. {emp['full_name']}\n"
-                            if emp.get('designation'):
-                                response += f"   Designation: {emp['designation']}\n"
-                            if emp.get('department'):
-                                response += f"   Department: {emp['department']}\n"
-                            if emp.get('email'):
-                                response += f"   Email: {emp['email']}\n"
-                            if emp.get('employee_id'):
-                                response += f"   Employee ID: {emp['employee_id']}\n"
-                            if emp.get('mobile'):
-                                response += f"   Mobile: {emp['mobile']}\n"
-                            if emp.get('ip_phone'):
-                                response += f"   IP Phone: {emp['ip_phone']}\n"
-                            response += "\n"
-                        
-                        total_count = phonebook_db.count_search_results(search_term)
-                        response += f"We found {total_count} matching contact(s) in total. Showing only the top 5 results.\n\n"
-                        if total_count > 5:
-                            response += "Please provide more details to narrow down the search.\n\n"
-                        response += "(Source: Phone Book Database)"
-
-                    # Save to memory
-                    await self._persist_turn(session_id, query, response, knowledge_base=None, client_ip=client_ip)
-                    
-                    return {
-                        "response": response,
-                        "session_id": session_id
-                    }  # DO NOT query LightRAG for contact queries
-                    
-                else:
-                    # No results in phonebook - return helpful message (DO NOT use LightRAG)
-                    logger.info(f"[INFO] No results in phonebook for '{search_term}' (contact query - NOT using LightRAG)")
-                    response = f"I couldn't find any contact information for '{search_term}' in the employee directory. "
-                    response += "Please try:\n"
-                    response += "- Providing the full name\n"
-                    response += "- Using the employee ID\n"
-                    response += "- Specifying the department or designation\n"
-                    response += "\n(Source: Phone Book Database)"
-
-                    # Save to memory
-                    await self._persist_turn(session_id, query, response, knowledge_base=None, client_ip=client_ip)
-                    
-                    return {
-                        "response": response,
-                        "session_id": session_id
-                    }  # DO NOT query LightRAG for contact queries
-                    
-            except Exception as e:
-                # For contact queries, even if phonebook has an error, don't use LightRAG
-                logger.error(f"[ERROR] Phonebook error for contact query (NOT using LightRAG): {e}")
-                response = "I'm having trouble accessing the employee directory right now. "
-                response += "Please try again in a moment, or contact support for assistance."
-                response += "\n\n(Source: Phone Book Database)"
-
+            return await self._handle_contact_query_sync(session_id, query, client_ip)  # DO NOT query LightRAG for contact queries
+        
+        # Policy queries missing required entities get a clarification question (no history needed)
+        if is_compliance_query and not is_small_talk:
+            has_entities, clarification = self._check_policy_entities(query)
+            if not has_entities and clarification:
+                logger.info(f"[POLICY] Policy query missing required entities, asking for clarification")
                 # Save to memory
-                await self._persist_turn(session_id, query, response, knowledge_base=None, client_ip=client_ip)
+                await self._persist_turn(session_id, query, clarification, knowledge_base=None, client_ip=client_ip)
                 
                 return {
-                    "response": response,
+                    "response": clarification,
                     "session_id": session_id
-                }  # DO NOT query LightRAG for contact queries
+                }  # Don't query LightRAG if entities are missing
+        
+        # Bare greetings/thanks/goodbyes get a fixed reply: no history read, no OpenAI call
+        canned_reply = self._canned_small_talk_reply(query) if is_small_talk else None
+        if canned_reply:
+            logger.info(f"[ROUTING] Bare small talk - serving canned reply (no history, no OpenAI)")
+            await self._persist_turn(session_id, query, canned_reply, knowledge_base=None, client_ip=client_ip)
+            return {
+                "response": canned_reply,
+                "session_id": session_id
+            }
+        
+        # Only the LLM-backed paths below use history; fee engine, phonebook and clarification answers never read it
+        history_task = self._start_history_load(session_id)
         
         # Determine if we need LightRAG context (only for non-contact queries)
         context = ""
         sources = []
         card_rates_context = ""
         is_card_rates_query = False  # Initialize to avoid UnboundLocalError
+        response_cache_keys: List[str] = []
         
         if not is_small_talk:
-            # Check for policy queries and validate required entities
-            if is_compliance_query:
-                has_entities, clarification = self._check_policy_entities(query)
-                if not has_entities and clarification:
-                    logger.info(f"[POLICY] Policy query missing required entities, asking for clarification")
-                    # Save to memory
-                    await self._persist_turn(session_id, query, clarification, knowledge_base=None, client_ip=client_ip)
-                    
-                    return {
-                        "response": clarification,
-                        "session_id": session_id
-                    }  # Don't query LightRAG if entities are missing
-            
             # If it's a fee schedule query, call fee engine for deterministic numbers
             # CRITICAL: For fee schedule queries, use fee engine ONLY - never fall back to LightRAG
             # Note: This check is redundant if fee query was already handled above, but kept for safety
-            is_card_rates_query = self._is_fee_schedule_query(query)
+            is_card_rates_query = self._gate("fee_schedule", query)
             if is_card_rates_query:
                 logger.info(f"[CARD_RATES] Detected card rates query: '{query}' - using card rates microservice ONLY (no LightRAG fallback)")
                 card_rates_context = await self._get_card_rates_context(query, session_id=session_id)
@@ -4134,10 +4773,32 @@ When responding:
                 if knowledge_base is None:
                     knowledge_base = self._get_knowledge_base(query)
                 
-                logger.info(f"[ROUTING] Calling LightRAG with knowledge_base='{knowledge_base}' for query: '{query[:100]}'")
+                # Exact-match response cache: skip LightRAG and OpenAI for repeat first-turn queries
+                # Only first turns are cached; the cache read (which also prefetches the LightRAG retrieval)
+                # runs while the history load is still in flight
                 # CRITICAL: Filter financial documents for organizational overview queries
-                filter_financial = self._is_organizational_overview_query(query)
-                context, lightrag_sources = await self._get_lightrag_context(query, knowledge_base, filter_financial_docs=filter_financial)
+                filter_financial = query_signals.org_overview
+                response_cache_keys = self._get_response_cache_keys(query, knowledge_base)
+                lightrag_keys = self._lightrag_cache_keys(query, knowledge_base, filter_financial)
+                cached, cached_retrieval = await self._lookup_cached_answer(response_cache_keys, lightrag_keys)
+                if cached and cached.get("response") and not await history_task:
+                    logger.info(f"[CACHE] Serving cached response for query: '{query[:100]}'")
+                    await self._persist_turn(session_id, query, cached["response"], knowledge_base=knowledge_base, client_ip=client_ip)
+                    return {
+                        "response": cached["response"],
+                        "session_id": session_id,
+                        "sources": cached.get("sources") or []
+                    }
+                
+                logger.info(f"[ROUTING] Calling LightRAG with knowledge_base='{knowledge_base}' for query: '{query[:100]}'")
+                # Retrieval overlaps with the remainder of the history load
+                context_task = asyncio.create_task(self._get_lightrag_context(
+                    query, knowledge_base, filter_financial_docs=filter_financial,
+                    cache_keys=lightrag_keys, cached_retrieval=cached_retrieval
+                ))
+                if await history_task:
+                    response_cache_keys = []
+                context, lightrag_sources = await context_task
                 sources.extend(lightrag_sources)  # Add LightRAG sources
                 if context:
                     logger.info(f"[ROUTING] LightRAG returned context (length: {len(context)} chars, sources: {len(lightrag_sources)}, filtered_financial={filter_financial})")
@@ -4184,37 +4845,25 @@ When responding:
         self._last_combined_context = combined_context
         
         # Build messages
+        conversation_history = await history_task
         messages = self._build_messages(query, combined_context, conversation_history)
         
         # Get response from OpenAI
         try:
-            # Calculate max_tokens dynamically to avoid context length errors
-            # Reserve tokens for response, but cap at model limit
-            # For gpt-4 models, max context is 8192 tokens
-            # Estimate: system message ~2000 tokens, context ~4000 tokens, user query ~100 tokens
-            # Reserve ~1500 tokens for response to be safe
-            max_response_tokens = min(settings.OPENAI_MAX_TOKENS, 1500)
-            
-            response = await self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=messages,
-                temperature=settings.OPENAI_TEMPERATURE,
-                max_tokens=max_response_tokens,
-                stream=False
-            )
-            
-            full_response = response.choices[0].message.content
+            full_response = await self._create_completion_text(messages=messages, **self._answer_completion_kwargs)
             # Clean markdown formatting from response
             full_response = self._clean_markdown_formatting(full_response)
             # Fix currency symbols as a safety net
             full_response = self._fix_currency_symbols(full_response, combined_context)
             # Fix bank name (replace "Eastern Bank Limited" with "Eastern Bank PLC")
             full_response = self._fix_bank_name(full_response)
+            if response_cache_keys and full_response:
+                self._run_in_background(self._cache_response(response_cache_keys, full_response, sources))
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             full_response = "I apologize, but I'm experiencing technical difficulties. Please try again later."
         
-        # Save to memory (user message was saved earlier before OpenAI call)
+        # Save to memory (user and assistant messages are written together in one transaction)
         await self._persist_turn(session_id, query, full_response, knowledge_base=knowledge_base, client_ip=client_ip)
         
         return {
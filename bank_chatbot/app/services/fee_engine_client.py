@@ -5,7 +5,7 @@ Client for calling the new fee-engine microservice for deterministic fee calcula
 
 import httpx
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import date
 from decimal import Decimal
 import re
@@ -15,6 +15,256 @@ from app.core.config import settings
 logger = logging.getLogger(__name__)
 
 
+def _keyword_re(keywords: List[str]) -> "re.Pattern[str]":
+    """Compile keywords into one alternation whose .search() is truthy iff any keyword is a substring."""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+
+# Query keyword sets (one C-level scan per set instead of a Python loop per keyword)
+_SKYBANKING_LINE_RE = _keyword_re(['skybanking', 'sky banking', 'digital banking', 'online banking', 'ebl skybanking'])
+_PRIORITY_BANKING_LINE_RE = _keyword_re(['priority banking', 'priority customer', 'priority account'])
+# Includes retail-asset-exclusive fee terms that users may ask without saying "loan"
+_RETAIL_ASSETS_LINE_RE = _keyword_re([
+    'loan', 'retail asset', 'fast cash', 'fast loan', 'overdraft', 'od',
+    'personal loan', 'home loan', 'car loan',
+    # fees/charges that are commonly asked without explicit product keywords
+    'stamp charge', 'stamp duty',
+    'reschedule', 'restructure',  # reschedule & restructure fees
+    'notarization fee', 'noc fee', 'loan repayment certificate',
+    'loan outstanding certificate',
+    # Retail asset-specific charge types (that users may ask without saying "loan")
+    'penal interest', 'partial payment', 'early settlement',
+    'security replacement', 'legal expense',
+    # Vetting/valuation is often asked without "loan"
+    'vetting', 'valuation fee', 'valuation charge', 'vetting & valuation', 'vetting and valuation',
+    'insurance charge', 'documentation charge',
+])
+_CREDIT_CARDS_LINE_RE = _keyword_re(['card', 'credit card', 'debit card', 'visa', 'mastercard'])
+_ENHANCEMENT_RE = _keyword_re(["enhancement", "enhance", "limit enhancement", "enhance limit", "enhanced amount"])
+_REDUCTION_RE = _keyword_re(["reduction", "reduce", "limit reduction", "reduce limit", "reduced amount"])
+_ON_LIMIT_RE = _keyword_re(["on limit", "on loan amount", "loan amount"])
+_USD_RE = _keyword_re(["usd", "dollar", "$"])
+_CARD_CONTEXT_RE = _keyword_re(['card', 'credit card', 'debit card', 'prepaid', 'visa', 'mastercard', 'unionpay', 'diners', 'takapay'])
+_FEE_WORD_RE = _keyword_re(["fee", "charge", "cost"])
+_ANNUAL_INTENT_RE = _keyword_re(["annual", "yearly", "renewal", "issuance", "primary card"])
+# A specific fee type in the query means a generic "card fee" must NOT fall back to the annual fee
+_SPECIFIC_FEE_RE = _keyword_re([
+    "cctv", "receipt", "withdrawal", "cash advance", "replacement", "late", "overlimit",
+    "statement", "certificate", "cib", "verification", "transaction alert",
+    "cheque", "chequebook", "risk assurance", "lounge", "skylounge",
+    "voucher", "return cheque", "undelivered", "destruction", "interest rate",
+    "fund transfer", "wallet transfer",
+])
+_PREMIUM_CARD_RE = _keyword_re(["PLATINUM", "SIGNATURE", "INFINITE", "TITANIUM", "WORLD", "DINERS"])
+
+
+# Skybanking charge type mappings
+_SKYBANKING_CHARGE_TYPE_MAP = {
+    "account certificate fee": "ACCOUNT_CERTIFICATE",
+    "certificate fee": "ACCOUNT_CERTIFICATE",
+    "fund transfer fee": "FUND_TRANSFER",
+    "transfer fee": "FUND_TRANSFER",
+    "transaction fee": "TRANSACTION_FEE",
+    "skybanking fee": "SKYBANKING_FEE",
+}
+
+# Retail asset charge type mappings
+# Note: Order matters - more specific/longer strings should be checked first (they're sorted by length descending)
+#
+# DATA MODEL INVARIANT (confirmed by audit 2025-12-30):
+# All enhancement/reduction processing fees use PROCESSING_FEE + charge_context
+# NOT separate LIMIT_ENHANCEMENT_FEE/LIMIT_REDUCTION_FEE charge_types
+#
+# Therefore: "limit enhancement/reduction processing fee" → PROCESSING_FEE
+# The charge_context (ON_ENHANCED_AMOUNT/ON_REDUCED_AMOUNT) distinguishes them
+_RETAIL_CHARGE_TYPE_MAP = {
+    # Processing fees (with context determined by charge_context field)
+    "fast cash limit enhancement processing fee": "PROCESSING_FEE",  # → PROCESSING_FEE + ON_ENHANCED_AMOUNT
+    "fast cash limit reduction processing fee": "PROCESSING_FEE",  # → PROCESSING_FEE + ON_REDUCED_AMOUNT
+    "limit enhancement processing fee": "PROCESSING_FEE",  # → PROCESSING_FEE + ON_ENHANCED_AMOUNT
+    "limit reduction processing fee": "PROCESSING_FEE",  # → PROCESSING_FEE + ON_REDUCED_AMOUNT
+    "fast cash processing fee": "PROCESSING_FEE",
+    "processing fee": "PROCESSING_FEE",
+    # Standalone limit enhancement/reduction fees (NOT processing fees - if they exist in future)
+    # Note: Currently no loan products use these, but kept for future compatibility
+    "limit enhancement fee": "LIMIT_ENHANCEMENT_FEE",  # Standalone enhancement fee (not processing)
+    "limit reduction fee": "LIMIT_REDUCTION_FEE",  # Standalone reduction fee (not processing)
+    # Other fees
+    "limit cancellation fee": "LIMIT_CANCELLATION_FEE",
+    "closing fee": "LIMIT_CANCELLATION_FEE",
+    "renewal fee": "RENEWAL_FEE",
+    "partial payment fee": "PARTIAL_PAYMENT_FEE",
+    "early settlement fee": "EARLY_SETTLEMENT_FEE",
+    "early_settlement_fee": "EARLY_SETTLEMENT_FEE",  # Handle underscore format
+    "early settlement": "EARLY_SETTLEMENT_FEE",
+    "settlement fee": "EARLY_SETTLEMENT_FEE",  # Generic settlement fee for loans
+    "security lien confirmation": "SECURITY_LIEN_CONFIRMATION",
+    "lien confirmation": "SECURITY_LIEN_CONFIRMATION",
+    "security lien": "SECURITY_LIEN_CONFIRMATION",
+    "quotation change fee": "QUOTATION_CHANGE_FEE",
+    "changing car quotation": "QUOTATION_CHANGE_FEE",
+    "notarization fee": "NOTARIZATION_FEE",
+    "notary fee": "NOTARIZATION_FEE",
+    "noc fee": "NOC_FEE",
+    "loan repayment certificate": "NOC_FEE",
+    "loan repayment certificate (noc)": "NOC_FEE",
+    "loan repayment certificate fee": "NOC_FEE",
+    "penal interest": "PENAL_INTEREST",
+    "cib charge": "CIB_CHARGE",
+    "cpv charge": "CPV_CHARGE",
+    "vetting & valuation charge": "VETTING_VALUATION_CHARGE",
+    "vetting and valuation charge": "VETTING_VALUATION_CHARGE",
+    "vetting valuation charge": "VETTING_VALUATION_CHARGE",
+    "security replacement fee": "SECURITY_REPLACEMENT_FEE",
+    # Stamp charge / stamp duty (retail assets v2 enum)
+    "stamp duty": "STAMP_CHARGE",
+    "stamp charge": "STAMP_CHARGE",
+    "loan outstanding certificate fee": "LOAN_OUTSTANDING_CERTIFICATE_FEE",
+    "loan outstanding certificate": "LOAN_OUTSTANDING_CERTIFICATE_FEE",
+    "outstanding certificate fee": "LOAN_OUTSTANDING_CERTIFICATE_FEE",
+    # Reschedule / restructure fees (v2 enum)
+    "reschedule & restructure exit fee": "RESCHEDULE_RESTRUCTURE_EXIT_FEE",
+    "reschedule and restructure exit fee": "RESCHEDULE_RESTRUCTURE_EXIT_FEE",
+    "reschedule restructure exit fee": "RESCHEDULE_RESTRUCTURE_EXIT_FEE",
+    "restructure exit fee": "RESCHEDULE_RESTRUCTURE_EXIT_FEE",
+    "reschedule & restructure fee": "RESCHEDULE_RESTRUCTURE_FEE",
+    "reschedule and restructure fee": "RESCHEDULE_RESTRUCTURE_FEE",
+    "reschedule restructure fee": "RESCHEDULE_RESTRUCTURE_FEE",
+    "rescheduling fee": "RESCHEDULE_RESTRUCTURE_FEE",
+    "restructuring fee": "RESCHEDULE_RESTRUCTURE_FEE",
+    "reschedule fee": "RESCHEDULE_RESTRUCTURE_FEE",
+    "restructure fee": "RESCHEDULE_RESTRUCTURE_FEE",
+}
+
+# Charge type mappings (for card fees)
+_CARD_CHARGE_TYPE_MAP = {
+    # Supplementary cards (check these FIRST before general annual fee)
+    # Note: Database uses SUPPLEMENTARY_ANNUAL (not ISSUANCE_ANNUAL_SUPPLEMENTARY)
+    "how many free supplementary cards": "SUPPLEMENTARY_FREE_ENTITLEMENT",
+    "how many free supplementary card": "SUPPLEMENTARY_FREE_ENTITLEMENT",
+    "how many free supplementary": "SUPPLEMENTARY_FREE_ENTITLEMENT",
+    "free supplementary cards": "SUPPLEMENTARY_FREE_ENTITLEMENT",
+    "free supplementary card": "SUPPLEMENTARY_FREE_ENTITLEMENT",
+    "free supplementary": "SUPPLEMENTARY_FREE_ENTITLEMENT",
+    "supplementary annual fee": "SUPPLEMENTARY_ANNUAL",
+    "supplementary fee": "SUPPLEMENTARY_ANNUAL",
+    "supplementary card fee": "SUPPLEMENTARY_ANNUAL",
+    "supplementary card annual fee": "SUPPLEMENTARY_ANNUAL",
+    "supplementary": "SUPPLEMENTARY_ANNUAL",  # Catch "how many free supplementary"
+    "additional card fee": "SUPPLEMENTARY_ANNUAL",
+    "additional card annual fee": "SUPPLEMENTARY_ANNUAL",
+
+    # Annual fees (primary card)
+    "annual fee": "ISSUANCE_ANNUAL_PRIMARY",
+    "yearly fee": "ISSUANCE_ANNUAL_PRIMARY",
+    "renewal fee": "ISSUANCE_ANNUAL_PRIMARY",
+    "issuance fee": "ISSUANCE_ANNUAL_PRIMARY",
+    "issuance charge": "ISSUANCE_ANNUAL_PRIMARY",  # "charge" is equivalent to "fee"
+    "issuance cost": "ISSUANCE_ANNUAL_PRIMARY",
+    "primary card fee": "ISSUANCE_ANNUAL_PRIMARY",
+    "primary card annual fee": "ISSUANCE_ANNUAL_PRIMARY",
+
+    # Replacement fees (order matters - check longer/more specific first)
+    "pin replacement fee": "PIN_REPLACEMENT",  # Check this first (longest match)
+    "pin replacement": "PIN_REPLACEMENT",
+    "pin fee": "PIN_REPLACEMENT",
+    "card replacement fee": "CARD_REPLACEMENT",  # Check this before generic "replacement fee"
+    "replacement fee": "CARD_REPLACEMENT",
+    "card replacement": "CARD_REPLACEMENT",
+
+    # Payment fees
+    "late payment": "LATE_PAYMENT",
+    "late fee": "LATE_PAYMENT",
+
+    # ATM/Cash withdrawal (check these before general "fee")
+    "other bank atm": "CASH_WITHDRAWAL_OTHER_ATM",
+    "other bank atm withdrawal": "CASH_WITHDRAWAL_OTHER_ATM",
+    "other bank atm cash withdrawal": "CASH_WITHDRAWAL_OTHER_ATM",
+    "other atm": "CASH_WITHDRAWAL_OTHER_ATM",
+    "atm cash withdrawal charge": "CASH_WITHDRAWAL_EBL_ATM",
+    "atm cash withdrawal fee": "CASH_WITHDRAWAL_EBL_ATM",
+    "atm withdrawal charge": "CASH_WITHDRAWAL_EBL_ATM",
+    "atm withdrawal fee": "CASH_WITHDRAWAL_EBL_ATM",
+    "atm withdrawal": "CASH_WITHDRAWAL_EBL_ATM",
+    "cash withdrawal charge": "CASH_WITHDRAWAL_EBL_ATM",
+    "cash withdrawal fee": "CASH_WITHDRAWAL_EBL_ATM",
+    "cash withdrawal": "CASH_WITHDRAWAL_EBL_ATM",
+    "cash advance charge": "CASH_WITHDRAWAL_EBL_ATM",
+    "cash advance fee": "CASH_WITHDRAWAL_EBL_ATM",
+    "cash advance": "CASH_WITHDRAWAL_EBL_ATM",
+    "atm fee": "CASH_WITHDRAWAL_EBL_ATM",
+    "withdrawal charge": "CASH_WITHDRAWAL_EBL_ATM",
+    "withdrawal fee": "CASH_WITHDRAWAL_EBL_ATM",
+
+    # ATM receipt / CCTV
+    "atm receipt fee": "ATM_RECEIPT_EBL",
+    "atm receipt": "ATM_RECEIPT_EBL",
+    "cctv footage inside dhaka": "ATM_CCTV_FOOTAGE_INSIDE_DHAKA",
+    "cctv footage outside dhaka": "ATM_CCTV_FOOTAGE_OUTSIDE_DHAKA",
+    "cctv footage": "ATM_CCTV_FOOTAGE_INSIDE_DHAKA",  # fallback if Dhaka scope not specified
+    "atm cctv footage": "ATM_CCTV_FOOTAGE_INSIDE_DHAKA",
+
+    # Lounge access
+    "lounge access": "GLOBAL_LOUNGE_ACCESS_FEE",
+    "lounge fee": "GLOBAL_LOUNGE_ACCESS_FEE",
+    "sky lounge": "GLOBAL_LOUNGE_ACCESS_FEE",
+    "airport lounge": "GLOBAL_LOUNGE_ACCESS_FEE",
+
+    # Interest rates
+    "interest rate": "INTEREST_RATE",
+    "card interest": "INTEREST_RATE",
+    "apr": "INTEREST_RATE",
+
+    # Other fees
+    "overlimit": "OVERLIMIT",
+    "over limit": "OVERLIMIT",
+    "duplicate statement": "DUPLICATE_ESTATEMENT",
+    "e-statement": "DUPLICATE_ESTATEMENT",
+    "certificate fee": "CERTIFICATE_FEE",
+    "cib fee": "CUSTOMER_VERIFICATION_CIB",
+    "verification fee": "CUSTOMER_VERIFICATION_CIB",
+    "transaction alert": "TRANSACTION_ALERT_ANNUAL",
+    "chequebook fee": "CARD_CHEQUBOOK",
+    "chequebook charge": "CARD_CHEQUBOOK",
+    "chequebook cost": "CARD_CHEQUBOOK",
+    "card chequebook": "CARD_CHEQUBOOK",
+    "chequebook": "CARD_CHEQUBOOK",
+    "cheque book fee": "CARD_CHEQUBOOK",
+    "cheque book charge": "CARD_CHEQUBOOK",
+    "cheque book": "CARD_CHEQUBOOK",
+    "cheque processing": "CARD_CHEQUE_PROCESSING",
+    "card cheque processing": "CARD_CHEQUE_PROCESSING",
+    "risk assurance": "RISK_ASSURANCE_FEE",
+    "fund transfer": "FUND_TRANSFER_FEE",
+    "wallet transfer": "WALLET_TRANSFER_FEE",
+
+    # Global lounge / SkyLounge free visits (count-based)
+    "global lounge free visit": "GLOBAL_LOUNGE_FREE_VISITS_ANNUAL",
+    "global lounge free visits": "GLOBAL_LOUNGE_FREE_VISITS_ANNUAL",
+    "domestic skylounge free visit": "SKYLOUNGE_FREE_VISITS_DOM_ANNUAL",
+    "international skylounge free visit": "SKYLOUNGE_FREE_VISITS_INTL_ANNUAL",
+
+    # Voucher/cheque/undelivered
+    "sales voucher retrieval": "SALES_VOUCHER_RETRIEVAL",
+    "sales voucher": "SALES_VOUCHER_RETRIEVAL",
+    "return cheque fee": "RETURN_CHEQUE_FEE",
+    "return cheque": "RETURN_CHEQUE_FEE",
+    "undelivered card": "UNDELIVERED_CARD_FEE",
+    "pin destruction": "UNDELIVERED_CARD_FEE",
+}
+
+
+def _longest_keywords_first(mapping: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    """(keyword, charge_type) pairs, longest keyword first so "supplementary annual fee" wins over "annual fee"."""
+    return tuple(sorted(mapping.items(), key=lambda item: len(item[0]), reverse=True))
+
+
+# Sorted once at import instead of on every _map_query_to_charge_type call
+_SKYBANKING_CHARGE_TYPES = _longest_keywords_first(_SKYBANKING_CHARGE_TYPE_MAP)
+_RETAIL_CHARGE_TYPES = _longest_keywords_first(_RETAIL_CHARGE_TYPE_MAP)
+_CARD_CHARGE_TYPES = _longest_keywords_first(_CARD_CHARGE_TYPE_MAP)
+
+
 class FeeEngineClient:
     """Client for connecting to Fee Engine API"""
     
@@ -22,6 +272,8 @@ class FeeEngineClient:
         base_url = getattr(settings, "FEE_ENGINE_URL", "http://localhost:8003").rstrip("/")
         self.base_url = base_url
         self.timeout = 15.0
+        # One pooled client for the process lifetime (keep-alive instead of a new connection per call)
+        self.client = httpx.AsyncClient(timeout=self.timeout)
         logger.info(f"Fee Engine client initialized: base_url={self.base_url}")
     
     def _detect_product_line(self, query: str) -> Optional[str]:
@@ -32,34 +284,19 @@ class FeeEngineClient:
         query_lower = query.lower()
         
         # Check for Skybanking keywords
-        if any(kw in query_lower for kw in ['skybanking', 'sky banking', 'digital banking', 'online banking', 'ebl skybanking']):
+        if _SKYBANKING_LINE_RE.search(query_lower):
             return "SKYBANKING"
         
         # Check for Priority Banking keywords
-        if any(kw in query_lower for kw in ['priority banking', 'priority customer', 'priority account']):
+        if _PRIORITY_BANKING_LINE_RE.search(query_lower):
             return "PRIORITY_BANKING"
         
         # Check for Retail Assets/Loans keywords
-        # Note: include retail-asset-exclusive fee terms that users may ask without saying "loan"
-        if any(kw in query_lower for kw in [
-            'loan', 'retail asset', 'fast cash', 'fast loan', 'overdraft', 'od',
-            'personal loan', 'home loan', 'car loan',
-            # fees/charges that are commonly asked without explicit product keywords
-            'stamp charge', 'stamp duty',
-            'reschedule', 'restructure',  # reschedule & restructure fees
-            'notarization fee', 'noc fee', 'loan repayment certificate',
-            'loan outstanding certificate',
-            # Retail asset-specific charge types (that users may ask without saying "loan")
-            'penal interest', 'partial payment', 'early settlement',
-            'security replacement', 'legal expense',
-            # Vetting/valuation is often asked without "loan"
-            'vetting', 'valuation fee', 'valuation charge', 'vetting & valuation', 'vetting and valuation',
-            'insurance charge', 'documentation charge',
-        ]):
+        if _RETAIL_ASSETS_LINE_RE.search(query_lower):
             return "RETAIL_ASSETS"
         
         # Default to CREDIT_CARDS (or check for explicit card keywords)
-        if any(kw in query_lower for kw in ['card', 'credit card', 'debit card', 'visa', 'mastercard']):
+        if _CREDIT_CARDS_LINE_RE.search(query_lower):
             return "CREDIT_CARDS"
         
         # If no clear indicator, default to CREDIT_CARDS
@@ -201,15 +438,15 @@ class FeeEngineClient:
         query_lower = query.lower()
         
         # Check for enhancement keywords first (before generic limit)
-        if any(keyword in query_lower for keyword in ["enhancement", "enhance", "limit enhancement", "enhance limit", "enhanced amount"]):
+        if _ENHANCEMENT_RE.search(query_lower):
             return "ON_ENHANCED_AMOUNT"
         
         # Check for reduction keywords
-        if any(keyword in query_lower for keyword in ["reduction", "reduce", "limit reduction", "reduce limit", "reduced amount"]):
+        if _REDUCTION_RE.search(query_lower):
             return "ON_REDUCED_AMOUNT"
         
         # Check for explicit limit/loan amount phrases (not standalone "limit")
-        if any(keyword in query_lower for keyword in ["on limit", "on loan amount", "loan amount"]):
+        if _ON_LIMIT_RE.search(query_lower):
             return "ON_LIMIT"
         
         # Default: return None (will use GENERAL in database)
@@ -235,205 +472,9 @@ class FeeEngineClient:
         if "atm" in query_lower and "receipt" in query_lower:
             return "ATM_RECEIPT_EBL"
         
-        # Skybanking charge type mappings
-        skybanking_charge_type_map = {
-            "account certificate fee": "ACCOUNT_CERTIFICATE",
-            "certificate fee": "ACCOUNT_CERTIFICATE",
-            "fund transfer fee": "FUND_TRANSFER",
-            "transfer fee": "FUND_TRANSFER",
-            "transaction fee": "TRANSACTION_FEE",
-            "skybanking fee": "SKYBANKING_FEE",
-        }
-
-        # Retail asset charge type mappings
-        # Note: Order matters - more specific/longer strings should be checked first (they're sorted by length descending)
-        #
-        # DATA MODEL INVARIANT (confirmed by audit 2025-12-30):
-        # All enhancement/reduction processing fees use PROCESSING_FEE + charge_context
-        # NOT separate LIMIT_ENHANCEMENT_FEE/LIMIT_REDUCTION_FEE charge_types
-        #
-        # Therefore: "limit enhancement/reduction processing fee" → PROCESSING_FEE
-        # The charge_context (ON_ENHANCED_AMOUNT/ON_REDUCED_AMOUNT) distinguishes them
-        retail_charge_type_map = {
-            # Processing fees (with context determined by charge_context field)
-            "fast cash limit enhancement processing fee": "PROCESSING_FEE",  # → PROCESSING_FEE + ON_ENHANCED_AMOUNT
-            "fast cash limit reduction processing fee": "PROCESSING_FEE",  # → PROCESSING_FEE + ON_REDUCED_AMOUNT
-            "limit enhancement processing fee": "PROCESSING_FEE",  # → PROCESSING_FEE + ON_ENHANCED_AMOUNT
-            "limit reduction processing fee": "PROCESSING_FEE",  # → PROCESSING_FEE + ON_REDUCED_AMOUNT
-            "fast cash processing fee": "PROCESSING_FEE",
-            "processing fee": "PROCESSING_FEE",
-            # Standalone limit enhancement/reduction fees (NOT processing fees - if they exist in future)
-            # Note: Currently no loan products use these, but kept for future compatibility
-            "limit enhancement fee": "LIMIT_ENHANCEMENT_FEE",  # Standalone enhancement fee (not processing)
-            "limit reduction fee": "LIMIT_REDUCTION_FEE",  # Standalone reduction fee (not processing)
-            # Other fees
-            "limit cancellation fee": "LIMIT_CANCELLATION_FEE",
-            "closing fee": "LIMIT_CANCELLATION_FEE",
-            "renewal fee": "RENEWAL_FEE",
-            "partial payment fee": "PARTIAL_PAYMENT_FEE",
-            "early settlement fee": "EARLY_SETTLEMENT_FEE",
-            "early_settlement_fee": "EARLY_SETTLEMENT_FEE",  # Handle underscore format
-            "early settlement": "EARLY_SETTLEMENT_FEE",
-            "settlement fee": "EARLY_SETTLEMENT_FEE",  # Generic settlement fee for loans
-            "security lien confirmation": "SECURITY_LIEN_CONFIRMATION",
-            "lien confirmation": "SECURITY_LIEN_CONFIRMATION",
-            "security lien": "SECURITY_LIEN_CONFIRMATION",
-            "quotation change fee": "QUOTATION_CHANGE_FEE",
-            "changing car quotation": "QUOTATION_CHANGE_FEE",
-            "notarization fee": "NOTARIZATION_FEE",
-            "notary fee": "NOTARIZATION_FEE",
-            "noc fee": "NOC_FEE",
-            "loan repayment certificate": "NOC_FEE",
-            "loan repayment certificate (noc)": "NOC_FEE",
-            "loan repayment certificate fee": "NOC_FEE",
-            "penal interest": "PENAL_INTEREST",
-            "cib charge": "CIB_CHARGE",
-            "cpv charge": "CPV_CHARGE",
-            "vetting & valuation charge": "VETTING_VALUATION_CHARGE",
-            "vetting and valuation charge": "VETTING_VALUATION_CHARGE",
-            "vetting valuation charge": "VETTING_VALUATION_CHARGE",
-            "security replacement fee": "SECURITY_REPLACEMENT_FEE",
-            # Stamp charge / stamp duty (retail assets v2 enum)
-            "stamp duty": "STAMP_CHARGE",
-            "stamp charge": "STAMP_CHARGE",
-            "loan outstanding certificate fee": "LOAN_OUTSTANDING_CERTIFICATE_FEE",
-            "loan outstanding certificate": "LOAN_OUTSTANDING_CERTIFICATE_FEE",
-            "outstanding certificate fee": "LOAN_OUTSTANDING_CERTIFICATE_FEE",
-            # Reschedule / restructure fees (v2 enum)
-            "reschedule & restructure exit fee": "RESCHEDULE_RESTRUCTURE_EXIT_FEE",
-            "reschedule and restructure exit fee": "RESCHEDULE_RESTRUCTURE_EXIT_FEE",
-            "reschedule restructure exit fee": "RESCHEDULE_RESTRUCTURE_EXIT_FEE",
-            "restructure exit fee": "RESCHEDULE_RESTRUCTURE_EXIT_FEE",
-            "reschedule & restructure fee": "RESCHEDULE_RESTRUCTURE_FEE",
-            "reschedule and restructure fee": "RESCHEDULE_RESTRUCTURE_FEE",
-            "reschedule restructure fee": "RESCHEDULE_RESTRUCTURE_FEE",
-            "rescheduling fee": "RESCHEDULE_RESTRUCTURE_FEE",
-            "restructuring fee": "RESCHEDULE_RESTRUCTURE_FEE",
-            "reschedule fee": "RESCHEDULE_RESTRUCTURE_FEE",
-            "restructure fee": "RESCHEDULE_RESTRUCTURE_FEE",
-        }
-
-        # Charge type mappings (for card fees)
-        charge_type_map = {
-            # Supplementary cards (check these FIRST before general annual fee)
-            # Note: Database uses SUPPLEMENTARY_ANNUAL (not ISSUANCE_ANNUAL_SUPPLEMENTARY)
-            "how many free supplementary cards": "SUPPLEMENTARY_FREE_ENTITLEMENT",
-            "how many free supplementary card": "SUPPLEMENTARY_FREE_ENTITLEMENT",
-            "how many free supplementary": "SUPPLEMENTARY_FREE_ENTITLEMENT",
-            "free supplementary cards": "SUPPLEMENTARY_FREE_ENTITLEMENT",
-            "free supplementary card": "SUPPLEMENTARY_FREE_ENTITLEMENT",
-            "free supplementary": "SUPPLEMENTARY_FREE_ENTITLEMENT",
-            "supplementary annual fee": "SUPPLEMENTARY_ANNUAL",
-            "supplementary fee": "SUPPLEMENTARY_ANNUAL",
-            "supplementary card fee": "SUPPLEMENTARY_ANNUAL",
-            "supplementary card annual fee": "SUPPLEMENTARY_ANNUAL",
-            "supplementary": "SUPPLEMENTARY_ANNUAL",  # Catch "how many free supplementary"
-            "additional card fee": "SUPPLEMENTARY_ANNUAL",
-            "additional card annual fee": "SUPPLEMENTARY_ANNUAL",
-            
-            # Annual fees (primary card)
-            "annual fee": "ISSUANCE_ANNUAL_PRIMARY",
-            "yearly fee": "ISSUANCE_ANNUAL_PRIMARY",
-            "renewal fee": "ISSUANCE_ANNUAL_PRIMARY",
-            "issuance fee": "ISSUANCE_ANNUAL_PRIMARY",
-            "issuance charge": "ISSUANCE_ANNUAL_PRIMARY",  # "charge" is equivalent to "fee"
-            "issuance cost": "ISSUANCE_ANNUAL_PRIMARY",
-            "primary card fee": "ISSUANCE_ANNUAL_PRIMARY",
-            "primary card annual fee": "ISSUANCE_ANNUAL_PRIMARY",
-            
-            # Replacement fees (order matters - check longer/more specific first)
-            "pin replacement fee": "PIN_REPLACEMENT",  # Check this first (longest match)
-            "pin replacement": "PIN_REPLACEMENT",
-            "pin fee": "PIN_REPLACEMENT",
-            "card replacement fee": "CARD_REPLACEMENT",  # Check this before generic "replacement fee"
-            "replacement fee": "CARD_REPLACEMENT",
-            "card replacement": "CARD_REPLACEMENT",
-            
-            # Payment fees
-            "late payment": "LATE_PAYMENT",
-            "late fee": "LATE_PAYMENT",
-            
-            # ATM/Cash withdrawal (check these before general "fee")
-            "other bank atm": "CASH_WITHDRAWAL_OTHER_ATM",
-            "other bank atm withdrawal": "CASH_WITHDRAWAL_OTHER_ATM",
-            "other bank atm cash withdrawal": "CASH_WITHDRAWAL_OTHER_ATM",
-            "other atm": "CASH_WITHDRAWAL_OTHER_ATM",
-            "atm cash withdrawal charge": "CASH_WITHDRAWAL_EBL_ATM",
-            "atm cash withdrawal fee": "CASH_WITHDRAWAL_EBL_ATM",
-            "atm withdrawal charge": "CASH_WITHDRAWAL_EBL_ATM",
-            "atm withdrawal fee": "CASH_WITHDRAWAL_EBL_ATM",
-            "atm withdrawal": "CASH_WITHDRAWAL_EBL_ATM",
-            "cash withdrawal charge": "CASH_WITHDRAWAL_EBL_ATM",
-            "cash withdrawal fee": "CASH_WITHDRAWAL_EBL_ATM",
-            "cash withdrawal": "CASH_WITHDRAWAL_EBL_ATM",
-            "cash advance charge": "CASH_WITHDRAWAL_EBL_ATM",
-            "cash advance fee": "CASH_WITHDRAWAL_EBL_ATM",
-            "cash advance": "CASH_WITHDRAWAL_EBL_ATM",
-            "atm fee": "CASH_WITHDRAWAL_EBL_ATM",
-            "withdrawal charge": "CASH_WITHDRAWAL_EBL_ATM",
-            "withdrawal fee": "CASH_WITHDRAWAL_EBL_ATM",
-
-            # ATM receipt / CCTV
-            "atm receipt fee": "ATM_RECEIPT_EBL",
-            "atm receipt": "ATM_RECEIPT_EBL",
-            "cctv footage inside dhaka": "ATM_CCTV_FOOTAGE_INSIDE_DHAKA",
-            "cctv footage outside dhaka": "ATM_CCTV_FOOTAGE_OUTSIDE_DHAKA",
-            "cctv footage": "ATM_CCTV_FOOTAGE_INSIDE_DHAKA",  # fallback if Dhaka scope not specified
-            "atm cctv footage": "ATM_CCTV_FOOTAGE_INSIDE_DHAKA",
-            
-            # Lounge access
-            "lounge access": "GLOBAL_LOUNGE_ACCESS_FEE",
-            "lounge fee": "GLOBAL_LOUNGE_ACCESS_FEE",
-            "sky lounge": "GLOBAL_LOUNGE_ACCESS_FEE",
-            "airport lounge": "GLOBAL_LOUNGE_ACCESS_FEE",
-            
-            # Interest rates
-            "interest rate": "INTEREST_RATE",
-            "card interest": "INTEREST_RATE",
-            "apr": "INTEREST_RATE",
-            
-            # Other fees
-            "overlimit": "OVERLIMIT",
-            "over limit": "OVERLIMIT",
-            "duplicate statement": "DUPLICATE_ESTATEMENT",
-            "e-statement": "DUPLICATE_ESTATEMENT",
-            "certificate fee": "CERTIFICATE_FEE",
-            "cib fee": "CUSTOMER_VERIFICATION_CIB",
-            "verification fee": "CUSTOMER_VERIFICATION_CIB",
-            "transaction alert": "TRANSACTION_ALERT_ANNUAL",
-            "chequebook fee": "CARD_CHEQUBOOK",
-            "chequebook charge": "CARD_CHEQUBOOK",
-            "chequebook cost": "CARD_CHEQUBOOK",
-            "card chequebook": "CARD_CHEQUBOOK",
-            "chequebook": "CARD_CHEQUBOOK",
-            "cheque book fee": "CARD_CHEQUBOOK",
-            "cheque book charge": "CARD_CHEQUBOOK",
-            "cheque book": "CARD_CHEQUBOOK",
-            "cheque processing": "CARD_CHEQUE_PROCESSING",
-            "card cheque processing": "CARD_CHEQUE_PROCESSING",
-            "risk assurance": "RISK_ASSURANCE_FEE",
-            "fund transfer": "FUND_TRANSFER_FEE",
-            "wallet transfer": "WALLET_TRANSFER_FEE",
-
-            # Global lounge / SkyLounge free visits (count-based)
-            "global lounge free visit": "GLOBAL_LOUNGE_FREE_VISITS_ANNUAL",
-            "global lounge free visits": "GLOBAL_LOUNGE_FREE_VISITS_ANNUAL",
-            "domestic skylounge free visit": "SKYLOUNGE_FREE_VISITS_DOM_ANNUAL",
-            "international skylounge free visit": "SKYLOUNGE_FREE_VISITS_INTL_ANNUAL",
-
-            # Voucher/cheque/undelivered
-            "sales voucher retrieval": "SALES_VOUCHER_RETRIEVAL",
-            "sales voucher": "SALES_VOUCHER_RETRIEVAL",
-            "return cheque fee": "RETURN_CHEQUE_FEE",
-            "return cheque": "RETURN_CHEQUE_FEE",
-            "undelivered card": "UNDELIVERED_CARD_FEE",
-            "pin destruction": "UNDELIVERED_CARD_FEE",
-        }
-        
         # Check for charge type keywords (longest matches first to prioritize specific terms)
-        # Sort by length descending to match "supplementary annual fee" before "annual fee"
-        def _match_from_map(label: str, mapping: Dict[str, str]) -> Optional[str]:
-            for keyword, charge_type in sorted(mapping.items(), key=lambda x: len(x[0]), reverse=True):
+        def _match_from_map(label: str, keywords: Tuple[Tuple[str, str], ...]) -> Optional[str]:
+            for keyword, charge_type in keywords:
                 if keyword in query_lower:
                     logger.info(f"[FEE_ENGINE] Matched {label} charge type '{charge_type}' from keyword '{keyword}' in query: '{query}'")
                     return charge_type
@@ -443,28 +484,28 @@ class FeeEngineClient:
         # (e.g., "renewal fee" can mean card annual fee renewal or retail asset renewal).
         if product_line == "CREDIT_CARDS":
             mapping_order = [
-                ("card", charge_type_map),
-                ("skybanking", skybanking_charge_type_map),
-                ("retail asset", retail_charge_type_map),
+                ("card", _CARD_CHARGE_TYPES),
+                ("skybanking", _SKYBANKING_CHARGE_TYPES),
+                ("retail asset", _RETAIL_CHARGE_TYPES),
             ]
         elif product_line == "RETAIL_ASSETS":
             mapping_order = [
-                ("retail asset", retail_charge_type_map),
-                ("skybanking", skybanking_charge_type_map),
-                ("card", charge_type_map),
+                ("retail asset", _RETAIL_CHARGE_TYPES),
+                ("skybanking", _SKYBANKING_CHARGE_TYPES),
+                ("card", _CARD_CHARGE_TYPES),
             ]
         elif product_line == "SKYBANKING":
             mapping_order = [
-                ("skybanking", skybanking_charge_type_map),
-                ("card", charge_type_map),
-                ("retail asset", retail_charge_type_map),
+                ("skybanking", _SKYBANKING_CHARGE_TYPES),
+                ("card", _CARD_CHARGE_TYPES),
+                ("retail asset", _RETAIL_CHARGE_TYPES),
             ]
         else:
             # Legacy/default behavior (for backward compatibility)
             mapping_order = [
-                ("skybanking", skybanking_charge_type_map),
-                ("retail asset", retail_charge_type_map),
-                ("card", charge_type_map),
+                ("skybanking", _SKYBANKING_CHARGE_TYPES),
+                ("retail asset", _RETAIL_CHARGE_TYPES),
+                ("card", _CARD_CHARGE_TYPES),
             ]
 
         for label, mapping in mapping_order:
@@ -485,19 +526,12 @@ class FeeEngineClient:
         # Defaulting logic:
         # Default to annual primary fee ONLY when the query looks like it is asking about annual/issuance/renewal,
         # or when it's a generic "X card fee" query with no other specific fee keywords.
-        has_card_context = any(kw in query_lower for kw in ['card', 'credit card', 'debit card', 'prepaid', 'visa', 'mastercard', 'unionpay', 'diners', 'takapay'])
-        has_fee_word = any(kw in query_lower for kw in ["fee", "charge", "cost"])
-        annual_intent = any(kw in query_lower for kw in ["annual", "yearly", "renewal", "issuance", "primary card"])
+        has_card_context = _CARD_CONTEXT_RE.search(query_lower) is not None
+        has_fee_word = _FEE_WORD_RE.search(query_lower) is not None
+        annual_intent = _ANNUAL_INTENT_RE.search(query_lower) is not None
 
         # If the user mentioned a specific fee type keyword, do NOT fall back to annual fee.
-        specific_fee_keywords = [
-            "cctv", "receipt", "withdrawal", "cash advance", "replacement", "late", "overlimit",
-            "statement", "certificate", "cib", "verification", "transaction alert",
-            "cheque", "chequebook", "risk assurance", "lounge", "skylounge",
-            "voucher", "return cheque", "undelivered", "destruction", "interest rate",
-            "fund transfer", "wallet transfer",
-        ]
-        has_specific_fee_keyword = any(kw in query_lower for kw in specific_fee_keywords)
+        has_specific_fee_keyword = _SPECIFIC_FEE_RE.search(query_lower) is not None
 
         if (product_line == "CREDIT_CARDS" or has_card_context) and has_fee_word:
             if annual_intent or not has_specific_fee_keyword:
@@ -642,7 +676,7 @@ class FeeEngineClient:
         # Infer currency from query if not explicitly provided
         if currency is None:
             ql = (query or "").lower()
-            if any(k in ql for k in ["usd", "dollar", "$"]):
+            if _USD_RE.search(ql):
                 currency = "USD"
             else:
                 currency = "BDT"
@@ -683,34 +717,33 @@ class FeeEngineClient:
                     request_data["outstanding_balance"] = float(outstanding_balance)
                 
                 try:
-                    async with httpx.AsyncClient(timeout=self.timeout) as client:
-                        url = f"{self.base_url}/fees/calculate"
-                        logger.info(f"[FEE_ENGINE] Calling {url} with product '{product}', currency '{curr}': {request_data}")
-                        resp = await client.post(url, json=request_data)
+                    url = f"{self.base_url}/fees/calculate"
+                    logger.info(f"[FEE_ENGINE] Calling {url} with product '{product}', currency '{curr}': {request_data}")
+                    resp = await self.client.post(url, json=request_data)
+                    
+                    if resp.status_code == 200:
+                        result = resp.json()
+                        logger.info(f"[FEE_ENGINE] Fee calculation result for product '{product}', currency '{curr}': {result}")
                         
-                        if resp.status_code == 200:
-                            result = resp.json()
-                            logger.info(f"[FEE_ENGINE] Fee calculation result for product '{product}', currency '{curr}': {result}")
-                            
-                            # If we got a calculated result, return it
-                            if result.get("status") == "CALCULATED":
-                                return result
-                            # If we got a note-based result, return it
-                            elif result.get("status") == "REQUIRES_NOTE_RESOLUTION":
-                                return result
-                            # If FX_RATE_REQUIRED, try next currency (the fee exists but in different currency)
-                            elif result.get("status") == "FX_RATE_REQUIRED":
-                                # Continue to try next currency variation
-                                continue
-                            # If NO_RULE_FOUND, try next currency/product combination
-                            elif result.get("status") == "NO_RULE_FOUND":
-                                continue
-                            else:
-                                return result
-                        else:
-                            logger.warning(f"[FEE_ENGINE] Non-200 response for product '{product}', currency '{curr}': {resp.status_code} - {resp.text}")
+                        # If we got a calculated result, return it
+                        if result.get("status") == "CALCULATED":
+                            return result
+                        # If we got a note-based result, return it
+                        elif result.get("status") == "REQUIRES_NOTE_RESOLUTION":
+                            return result
+                        # If FX_RATE_REQUIRED, try next currency (the fee exists but in different currency)
+                        elif result.get("status") == "FX_RATE_REQUIRED":
+                            # Continue to try next currency variation
                             continue
-                            
+                        # If NO_RULE_FOUND, try next currency/product combination
+                        elif result.get("status") == "NO_RULE_FOUND":
+                            continue
+                        else:
+                            return result
+                    else:
+                        logger.warning(f"[FEE_ENGINE] Non-200 response for product '{product}', currency '{curr}': {resp.status_code} - {resp.text}")
+                        continue
+                        
                 except httpx.TimeoutException:
                     logger.warning(f"[FEE_ENGINE] Timeout calling fee engine service for product '{product}', currency '{curr}'")
                     continue
@@ -838,8 +871,7 @@ class FeeEngineClient:
                     card_info = self._extract_card_info_from_query(query)
                     card_product = card_info.get("card_product", "")
                 card_product_upper = card_product.upper() if card_product else ""
-                premium_cards = ["PLATINUM", "SIGNATURE", "INFINITE", "TITANIUM", "WORLD", "DINERS"]
-                is_premium_card = any(premium in card_product_upper for premium in premium_cards)
+                is_premium_card = _PREMIUM_CARD_RE.search(card_product_upper) is not None
                 
                 # If fee_amount is 0 and it's a premium card, it means "Unlimited" (based on original data)
                 # The migration script incorrectly converted "Unlimited" to 0.0000 BDT
@@ -975,9 +1007,9 @@ class FeeEngineClient:
             query_lower = query.lower()
             
             # Check for enhancement/reduction/limit keywords in query and add to description_keywords
-            if any(kw in query_lower for kw in ["enhancement", "enhance", "limit enhancement", "enhanced amount"]):
+            if _ENHANCEMENT_RE.search(query_lower):
                 description_keywords.extend(["enhancement", "enhance", "limit enhancement"])
-            elif any(kw in query_lower for kw in ["reduction", "reduce", "limit reduction", "reduced amount"]):
+            elif _REDUCTION_RE.search(query_lower):
                 description_keywords.extend(["reduction", "reduce", "limit reduction"])
             elif any(kw in query_lower for kw in ["on limit", "limit"]):
                 description_keywords.extend(["on limit", "limit"])
@@ -1002,80 +1034,79 @@ class FeeEngineClient:
             logger.info(f"[FEE_ENGINE] Using description keywords: {description_keywords} for query: '{query}'")
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                url = f"{self.base_url}/retail-asset-charges/query"
-                logger.info(f"[FEE_ENGINE] Calling {url} with: {request_data}")
-                logger.info(f"[FEE_ENGINE] Query params - loan_product: '{loan_product}', charge_type: '{charge_type}', description_keywords: {description_keywords}, as_of_date: '{query_date}'")
-                resp = await client.post(url, json=request_data)
+            url = f"{self.base_url}/retail-asset-charges/query"
+            logger.info(f"[FEE_ENGINE] Calling {url} with: {request_data}")
+            logger.info(f"[FEE_ENGINE] Query params - loan_product: '{loan_product}', charge_type: '{charge_type}', description_keywords: {description_keywords}, as_of_date: '{query_date}'")
+            resp = await self.client.post(url, json=request_data)
+            
+            if resp.status_code == 200:
+                result = resp.json()
+                logger.info(f"[FEE_ENGINE] Retail asset charge query result: {result}")
+                logger.info(f"[FEE_ENGINE] Result status: {result.get('status')}, charges found: {len(result.get('charges', []))}")
                 
-                if resp.status_code == 200:
-                    result = resp.json()
-                    logger.info(f"[FEE_ENGINE] Retail asset charge query result: {result}")
-                    logger.info(f"[FEE_ENGINE] Result status: {result.get('status')}, charges found: {len(result.get('charges', []))}")
-                    
-                    # DESCRIPTION KEYWORD FALLBACK:
-                    # If nothing found with keywords, retry without keywords
-                    if result.get('status') == 'NO_RULE_FOUND' and description_keywords:
+                # DESCRIPTION KEYWORD FALLBACK:
+                # If nothing found with keywords, retry without keywords
+                if result.get('status') == 'NO_RULE_FOUND' and description_keywords:
+                    logger.info(
+                        f"[FEE_ENGINE] Description keyword fallback: NO_RULE_FOUND with keywords={description_keywords}. "
+                        f"Retrying without keywords (loan_product={loan_product}, charge_type={charge_type})"
+                    )
+                    fallback_request = request_data.copy()
+                    fallback_request.pop("description_keywords", None)
+                    resp_fallback = await self.client.post(url, json=fallback_request)
+                    if resp_fallback.status_code == 200:
+                        result_fallback = resp_fallback.json()
                         logger.info(
-                            f"[FEE_ENGINE] Description keyword fallback: NO_RULE_FOUND with keywords={description_keywords}. "
-                            f"Retrying without keywords (loan_product={loan_product}, charge_type={charge_type})"
+                            f"[FEE_ENGINE] Description fallback result: {result_fallback.get('status')}, "
+                            f"charges found: {len(result_fallback.get('charges', []))}"
                         )
+                        if result_fallback.get('status') != 'NO_RULE_FOUND':
+                            return result_fallback
+                    else:
+                        logger.warning(
+                            f"[FEE_ENGINE] Description fallback non-200 response: {resp_fallback.status_code} - {resp_fallback.text}"
+                        )
+
+                # DB-DRIVEN FALLBACK: If NO_RULE_FOUND and query contains "processing fee",
+                # try PROCESSING_FEE with the same keywords
+                if result.get('status') == 'NO_RULE_FOUND':
+                    query_lower = query.lower()
+                    if ("processing fee" in query_lower and 
+                        charge_type in ["LIMIT_ENHANCEMENT_FEE", "LIMIT_REDUCTION_FEE"]):
+                        
+                        logger.info(f"[FEE_ENGINE] DB-driven fallback: Trying PROCESSING_FEE with keywords={description_keywords} (original charge_type={charge_type} not found)")
+                        
+                        # Retry with PROCESSING_FEE
                         fallback_request = request_data.copy()
-                        fallback_request.pop("description_keywords", None)
-                        resp_fallback = await client.post(url, json=fallback_request)
+                        fallback_request["charge_type"] = "PROCESSING_FEE"
+                        resp_fallback = await self.client.post(url, json=fallback_request)
+                        
                         if resp_fallback.status_code == 200:
                             result_fallback = resp_fallback.json()
-                            logger.info(
-                                f"[FEE_ENGINE] Description fallback result: {result_fallback.get('status')}, "
-                                f"charges found: {len(result_fallback.get('charges', []))}"
-                            )
+                            logger.info(f"[FEE_ENGINE] Fallback query result: {result_fallback.get('status')}, charges found: {len(result_fallback.get('charges', []))}")
                             if result_fallback.get('status') != 'NO_RULE_FOUND':
                                 return result_fallback
-                        else:
-                            logger.warning(
-                                f"[FEE_ENGINE] Description fallback non-200 response: {resp_fallback.status_code} - {resp_fallback.text}"
-                            )
-
-                    # DB-DRIVEN FALLBACK: If NO_RULE_FOUND and query contains "processing fee",
-                    # try PROCESSING_FEE with the same keywords
-                    if result.get('status') == 'NO_RULE_FOUND':
-                        query_lower = query.lower()
-                        if ("processing fee" in query_lower and 
-                            charge_type in ["LIMIT_ENHANCEMENT_FEE", "LIMIT_REDUCTION_FEE"]):
-                            
-                            logger.info(f"[FEE_ENGINE] DB-driven fallback: Trying PROCESSING_FEE with keywords={description_keywords} (original charge_type={charge_type} not found)")
-                            
-                            # Retry with PROCESSING_FEE
-                            fallback_request = request_data.copy()
-                            fallback_request["charge_type"] = "PROCESSING_FEE"
-                            resp_fallback = await client.post(url, json=fallback_request)
-                            
-                            if resp_fallback.status_code == 200:
-                                result_fallback = resp_fallback.json()
-                                logger.info(f"[FEE_ENGINE] Fallback query result: {result_fallback.get('status')}, charges found: {len(result_fallback.get('charges', []))}")
-                                if result_fallback.get('status') != 'NO_RULE_FOUND':
-                                    return result_fallback
-                    
-                    # If multiple charges found and no loan_product specified, return NEEDS_DISAMBIGUATION
-                    if result.get('status') == 'FOUND' and not loan_product:
-                        charges = result.get('charges', [])
-                        if len(charges) > 1:
-                            # Return top 10 charges (sorted by priority) for disambiguation
-                            top_charges = charges[:10]
-                            result['status'] = 'NEEDS_DISAMBIGUATION'
-                            result['charges'] = top_charges
-                            result['message'] = f"Multiple loan products found for {charge_type}. Please specify the loan product."
-                            logger.info(f"[FEE_ENGINE] Multiple charges found ({len(charges)}), returning NEEDS_DISAMBIGUATION with top {len(top_charges)} charges")
-                            return result
-                    
-                    if result.get('status') == 'NO_RULE_FOUND':
-                        logger.warning(f"[FEE_ENGINE] No retail asset charges found. Query params were: loan_product='{loan_product}', charge_type='{charge_type}', description_keywords={description_keywords}, as_of_date='{query_date}'. Message: {result.get('message', 'No message')}")
-                    
-                    return result
-                else:
-                    logger.warning(f"[FEE_ENGINE] Non-200 response: {resp.status_code} - {resp.text}")
-                    return None
-                    
+                
+                # If multiple charges found and no loan_product specified, return NEEDS_DISAMBIGUATION
+                if result.get('status') == 'FOUND' and not loan_product:
+                    charges = result.get('charges', [])
+                    if len(charges) > 1:
+                        # Return top 10 charges (sorted by priority) for disambiguation
+                        top_charges = charges[:10]
+                        result['status'] = 'NEEDS_DISAMBIGUATION'
+                        result['charges'] = top_charges
+                        result['message'] = f"Multiple loan products found for {charge_type}. Please specify the loan product."
+                        logger.info(f"[FEE_ENGINE] Multiple charges found ({len(charges)}), returning NEEDS_DISAMBIGUATION with top {len(top_charges)} charges")
+                        return result
+                
+                if result.get('status') == 'NO_RULE_FOUND':
+                    logger.warning(f"[FEE_ENGINE] No retail asset charges found. Query params were: loan_product='{loan_product}', charge_type='{charge_type}', description_keywords={description_keywords}, as_of_date='{query_date}'. Message: {result.get('message', 'No message')}")
+                
+                return result
+            else:
+                logger.warning(f"[FEE_ENGINE] Non-200 response: {resp.status_code} - {resp.text}")
+                return None
+                
         except httpx.TimeoutException:
             logger.warning(f"[FEE_ENGINE] Timeout calling retail asset charges endpoint")
             return None
@@ -1334,3 +1365,7 @@ class FeeEngineClient:
             result['deduped_options'] = deduped_options
             
             return "\n".join(response_parts)
+    
+    async def close(self):
+        """Close HTTP client"""
+        await self.client.aclose()
@@ -2,14 +2,19 @@
 LightRAG client for querying the RAG system.
 """
 
+import asyncio
 import httpx
 import logging
+import random
 from typing import Optional, Dict, Any
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Transient upstream statuses worth one more attempt (rate limited / gateway hiccups)
+_RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
 
 class LightRAGClient:
     """Client for connecting to LightRAG API"""
@@ -28,6 +33,8 @@ class LightRAGClient:
             "X-API-Key": self.api_key
         }
         self.client = httpx.AsyncClient(timeout=self.timeout)
+        # Bounds in-flight retrievals so bursts queue here instead of overloading the LightRAG server
+        self._semaphore = asyncio.Semaphore(settings.LIGHTRAG_MAX_CONCURRENCY)
         logger.info(f"LightRAG client initialized: base_url={self.base_url}, knowledge_base={self.knowledge_base}")
     
     async def health_check(self) -> Dict[str, Any]:
@@ -43,6 +50,31 @@ class LightRAGClient:
             logger.warning(f"LightRAG health check failed: {e}")
             return {"status": "error", "message": str(e)}
     
+    async def _post(self, path: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST to LightRAG under the concurrency limit.
+        Connection failures and retryable statuses are retried with jittered exponential backoff.
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self.client.post(
+                        f"{self.base_url}{path}",
+                        headers=self.headers,
+                        json=data
+                    )
+                if response.status_code not in _RETRYABLE_STATUS_CODES or attempt >= settings.LIGHTRAG_MAX_RETRIES:
+                    response.raise_for_status()
+                    return response.json()
+                logger.warning(f"LightRAG returned {response.status_code} for {path}, retrying")
+            except (httpx.ConnectError, httpx.RemoteProtocolError) as e:
+                if attempt >= settings.LIGHTRAG_MAX_RETRIES:
+                    raise
+                logger.warning(f"LightRAG connection error for {path}, retrying: {e}")
+            attempt += 1
+            await asyncio.sleep(0.25 * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+    
     async def query(
         self,
         query: str,
@@ -87,13 +119,7 @@ class LightRAGClient:
             data["knowledge_base"] = kb
         
         try:
-            response = await self.client.post(
-                f"{self.base_url}/query",
-                headers=self.headers,
-                json=data
-            )
-            response.raise_for_status()
-            return response.json()
+            return await self._post("/query", data)
         except httpx.HTTPStatusError as e:
             error_text = e.response.text if e.response else "No response text"
             error_status = e.response.status_code if e.response else "Unknown"
@@ -139,13 +165,7 @@ class LightRAGClient:
             data["knowledge_base"] = kb
         
         try:
-            response = await self.client.post(
-                f"{self.base_url}/query/data",
-                headers=self.headers,
-                json=data
-            )
-            response.raise_for_status()
-            return response.json()
+            return await self._post("/query/data", data)
         except Exception as e:
             logger.error(f"LightRAG query_data error: {e}")
             raise
@@ -5,6 +5,7 @@ Client for calling the location/address microservice for branch, ATM, CRM, RTDM,
 
 import httpx
 import logging
+from collections import defaultdict
 from typing import Optional, Dict, Any, List
 import re
 
@@ -20,6 +21,8 @@ class LocationClient:
         base_url = getattr(settings, "LOCATION_SERVICE_URL", "http://localhost:8004").rstrip("/")
         self.base_url = base_url
         self.timeout = 5.0
+        # One pooled client for the process lifetime (keep-alive instead of a new connection per call)
+        self.client = httpx.AsyncClient(timeout=self.timeout)
         logger.info(f"Location service client initialized: base_url={self.base_url}")
     
     def _detect_location_type(self, query: str) -> Optional[str]:
@@ -183,19 +186,18 @@ class LocationClient:
             params["search"] = search
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                url = f"{self.base_url}/locations"
-                logger.info(f"[LOCATION_SERVICE] Calling {url} with params: {params}")
-                resp = await client.get(url, params=params)
+            url = f"{self.base_url}/locations"
+            logger.info(f"[LOCATION_SERVICE] Calling {url} with params: {params}")
+            resp = await self.client.get(url, params=params)
+            
+            if resp.status_code == 200:
+                result = resp.json()
+                logger.info(f"[LOCATION_SERVICE] Location query result: {result.get('total', 0)} locations found")
+                return result
+            else:
+                logger.warning(f"[LOCATION_SERVICE] Non-200 response: {resp.status_code} - {resp.text}")
+                return None
                 
-                if resp.status_code == 200:
-                    result = resp.json()
-                    logger.info(f"[LOCATION_SERVICE] Location query result: {result.get('total', 0)} locations found")
-                    return result
-                else:
-                    logger.warning(f"[LOCATION_SERVICE] Non-200 response: {resp.status_code} - {resp.text}")
-                    return None
-                    
         except httpx.TimeoutException:
             logger.warning(f"[LOCATION_SERVICE] Timeout calling location service")
             return None
@@ -225,12 +227,9 @@ class LocationClient:
         is_count_query = any(term in query_lower for term in ["how many", "number of", "count", "total"])
         
         # Group locations by type
-        by_type = {}
+        by_type: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         for loc in locations:
-            loc_type = loc.get("type", "unknown")
-            if loc_type not in by_type:
-                by_type[loc_type] = []
-            by_type[loc_type].append(loc)
+            by_type[loc.get("type", "unknown")].append(loc)
         
         # Build formatted response
         response_parts = []
@@ -286,4 +285,7 @@ class LocationClient:
         response_parts.append("\nSource: EBL Location Database (Normalized)")
         
         return "".join(response_parts)
-
+    
+    async def close(self):
+        """Close HTTP client"""
+        await self.client.aclose()
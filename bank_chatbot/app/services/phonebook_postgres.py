@@ -5,9 +5,10 @@ Optimized for performance with full-text search and proper indexing
 """
 import re
 import os
+import threading
 from typing import List, Dict, Optional
 import logging
-from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, Index, func
+from sqlalchemy import create_engine, Column, String, Text, DateTime, Integer, Index, func, and_, or_, case
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.dialects.postgresql import TSVECTOR
@@ -18,6 +19,11 @@ logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Columns searched with lower(col) LIKE '%term%' (see _init_trigram_indexes)
+_TRIGRAM_INDEXED_COLUMNS = (
+    'full_name', 'first_name', 'last_name', 'designation', 'department', 'division', 'email'
+)
+
 
 class Employee(Base):
     """Employee model for PostgreSQL"""
@@ -56,6 +62,26 @@ class Employee(Base):
     )
 
 
+def _employee_to_dict(emp: Employee) -> Dict:
+    """Contact fields of an employee row, as returned by every PhoneBookDB search"""
+    return {
+        'id': emp.id,
+        'employee_id': emp.employee_id,
+        'full_name': emp.full_name,
+        'first_name': emp.first_name,
+        'last_name': emp.last_name,
+        'designation': emp.designation,
+        'department': emp.department,
+        'division': emp.division,
+        'email': emp.email,
+        'telephone': emp.telephone,
+        'pabx': emp.pabx,
+        'ip_phone': emp.ip_phone,
+        'mobile': emp.mobile,
+        'group_email': emp.group_email
+    }
+
+
 class PhoneBookDB:
     """PostgreSQL database for phone book with fast search capabilities"""
     
@@ -131,8 +157,28 @@ class PhoneBookDB:
             
             conn.commit()
         
+        self._init_trigram_indexes()
+        
         logger.info(f"[OK] Phone book PostgreSQL database initialized")
     
+    def _init_trigram_indexes(self):
+        """
+        Create pg_trgm GIN indexes on the lowercased search columns.
+        The LIKE '%term%' and lower(col) = term lookups in the search methods can use these
+        instead of scanning the whole table. Optional: searches still work without them.
+        """
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+                for column in _TRIGRAM_INDEXED_COLUMNS:
+                    conn.execute(text(
+                        f"CREATE INDEX IF NOT EXISTS idx_employees_{column}_trgm "
+                        f"ON employees USING gin (lower({column}) gin_trgm_ops)"
+                    ))
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"[WARN] Could not create phone book trigram indexes (searches will use table scans): {e}")
+    
     @contextmanager
     def get_session(self):
         """Context manager for database sessions"""
@@ -405,25 +451,7 @@ class PhoneBookDB:
                 func.ts_rank(Employee.search_vector, search_query).desc()
             ).limit(limit)
             
-            results = []
-            for emp in query.all():
-                results.append({
-                    'id': emp.id,
-                    'employee_id': emp.employee_id,
-                    'full_name': emp.full_name,
-                    'first_name': emp.first_name,
-                    'last_name': emp.last_name,
-                    'designation': emp.designation,
-                    'department': emp.department,
-                    'division': emp.division,
-                    'email': emp.email,
-                    'telephone': emp.telephone,
-                    'pabx': emp.pabx,
-                    'ip_phone': emp.ip_phone,
-                    'mobile': emp.mobile,
-                    'group_email': emp.group_email
-                })
-            return results
+            return [_employee_to_dict(emp) for emp in query.all()]
     
     def search_by_exact_name(self, name: str) -> Optional[Dict]:
         """Search for exact name match (case-insensitive)"""
@@ -432,24 +460,7 @@ class PhoneBookDB:
                 func.lower(Employee.full_name) == func.lower(name)
             ).first()
             
-            if emp:
-                return {
-                    'id': emp.id,
-                    'employee_id': emp.employee_id,
-                    'full_name': emp.full_name,
-                    'first_name': emp.first_name,
-                    'last_name': emp.last_name,
-                    'designation': emp.designation,
-                    'department': emp.department,
-                    'division': emp.division,
-                    'email': emp.email,
-                    'telephone': emp.telephone,
-                    'pabx': emp.pabx,
-                    'ip_phone': emp.ip_phone,
-                    'mobile': emp.mobile,
-                    'group_email': emp.group_email
-                }
-            return None
+            return _employee_to_dict(emp) if emp else None
     
     def search_by_partial_name(self, name_part: str, limit: int = 10) -> List[Dict]:
         """Search by partial name match"""
@@ -461,25 +472,7 @@ class PhoneBookDB:
                 (func.lower(Employee.last_name).like(f'%{name_lower}%'))
             ).limit(limit)
             
-            results = []
-            for emp in query.all():
-                results.append({
-                    'id': emp.id,
-                    'employee_id': emp.employee_id,
-                    'full_name': emp.full_name,
-                    'first_name': emp.first_name,
-                    'last_name': emp.last_name,
-                    'designation': emp.designation,
-                    'department': emp.department,
-                    'division': emp.division,
-                    'email': emp.email,
-                    'telephone': emp.telephone,
-                    'pabx': emp.pabx,
-                    'ip_phone': emp.ip_phone,
-                    'mobile': emp.mobile,
-                    'group_email': emp.group_email
-                })
-            return results
+            return [_employee_to_dict(emp) for emp in query.all()]
     
     def search_by_employee_id(self, emp_id: str) -> Optional[Dict]:
         """Search by employee ID (case-insensitive)"""
@@ -495,24 +488,7 @@ class PhoneBookDB:
                 logger.debug(f"Found employee by ID '{emp_id_clean}': {emp.full_name}")
             else:
                 logger.debug(f"No employee found with ID '{emp_id_clean}'")
-            if emp:
-                return {
-                    'id': emp.id,
-                    'employee_id': emp.employee_id,
-                    'full_name': emp.full_name,
-                    'first_name': emp.first_name,
-                    'last_name': emp.last_name,
-                    'designation': emp.designation,
-                    'department': emp.department,
-                    'division': emp.division,
-                    'email': emp.email,
-                    'telephone': emp.telephone,
-                    'pabx': emp.pabx,
-                    'ip_phone': emp.ip_phone,
-                    'mobile': emp.mobile,
-                    'group_email': emp.group_email
-                }
-            return None
+            return _employee_to_dict(emp) if emp else None
     
     def search_by_email(self, email: str) -> Optional[Dict]:
         """Search by email address"""
@@ -520,24 +496,7 @@ class PhoneBookDB:
             emp = session.query(Employee).filter(
                 func.lower(Employee.email) == func.lower(email)
             ).first()
-            if emp:
-                return {
-                    'id': emp.id,
-                    'employee_id': emp.employee_id,
-                    'full_name': emp.full_name,
-                    'first_name': emp.first_name,
-                    'last_name': emp.last_name,
-                    'designation': emp.designation,
-                    'department': emp.department,
-                    'division': emp.division,
-                    'email': emp.email,
-                    'telephone': emp.telephone,
-                    'pabx': emp.pabx,
-                    'ip_phone': emp.ip_phone,
-                    'mobile': emp.mobile,
-                    'group_email': emp.group_email
-                }
-            return None
+            return _employee_to_dict(emp) if emp else None
     
     def search_by_mobile(self, mobile: str) -> Optional[Dict]:
         """Search by mobile number"""
@@ -546,24 +505,7 @@ class PhoneBookDB:
             emp = session.query(Employee).filter(
                 func.regexp_replace(Employee.mobile, r'[\s-]', '', 'g') == mobile_clean
             ).first()
-            if emp:
-                return {
-                    'id': emp.id,
-                    'employee_id': emp.employee_id,
-                    'full_name': emp.full_name,
-                    'first_name': emp.first_name,
-                    'last_name': emp.last_name,
-                    'designation': emp.designation,
-                    'department': emp.department,
-                    'division': emp.division,
-                    'email': emp.email,
-                    'telephone': emp.telephone,
-                    'pabx': emp.pabx,
-                    'ip_phone': emp.ip_phone,
-                    'mobile': emp.mobile,
-                    'group_email': emp.group_email
-                }
-            return None
+            return _employee_to_dict(emp) if emp else None
     
     def search_by_designation(self, designation: str, limit: int = 20, location: str = None) -> List[Dict]:
         """
@@ -606,25 +548,7 @@ class PhoneBookDB:
             
             query = query.limit(limit)
             
-            results = []
-            for emp in query.all():
-                results.append({
-                    'id': emp.id,
-                    'employee_id': emp.employee_id,
-                    'full_name': emp.full_name,
-                    'first_name': emp.first_name,
-                    'last_name': emp.last_name,
-                    'designation': emp.designation,
-                    'department': emp.department,
-                    'division': emp.division,
-                    'email': emp.email,
-                    'telephone': emp.telephone,
-                    'pabx': emp.pabx,
-                    'ip_phone': emp.ip_phone,
-                    'mobile': emp.mobile,
-                    'group_email': emp.group_email
-                })
-            return results
+            return [_employee_to_dict(emp) for emp in query.all()]
     
     def search_by_department(self, department: str, limit: int = 50) -> List[Dict]:
         """Search by department"""
@@ -634,25 +558,7 @@ class PhoneBookDB:
                 (func.lower(Employee.division).like(f'%{department.lower()}%'))
             ).limit(limit)
             
-            results = []
-            for emp in query.all():
-                results.append({
-                    'id': emp.id,
-                    'employee_id': emp.employee_id,
-                    'full_name': emp.full_name,
-                    'first_name': emp.first_name,
-                    'last_name': emp.last_name,
-                    'designation': emp.designation,
-                    'department': emp.department,
-                    'division': emp.division,
-                    'email': emp.email,
-                    'telephone': emp.telephone,
-                    'pabx': emp.pabx,
-                    'ip_phone': emp.ip_phone,
-                    'mobile': emp.mobile,
-                    'group_email': emp.group_email
-                })
-            return results
+            return [_employee_to_dict(emp) for emp in query.all()]
     
     def count_search_results(self, query: str) -> int:
         """Count total matching results for a search query"""
@@ -663,26 +569,19 @@ class PhoneBookDB:
             
             query_lower = query_clean.lower()
             
+            # Each strategy becomes one FILTERed count of a single SELECT (one round trip);
+            # the first strategy with matches wins, as before, and name (partial match) is the fallback
+            
             # Strategy 1: Exact name match
-            count = session.query(Employee).filter(
-                func.lower(Employee.full_name) == query_lower
-            ).count()
-            if count > 0:
-                return count
+            strategy_counts = [func.count().filter(func.lower(Employee.full_name) == query_lower)]
             
             # Strategy 2: Employee ID
             if query_clean.isdigit():
-                count = session.query(Employee).filter(Employee.employee_id == query_clean).count()
-                if count > 0:
-                    return count
+                strategy_counts.append(func.count().filter(Employee.employee_id == query_clean))
             
             # Strategy 3: Email
             if '@' in query_clean:
-                count = session.query(Employee).filter(
-                    func.lower(Employee.email) == query_lower
-                ).count()
-                if count > 0:
-                    return count
+                strategy_counts.append(func.count().filter(func.lower(Employee.email) == query_lower))
             
             # Strategy 4: Designation (if role keywords present)
             role_keywords = ['head of', 'head', 'manager', 'director', 'officer', 'executive',
@@ -696,23 +595,40 @@ class PhoneBookDB:
                            if len(k.strip()) > 2 and k.strip() not in stop_words]
                 
                 if keywords:
-                    query_obj = session.query(Employee)
-                    for keyword in keywords:
-                        query_obj = query_obj.filter(
-                            func.lower(Employee.designation).like(f'%{keyword}%')
-                        )
-                    count = query_obj.count()
-                    if count > 0:
-                        return count
+                    strategy_counts.append(func.count().filter(and_(*[
+                        func.lower(Employee.designation).like(f'%{keyword}%')
+                        for keyword in keywords
+                    ])))
             
             # Strategy 5: Name (partial match)
-            count = session.query(Employee).filter(
+            strategy_counts.append(func.count().filter(
                 (func.lower(Employee.full_name).like(f'%{query_lower}%')) |
                 (func.lower(Employee.first_name).like(f'%{query_lower}%')) |
                 (func.lower(Employee.last_name).like(f'%{query_lower}%'))
-            ).count()
+            ))
             
-            return count
+            counts = session.query(*strategy_counts).select_from(Employee).one()
+            return next((count for count in counts[:-1] if count > 0), counts[-1])
+    
+    def _search_by_exact_keys(self, query_clean: str) -> Optional[Dict]:
+        """
+        Exact name, employee ID and email lookups (all case-insensitive) in one SELECT.
+        Matches are ranked name > employee ID > email, the order smart_search used to try them in.
+        """
+        query_lower = query_clean.lower()
+        key_matches = [
+            func.lower(Employee.full_name) == query_lower,
+            func.lower(Employee.employee_id) == query_lower,
+        ]
+        if '@' in query_clean:
+            key_matches.append(func.lower(Employee.email) == query_lower)
+        
+        with self.get_session() as session:
+            emp = session.query(Employee).filter(or_(*key_matches)).order_by(
+                case(*[(match, rank) for rank, match in enumerate(key_matches)]),
+                Employee.id
+            ).first()
+            return _employee_to_dict(emp) if emp else None
     
     def smart_search(self, query: str, limit: int = 10) -> List[Dict]:
         """Smart search that tries multiple strategies"""
@@ -723,33 +639,13 @@ class PhoneBookDB:
         
         logger.debug(f"smart_search: Searching for '{query_clean}'")
         
-        # Strategy 1: Exact name match
-        exact = self.search_by_exact_name(query_clean)
+        # Strategies 1-3: exact name, employee ID (numeric or alphanumeric like "cr_app5_test")
+        # and email are resolved by a single keyed lookup that ranks them in that order
+        exact = self._search_by_exact_keys(query_clean)
         if exact:
-            logger.debug(f"smart_search: Found exact name match")
+            logger.debug(f"smart_search: Found exact match: {exact.get('full_name')}")
             return [exact]
         
-        # Strategy 2: Employee ID (try both numeric and alphanumeric IDs)
-        # First try exact employee ID match (works for both numeric and alphanumeric IDs like "cr_app5_test")
-        logger.debug(f"smart_search: Trying employee ID search")
-        emp = self.search_by_employee_id(query_clean)
-        if emp:
-            logger.debug(f"smart_search: Found employee ID match: {emp.get('full_name')}")
-            return [emp]
-        else:
-            logger.debug(f"smart_search: No employee ID match")
-        
-        # Also try if it's all digits (legacy support)
-        if query_clean.isdigit():
-            # Already tried above, but keep for clarity
-            pass
-        
-        # Strategy 3: Email (exact match or email-like format)
-        if '@' in query_clean:
-            emp = self.search_by_email(query_clean)
-            if emp:
-                return [emp]
-        
         # Strategy 3b: Email-like format (firstname.lastname pattern) - search in email field
         # Pattern: contains a dot and looks like firstname.lastname (e.g., "rajib.bhowmik")
         if '.' in query_clean and not query_clean.startswith('.') and not query_clean.endswith('.'):
@@ -763,22 +659,7 @@ class PhoneBookDB:
                     ).first()
                     if emp:
                         logger.debug(f"smart_search: Found employee by email pattern: {emp.full_name}")
-                        return [{
-                            'id': emp.id,
-                            'employee_id': emp.employee_id,
-                            'full_name': emp.full_name,
-                            'first_name': emp.first_name,
-                            'last_name': emp.last_name,
-                            'designation': emp.designation,
-                            'department': emp.department,
-                            'division': emp.division,
-                            'email': emp.email,
-                            'telephone': emp.telephone,
-                            'pabx': emp.pabx,
-                            'ip_phone': emp.ip_phone,
-                            'mobile': emp.mobile,
-                            'group_email': emp.group_email
-                        }]
+                        return [_employee_to_dict(emp)]
         
         # Strategy 4: Mobile number
         if re.match(r'^[\d\s-]+$', query_clean) and len(re.sub(r'[\s-]', '', query_clean)) >= 10:
@@ -909,12 +790,17 @@ class PhoneBookDB:
 
 # Global instance
 _phonebook_db = None
+_phonebook_db_lock = threading.Lock()
 
 def get_phonebook_db(database_url: str = None) -> PhoneBookDB:
     """Get or create global phone book database instance"""
     global _phonebook_db
+    # Fast path once created; the lock only matters for the first concurrent callers
+    # (contact searches run in worker threads), so only one engine/pool is ever built
     if _phonebook_db is None:
-        _phonebook_db = PhoneBookDB(database_url)
+        with _phonebook_db_lock:
+            if _phonebook_db is None:
+                _phonebook_db = PhoneBookDB(database_url)
     return _phonebook_db
 
 
@@ -0,0 +1,20 @@
+"""
+Offline unit tests for the chat orchestrator (no Postgres, Redis, LightRAG or OpenAI calls).
+
+Run (from bank_chatbot/):
+  python -m pytest -q tests
+"""
+
+import os
+
+# The OpenAI client refuses to be constructed without a key; nothing here calls the API
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import pytest
+
+from app.services.chat_orchestrator import ChatOrchestrator
+
+
+@pytest.fixture
+def orchestrator() -> ChatOrchestrator:
+    return ChatOrchestrator()
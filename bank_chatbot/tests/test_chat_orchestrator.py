@@ -0,0 +1,415 @@
+"""Offline tests for the orchestrator's history cache, write-behind persistence, keyword sets and stream splitting."""
+
+import asyncio
+import random
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+
+from app.core.config import settings
+from app.services import chat_orchestrator as orchestrator_module
+from app.services.chat_orchestrator import PersistRecord, _KEYWORD_SETS, _KeywordSet, _keyword_set_hits
+
+
+# ---------------------------------------------------------------------------
+# History cache
+# ---------------------------------------------------------------------------
+
+def _turns(count: int, start: int = 0) -> List[dict]:
+    messages = []
+    for i in range(start, start + count):
+        messages.append({"role": "user", "content": f"q{i}"})
+        messages.append({"role": "assistant", "content": f"a{i}"})
+    return messages
+
+
+@pytest.fixture
+def history_cache(monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_CACHE_SIZE", 2)
+    monkeypatch.setattr(settings, "HISTORY_CACHE_TTL", 1800)
+    monkeypatch.setattr(settings, "MAX_CONVERSATION_HISTORY", 4)
+
+
+def test_history_cache_disabled_by_default_size(orchestrator, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_CACHE_SIZE", 0)
+    orchestrator._store_cached_history("s1", _turns(1))
+    assert orchestrator._get_cached_history("s1") is None
+
+
+def test_history_cache_returns_a_copy(orchestrator, history_cache):
+    orchestrator._store_cached_history("s1", _turns(1))
+    window = orchestrator._get_cached_history("s1")
+    window.append({"role": "user", "content": "mutated"})
+    assert orchestrator._get_cached_history("s1") == _turns(1)
+
+
+def test_history_cache_evicts_least_recently_used(orchestrator, history_cache):
+    orchestrator._store_cached_history("s1", _turns(1))
+    orchestrator._store_cached_history("s2", _turns(1))
+    orchestrator._get_cached_history("s1")
+    orchestrator._store_cached_history("s3", _turns(1))
+    assert orchestrator._get_cached_history("s2") is None
+    assert orchestrator._get_cached_history("s1") is not None
+    assert orchestrator._get_cached_history("s3") is not None
+
+
+def test_history_cache_expires_after_ttl(orchestrator, history_cache, monkeypatch):
+    orchestrator._store_cached_history("s1", _turns(1))
+    now = orchestrator_module.time.monotonic()
+    monkeypatch.setattr(orchestrator_module.time, "monotonic", lambda: now + settings.HISTORY_CACHE_TTL + 1)
+    assert orchestrator._get_cached_history("s1") is None
+    assert "s1" not in orchestrator._history_cache
+
+
+def test_append_skips_sessions_that_are_not_cached(orchestrator, history_cache):
+    orchestrator._history_loads["s1"] = object()
+    orchestrator._append_cached_history("s1", "q", "a")
+    assert orchestrator._get_cached_history("s1") is None
+    # A load that started before this turn must not cache a window missing it
+    assert "s1" not in orchestrator._history_loads
+
+
+def test_append_keeps_block_alignment(orchestrator, history_cache):
+    block = settings.MAX_CONVERSATION_HISTORY
+    orchestrator._store_cached_history("s1", _turns(1))
+    for i in range(1, 12):
+        orchestrator._append_cached_history("s1", f"q{i}", f"a{i}")
+        messages = orchestrator._get_cached_history("s1")
+        # Like get_history_window: whole blocks are dropped, so the window is the newest messages
+        # and holds between one block and just under two
+        assert messages == _turns(i + 1)[-len(messages):]
+        assert len(messages) == 2 * (i + 1) or block <= len(messages) < 2 * block
+
+
+def test_clear_history_cache(orchestrator, history_cache):
+    orchestrator._store_cached_history("s1", _turns(1))
+    orchestrator._store_cached_history("s2", _turns(1))
+    orchestrator.clear_history_cache("s1")
+    assert orchestrator._get_cached_history("s1") is None
+    assert orchestrator._get_cached_history("s2") is not None
+    orchestrator.clear_history_cache()
+    assert not orchestrator._history_cache
+
+
+# ---------------------------------------------------------------------------
+# Write-behind persistence
+# ---------------------------------------------------------------------------
+
+class _FakeMemory:
+    """Stands in for PostgresChatMemory: a write containing a bad session fails its whole transaction."""
+    
+    def __init__(self, bad_sessions=(), available: bool = True):
+        self._available = available
+        self.bad_sessions = set(bad_sessions)
+        self.pending: List[tuple] = []
+        self.committed: List[tuple] = []
+        self.transactions = 0
+    
+    def add_message_rows(self, rows, commit: bool = True) -> bool:
+        rows = list(rows)
+        self.transactions += 1
+        if any(session_id in self.bad_sessions for session_id, _, _ in rows):
+            self.pending = []
+            return False
+        self.pending.extend(rows)
+        return True
+    
+    def commit(self) -> bool:
+        self.committed.extend(self.pending)
+        self.pending = []
+        return True
+    
+    def get_history_window(self, session_id: str, block_size: int) -> list:
+        return [
+            SimpleNamespace(role=role, message=message)
+            for row_session_id, role, message in self.committed
+            if row_session_id == session_id
+        ]
+
+
+@pytest.fixture
+def fake_memory(monkeypatch):
+    holder: dict = {}
+    
+    def install(memory: _FakeMemory) -> _FakeMemory:
+        @contextmanager
+        def memory_session():
+            yield memory
+        monkeypatch.setattr(orchestrator_module, "memory_session", memory_session)
+        monkeypatch.setattr(orchestrator_module, "ANALYTICS_AVAILABLE", False)
+        holder["memory"] = memory
+        return memory
+    
+    return install
+
+
+def _records(*session_ids: str) -> List[PersistRecord]:
+    return [PersistRecord(session_id, f"q-{session_id}", f"a-{session_id}") for session_id in session_ids]
+
+
+def test_persist_writes_a_batch_in_one_transaction(orchestrator, fake_memory):
+    memory = fake_memory(_FakeMemory())
+    orchestrator._persist_turns_sync(_records("a", "b", "c"))
+    assert memory.transactions == 1
+    assert memory.committed == [
+        ("a", "user", "q-a"), ("a", "assistant", "a-a"),
+        ("b", "user", "q-b"), ("b", "assistant", "a-b"),
+        ("c", "user", "q-c"), ("c", "assistant", "a-c"),
+    ]
+
+
+def test_persist_retries_turn_by_turn_when_the_batch_fails(orchestrator, fake_memory):
+    memory = fake_memory(_FakeMemory(bad_sessions={"b"}))
+    orchestrator._persist_turns_sync(_records("a", "b", "c"))
+    # One failed batch, then one transaction per turn; only the bad turn is lost
+    assert memory.transactions == 4
+    assert memory.committed == [
+        ("a", "user", "q-a"), ("a", "assistant", "a-a"),
+        ("c", "user", "q-c"), ("c", "assistant", "a-c"),
+    ]
+
+
+def test_persist_does_not_retry_a_single_failed_turn(orchestrator, fake_memory):
+    memory = fake_memory(_FakeMemory(bad_sessions={"a"}))
+    orchestrator._persist_turns_sync(_records("a"))
+    assert memory.transactions == 1
+    assert memory.committed == []
+
+
+def test_persist_skips_when_postgres_is_unavailable(orchestrator, fake_memory):
+    memory = fake_memory(_FakeMemory(available=False))
+    orchestrator._persist_turns_sync(_records("a"))
+    assert memory.transactions == 0
+
+
+def test_history_read_waits_for_queued_turns(orchestrator, fake_memory, monkeypatch):
+    monkeypatch.setattr(settings, "HISTORY_CACHE_SIZE", 0)
+    memory = fake_memory(_FakeMemory())
+    
+    async def follow_up():
+        await orchestrator._persist_turn("s1", "q1", "a1")
+        # Asked right away, while the turn is still lingering in the write-behind queue
+        history = await orchestrator._get_conversation_history("s1")
+        await orchestrator._persist_queue.join()
+        orchestrator._persist_worker.cancel()
+        return history
+    
+    history = asyncio.run(follow_up())
+    assert history == [{"role": "user", "content": "q1"}, {"role": "assistant", "content": "a1"}]
+    assert memory.transactions == 1
+
+
+# ---------------------------------------------------------------------------
+# In-flight request coalescing
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def counted_pipeline(orchestrator, monkeypatch):
+    calls: List[tuple] = []
+    
+    async def pipeline(query, session_id=None, knowledge_base=None, client_ip=None):
+        calls.append((query, session_id, knowledge_base))
+        await asyncio.sleep(0.01)
+        return {"response": f"answer to {query}", "session_id": session_id}
+    
+    monkeypatch.setattr(orchestrator, "_process_chat_sync", pipeline)
+    return calls
+
+
+def _run_concurrently(orchestrator, *requests):
+    async def run():
+        return await asyncio.gather(*(orchestrator.process_chat_sync(*request) for request in requests))
+    return asyncio.run(run())
+
+
+def test_duplicate_in_flight_requests_share_one_run(orchestrator, counted_pipeline):
+    first, second = _run_concurrently(orchestrator, ("What is the fee?", "s1"), ("  what is the fee?", "s1"))
+    assert len(counted_pipeline) == 1
+    assert first == second
+    # Each caller gets its own dict
+    assert first is not second
+    assert not orchestrator._inflight_sync
+
+
+def test_requests_are_not_coalesced_across_sessions_or_without_one(orchestrator, counted_pipeline):
+    _run_concurrently(orchestrator, ("fee", "s1"), ("fee", "s2"), ("fee", None), ("fee", None), ("fee", "s1", "kb2"))
+    assert len(counted_pipeline) == 5
+
+
+def test_finished_requests_are_not_reused(orchestrator, counted_pipeline):
+    _run_concurrently(orchestrator, ("fee", "s1"))
+    _run_concurrently(orchestrator, ("fee", "s1"))
+    assert len(counted_pipeline) == 2
+
+
+# ---------------------------------------------------------------------------
+# Keyword sets
+# ---------------------------------------------------------------------------
+
+_KEYWORD_QUERIES = [
+    "what is the annual fee for visa platinum credit card",
+    "atm near gulshan",
+    "phone number of the branch manager",
+    "how many branches in dhaka",
+    "tell me about eastern bank",
+    "priority center narayanganj",
+    "what does the policy say about socks",
+    "emi conversion charge",
+    "",
+    "a",
+]
+
+
+def _keyword_queries() -> List[str]:
+    # Every registered keyword on its own and embedded in text, plus overlapping keyword pairs
+    queries = list(_KEYWORD_QUERIES)
+    keywords = sorted({keyword for keywords in _KEYWORD_SETS for keyword in keywords})
+    for keyword in keywords:
+        queries.append(keyword)
+        queries.append(f"please {keyword} now")
+        queries.append(keyword[1:])
+    rng = random.Random(7)
+    for _ in range(500):
+        first, second = rng.sample(keywords, 2)
+        queries.append(first + second)
+        queries.append(f"{first} {second}")
+    return queries
+
+
+@pytest.mark.skipif(not orchestrator_module.AHOCORASICK_AVAILABLE, reason="pyahocorasick is not installed")
+def test_keyword_sets_match_with_and_without_ahocorasick(monkeypatch):
+    keyword_sets = [
+        value for value in vars(orchestrator_module).values() if isinstance(value, _KeywordSet)
+    ]
+    keyword_sets += [
+        value for value in vars(orchestrator_module.ChatOrchestrator).values() if isinstance(value, _KeywordSet)
+    ]
+    assert keyword_sets
+    queries = _keyword_queries()
+    with_automaton = [[bool(keyword_set.search(query)) for keyword_set in keyword_sets] for query in queries]
+    monkeypatch.setattr(orchestrator_module, "AHOCORASICK_AVAILABLE", False)
+    without_automaton = [[bool(keyword_set.search(query)) for keyword_set in keyword_sets] for query in queries]
+    assert with_automaton == without_automaton
+
+
+def test_keyword_set_hits_cover_every_set():
+    for set_id, keywords in enumerate(_KEYWORD_SETS):
+        for keyword in keywords:
+            assert set_id in _keyword_set_hits(keyword)
+
+
+# ---------------------------------------------------------------------------
+# Stream splitting
+# ---------------------------------------------------------------------------
+
+_STREAM_TOKENS = [
+    "the", "fee", "is", "BDT", "5,750", "per", "year.", "**Annual fee:**", "*note*", "_x_", "snake_case",
+    "`code`", "```", "```py\nx=1\n```", "# Title", "## Sub", "₹287.5", "₹ 1,725", "Eastern Bank Limited",
+    "Eastern Bank Ltd.", "Eastern Bank PLC", "Eastern", "Bank", "\n", "\n\n", "- item", "* bullet", "#5",
+    "(Eastern Bank Ltd)",
+]
+
+
+def _stream_cleaned(orchestrator, text: str, rng: random.Random, context: str) -> tuple:
+    """Feed text in random-sized deltas the way the streaming path does; return (cleaned output, segments)."""
+    pending = ""
+    segments = []
+    min_chars = 1
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 6)
+        ready, pending = orchestrator._split_stream_buffer(pending + text[i:i + size], min_chars)
+        i += size
+        if ready:
+            segments.append(ready)
+            min_chars = 64
+    if pending:
+        segments.append(pending)
+    return "".join(orchestrator._clean_stream_segment(segment, context) for segment in segments), segments
+
+
+def test_split_stream_buffer_cleans_like_the_whole_text(orchestrator):
+    rng = random.Random(5)
+    context = "BDT 100"
+    for _ in range(1500):
+        text = " ".join(rng.choice(_STREAM_TOKENS) for _ in range(rng.randint(3, 40)))
+        streamed, segments = _stream_cleaned(orchestrator, text, rng, context)
+        assert "".join(segments) == text
+        assert streamed == orchestrator._clean_stream_segment(text, context), text
+
+
+def test_split_stream_buffer_releases_plain_text_mid_line(orchestrator):
+    ready, carry = orchestrator._split_stream_buffer("Savings accounts offer competitive rat")
+    assert ready == "Savings accounts offer competitive "
+    assert carry == "rat"
+
+
+def test_split_stream_buffer_holds_unsafe_tails(orchestrator):
+    # An unclosed bold marker, a bank name that may still get its suffix, an open code fence
+    assert orchestrator._split_stream_buffer("The fee is **BDT 500") == ("The fee ", "is **BDT 500")
+    assert orchestrator._split_stream_buffer("Welcome to Eastern Bank ") == ("Welcome to ", "Eastern Bank ")
+    assert orchestrator._split_stream_buffer("Run:\n```\nx = 1 and") == ("Run:\n", "```\nx = 1 and")
+
+
+def test_split_stream_buffer_waits_for_min_chars(orchestrator):
+    assert orchestrator._split_stream_buffer("short text here", min_chars=64) == ("", "short text here")
+
+
+def test_coalesce_deltas_releases_first_word_then_batches(orchestrator):
+    async def deltas():
+        for delta in ["Hello", " world", " this", " is", " a", " test", " of", " merging", " deltas", "!"]:
+            yield delta
+    
+    async def collect():
+        return [segment async for segment in orchestrator._coalesce_deltas(deltas(), min_chars=16)]
+    
+    segments = asyncio.run(collect())
+    assert "".join(segments) == "Hello world this is a test of merging deltas!"
+    assert segments[0] == "Hello "
+    # Later segments are cut at whitespace once min_chars are buffered, so there are fewer of them than deltas
+    assert len(segments) < 10
+    for segment in segments[:-1]:
+        assert segment[-1].isspace()
+
+
+# ---------------------------------------------------------------------------
+# Phonebook search-term extraction
+# ---------------------------------------------------------------------------
+
+class _FakePhonebook:
+    """Records the terms the orchestrator searches for; finds nobody."""
+    
+    def __init__(self):
+        self.searches: List[str] = []
+    
+    def __getattr__(self, name):
+        if not name.startswith("search") and name != "smart_search":
+            raise AttributeError(name)
+        
+        def search(term, *args, **kwargs):
+            self.searches.append(term)
+            return []
+        return search
+
+
+@pytest.fixture
+def fake_phonebook(monkeypatch) -> _FakePhonebook:
+    phonebook = _FakePhonebook()
+    monkeypatch.setattr(orchestrator_module, "get_phonebook_db", lambda: phonebook)
+    return phonebook
+
+
+@pytest.mark.parametrize("query", [
+    "who is the branch manager of gulshan",
+    "Branch manager at Gulshan branch",
+])
+def test_search_phonebook_extracts_role_and_location(orchestrator, fake_phonebook, query):
+    search_term, _, _ = orchestrator._search_phonebook(query)
+    assert search_term == "branch manager gulshan"
+    assert fake_phonebook.searches[0] == "branch manager gulshan"
+
+
+def test_role_location_query_routes_to_phonebook(orchestrator):
+    assert orchestrator._is_employee_query("who is the branch manager of gulshan")
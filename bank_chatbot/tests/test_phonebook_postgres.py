@@ -0,0 +1,74 @@
+"""Offline tests for the phone book queries, run against an in-memory SQLite copy of the employees table."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.services.phonebook_postgres import Base, Employee, PhoneBookDB
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_as_text(type_, compiler, **kw):
+    # The full-text column is only read by search_by_name; SQLite just needs a column type
+    return "TEXT"
+
+
+_EMPLOYEES = [
+    dict(employee_id="1001", full_name="Rahim Uddin", first_name="Rahim", last_name="Uddin",
+         designation="Branch Manager", department="Gulshan Branch", email="rahim.uddin@ebl.com"),
+    dict(employee_id="1002", full_name="Rahim Khan", first_name="Rahim", last_name="Khan",
+         designation="Relationship Manager", department="Priority Banking", email="rahim.khan@ebl.com"),
+    dict(employee_id="1003", full_name="Karim Ahmed", first_name="Karim", last_name="Ahmed",
+         designation="Head of Retail Banking", department="Retail Banking", email="karim.ahmed@ebl.com"),
+    dict(employee_id="1004", full_name="Nasrin Akter", first_name="Nasrin", last_name="Akter",
+         designation="Officer", department="Cards", email="nasrin@ebl.com"),
+]
+
+
+@pytest.fixture
+def phonebook() -> PhoneBookDB:
+    # Skip __init__: it connects to Postgres and installs triggers and trigram indexes
+    db = object.__new__(PhoneBookDB)
+    db.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    db.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=db.engine)
+    Base.metadata.create_all(bind=db.engine)
+    with db.get_session() as session:
+        session.add_all(Employee(**employee) for employee in _EMPLOYEES)
+    return db
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Rahim Uddin", 1),          # exact name wins over the partial-name count
+    ("rahim", 2),                # partial name (fallback)
+    ("1002", 1),                 # employee ID
+    ("karim.ahmed@ebl.com", 1),  # email
+    ("manager", 2),              # designation keywords
+    ("branch manager", 1),
+    ("head of retail", 1),
+    ("nobody", 0),
+    ("   ", 0),
+])
+def test_count_search_results(phonebook, query, expected):
+    assert phonebook.count_search_results(query) == expected
+
+
+def test_exact_key_lookup_matches_name_id_and_email(phonebook):
+    assert phonebook._search_by_exact_keys("RAHIM UDDIN")["employee_id"] == "1001"
+    assert phonebook._search_by_exact_keys("1003")["full_name"] == "Karim Ahmed"
+    assert phonebook._search_by_exact_keys("Nasrin@EBL.com")["full_name"] == "Nasrin Akter"
+    assert phonebook._search_by_exact_keys("rahim") is None
+
+
+def test_exact_key_lookup_ranks_name_before_employee_id(phonebook):
+    with phonebook.get_session() as session:
+        session.add(Employee(employee_id="Karim Ahmed", full_name="Someone Else"))
+    assert phonebook._search_by_exact_keys("karim ahmed")["employee_id"] == "1003"
+
+
+def test_searches_return_every_contact_field(phonebook):
+    contact = phonebook.search_by_partial_name("nasrin")[0]
+    expected = dict(_EMPLOYEES[3], division=None, telephone=None, pabx=None, ip_phone=None, mobile=None, group_email=None)
+    assert contact == dict(expected, id=contact["id"])
@@ -0,0 +1,36 @@
+"""Offline tests for the chat-memory queries, run against an in-memory SQLite chat_messages table."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.postgres import ChatMessage, PostgresChatMemory
+
+
+@pytest.fixture
+def memory() -> PostgresChatMemory:
+    engine = create_engine("sqlite://")
+    ChatMessage.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield PostgresChatMemory(db=session)
+    session.close()
+
+
+def _add_messages(memory: PostgresChatMemory, session_id: str, count: int) -> None:
+    memory.db.add_all(
+        ChatMessage(session_id=session_id, role="user" if i % 2 == 0 else "assistant", message=str(i))
+        for i in range(count)
+    )
+    memory.db.commit()
+
+
+@pytest.mark.parametrize("total", [0, 1, 9, 10, 11, 19, 20, 21, 35])
+def test_history_window_starts_at_a_block_boundary(memory, total):
+    block_size = 10
+    _add_messages(memory, "s1", total)
+    _add_messages(memory, "other", 25)
+    window = [int(message.message) for message in memory.get_history_window("s1", block_size)]
+    start = max(0, (total - block_size) // block_size * block_size)
+    assert window == list(range(start, total))
+    # Between one block and just under two (all messages for short sessions)
+    assert len(window) == total or block_size <= len(window) < 2 * block_size
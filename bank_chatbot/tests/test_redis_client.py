@@ -0,0 +1,58 @@
+"""Offline tests for the Redis cache key builders."""
+
+from app.core.config import settings
+import pytest
+
+from app.database.redis_client import get_cache_key, get_response_cache_key, get_similar_response_cache_key
+
+
+def test_response_cache_key_normalizes_case_and_whitespace():
+    assert get_response_cache_key("What is  the HR policy", "kb") == get_response_cache_key(" what is the hr policy ", "kb")
+    assert get_response_cache_key("What is the HR policy", "kb") != get_response_cache_key("What was the HR policy", "kb")
+
+
+def test_response_cache_key_is_per_knowledge_base():
+    assert get_response_cache_key("hr policy", "kb1") != get_response_cache_key("hr policy", "kb2")
+
+
+def test_response_cache_key_stays_under_lightrag_prefix():
+    # clear_cache deletes lightrag:*; answers must not outlive it
+    assert get_response_cache_key("hr policy", "kb").startswith("lightrag:kb:response:")
+    assert get_response_cache_key("hr policy", "kb") != get_cache_key("hr policy", "kb")
+
+
+def test_response_cache_key_changes_with_cache_version(monkeypatch):
+    before = get_response_cache_key("hr policy", "kb")
+    monkeypatch.setattr(settings, "LIGHTRAG_CACHE_VERSION", "2")
+    assert get_response_cache_key("hr policy", "kb") != before
+
+
+@pytest.mark.parametrize("paraphrase", [
+    "please tell me about the HR policy",
+    "Tell me the HR policy",
+    "kindly show me HR policy?",
+    "HR policy",
+])
+def test_similar_cache_key_ignores_filler(paraphrase):
+    assert get_similar_response_cache_key(paraphrase, "kb") == get_similar_response_cache_key("the hr policy", "kb")
+
+
+@pytest.mark.parametrize("query, other", [
+    ("what is the HR policy", "what was the HR policy"),
+    ("can I open an account", "can you open an account"),
+    ("is there a fee", "is there no fee"),
+    ("should I apply", "must I apply"),
+])
+def test_similar_cache_key_keeps_words_that_change_the_question(query, other):
+    assert get_similar_response_cache_key(query, "kb") != get_similar_response_cache_key(other, "kb")
+
+
+def test_similar_cache_key_needs_content_words():
+    assert get_similar_response_cache_key("please tell me about the", "kb") is None
+    assert get_similar_response_cache_key("?!", "kb") is None
+
+
+def test_similar_cache_key_changes_with_cache_version(monkeypatch):
+    before = get_similar_response_cache_key("hr policy", "kb")
+    monkeypatch.setattr(settings, "LIGHTRAG_CACHE_VERSION", "2")
+    assert get_similar_response_cache_key("hr policy", "kb") != before